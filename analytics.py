@@ -0,0 +1,546 @@
+import calendar
+from datetime import date, timedelta
+
+HOUSEHOLD_ID = 2
+
+# user_id value that asks an endpoint for every view (each member + household) at once
+ALL_VIEWS = 'all'
+MEMBERS_QUERY = ("SELECT user_id FROM users WHERE user_id != %s ORDER BY user_id", [HOUSEHOLD_ID])
+
+# Resolves the excluded category inline so spending queries don't depend on a prior lookup
+ONE_OFF_ID_SQL = "COALESCE((SELECT id FROM categories WHERE name = 'One-Off Income' LIMIT 1), -1)"
+
+BURN_RATE_PERIODS = {
+    "30d": "INTERVAL 30 DAY",
+    "3m": "INTERVAL 3 MONTH",
+    "1y": "INTERVAL 1 YEAR",
+    "lifetime": None
+}
+
+def get_date_filter(period, table_alias='t'):
+    """
+    Returns SQL WHERE clause fragment and params for time frames.
+    Every branch is a plain range on the date column so the date index can be used.
+    """
+    prefix = f"{table_alias}." if table_alias else ""
+    if period == 'last_month':
+        return f"AND {prefix}date >= DATE_SUB(DATE_FORMAT(NOW(), '%Y-%m-01'), INTERVAL 1 MONTH) AND {prefix}date < DATE_FORMAT(NOW(), '%Y-%m-01')", []
+    elif period == 'last_3':
+        return f"AND {prefix}date >= DATE_SUB(CURRENT_DATE(), INTERVAL 3 MONTH)", []
+    elif period == 'lifetime':
+        return "", []
+    elif is_specific_month(period):
+        month_start = f"{period}-01"
+        return f"AND {prefix}date >= %s AND {prefix}date < DATE_ADD(%s, INTERVAL 1 MONTH)", [month_start, month_start]
+    else:
+        # Default: Current Month
+        return f"AND {prefix}date >= DATE_FORMAT(CURRENT_DATE(), '%Y-%m-01') AND {prefix}date < DATE_ADD(DATE_FORMAT(CURRENT_DATE(), '%Y-%m-01'), INTERVAL 1 MONTH)", []
+
+def is_specific_month(period):
+    return bool(period) and len(period) == 7 and period[4] == '-' # YYYY-MM format
+
+def uses_live_net_worth(period):
+    """Live asset values for open periods; closed months read the net worth snapshot."""
+    return period in ('current', 'last_3', 'lifetime')
+
+def snapshot_target_date(period, today=None):
+    """Last day of the month a historical snapshot lookup should use (same as SQL LAST_DAY())."""
+    today = today or date.today()
+    if is_specific_month(period):
+        try:
+            year, month = int(period[:4]), int(period[5:])
+            return date(year, month, calendar.monthrange(year, month)[1])
+        except ValueError:
+            return None # Matches STR_TO_DATE() returning NULL
+    if period == 'last_month':
+        return today.replace(day=1) - timedelta(days=1)
+    return today
+
+def member_filter(user_id, alias='s'):
+    """
+    WHERE fragment and params selecting a view's rows in transaction_shares.
+    The household view spans every member's share, however many there are.
+    """
+    if user_id in (HOUSEHOLD_ID, ALL_VIEWS):
+        return "", []
+    return f"AND {alias}.user_id = %s", [user_id]
+
+def member_column(user_id, alias='s'):
+    """Extra SELECT / GROUP BY column that splits an all-views query per member."""
+    return f", {alias}.user_id" if user_id == ALL_VIEWS else ""
+
+# --- ALL VIEWS (user_id=all) ---
+def view_ids(member_rows):
+    """Views an all-views payload carries: every member, then the household."""
+    return [r['user_id'] for r in member_rows] + [HOUSEHOLD_ID]
+
+def _combine(combine, a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return combine((a, b))
+
+def split_views(rows, views, values):
+    """
+    Splits rows grouped by (..., user_id) into {view_id: rows} without the user_id column.
+    Members keep their own rows. The household gets one row per remaining key, with each
+    column in `values` (column -> combining function, e.g. sum) rolled up over every group.
+    """
+    out = {v: [] for v in views}
+    household = {}
+    for r in rows:
+        row = {k: v for k, v in r.items() if k != 'user_id'}
+        if r['user_id'] != HOUSEHOLD_ID and r['user_id'] in out:
+            out[r['user_id']].append(row)
+        key = tuple(v for k, v in row.items() if k not in values)
+        if key not in household:
+            household[key] = dict(row)
+            continue
+        acc = household[key]
+        for col, combine in values.items():
+            acc[col] = _combine(combine, acc[col], row[col])
+    out[HOUSEHOLD_ID] = list(household.values())
+    return out
+
+def _by_user(rows, key):
+    return {r['user_id']: r[key] for r in rows or []}
+
+def _latest_snapshots_sql(table, value_col, alias):
+    """Each user's latest snapshot on or before the target date."""
+    return f"""
+        SELECT h.user_id, h.snapshot_date, h.{value_col} as {alias}
+        FROM {table} h
+        JOIN (
+            SELECT user_id, MAX(snapshot_date) as latest FROM {table}
+            WHERE snapshot_date <= %s GROUP BY user_id
+        ) m ON m.user_id = h.user_id AND m.latest = h.snapshot_date
+    """
+
+def _household_snapshot(rows, key):
+    """Household snapshot value: the sum over users at the latest date anyone recorded."""
+    if not rows:
+        return None
+    latest = max(r['snapshot_date'] for r in rows)
+    return sum(float(r[key] or 0) for r in rows if r['snapshot_date'] == latest)
+
+# --- DASHBOARD SUMMARY ---
+def summary_queries(user_id, period):
+    """
+    Independent single-row queries behind /api/dashboard/summary, as name -> (sql, params).
+    None of them reads another's result, so they can run in any order or concurrently.
+    """
+    date_clause, date_params = get_date_filter(period, table_alias='transactions')
+    queries = {}
+
+    # 1. Net worth: live values for "live" views, otherwise the latest snapshot
+    if uses_live_net_worth(period):
+        if user_id == HOUSEHOLD_ID:
+            queries['net_worth'] = ("SELECT SUM(current_value) as nw FROM assets", [])
+        else:
+            queries['net_worth'] = ("SELECT SUM(current_value) as nw FROM assets WHERE user_id = %s", [user_id])
+    else:
+        target_date = snapshot_target_date(period)
+        if user_id == HOUSEHOLD_ID:
+            queries['net_worth'] = ("""
+                SELECT SUM(total_value) as nw FROM net_worth_history
+                WHERE snapshot_date = (SELECT MAX(snapshot_date) FROM net_worth_history WHERE snapshot_date <= %s)
+            """, [target_date])
+        else:
+            queries['net_worth'] = ("""
+                SELECT total_value as nw FROM net_worth_history
+                WHERE user_id = %s AND snapshot_date <= %s
+                ORDER BY snapshot_date DESC LIMIT 1
+            """, [user_id, target_date])
+
+    # 2. Income: snapshot for closed months, recurring streams + one-off income otherwise
+    if is_specific_month(period) or period == 'last_month':
+        target_date = snapshot_target_date(period)
+        if user_id == HOUSEHOLD_ID:
+            queries['income_snapshot'] = ("""
+                SELECT SUM(total_net_income) as inc FROM income_history
+                WHERE snapshot_date = (SELECT MAX(snapshot_date) FROM income_history WHERE snapshot_date <= %s)
+            """, [target_date])
+        else:
+            queries['income_snapshot'] = ("""
+                SELECT total_net_income as inc FROM income_history
+                WHERE user_id = %s AND snapshot_date <= %s
+                ORDER BY snapshot_date DESC LIMIT 1
+            """, [user_id, target_date])
+    else:
+        if user_id == HOUSEHOLD_ID:
+            queries['recurring_income'] = ("SELECT SUM(monthly_gross * (1 - tax_rate/100)) as inc FROM income_streams", [])
+        else:
+            queries['recurring_income'] = ("SELECT SUM(monthly_gross * (1 - tax_rate/100)) as inc FROM income_streams WHERE user_id = %s", [user_id])
+        if period == 'lifetime':
+            queries['lifetime_months'] = ("SELECT TIMESTAMPDIFF(MONTH, MIN(date), NOW()) + 1 as mos FROM transactions", [])
+        queries['one_off_income'] = (f"SELECT SUM(ABS(total_amount)) as one_off FROM transactions WHERE category_id = {ONE_OFF_ID_SQL} {date_clause}", date_params)
+
+    # 3. Spending (always aggregated for the period)
+    share_date_clause, share_date_params = get_date_filter(period, table_alias='s')
+    member_clause, member_params = member_filter(user_id)
+    if user_id == HOUSEHOLD_ID:
+        own_filter, own_params = "", []
+    else:
+        # A member's own entries count whatever their sign; others' only where they owe a share
+        own_filter, own_params = "AND (t.user_id = %s OR s.share > 0)", [user_id]
+    queries['spent'] = (f"""
+        SELECT SUM(s.share) as spent
+        FROM transaction_shares s
+        JOIN transactions t ON t.id = s.transaction_id AND t.date = s.date
+        WHERE t.category_id != {ONE_OFF_ID_SQL} {own_filter} {member_clause} {share_date_clause}
+    """, own_params + member_params + share_date_params)
+
+    # 4. Goals
+    queries['settings'] = ("SELECT * FROM user_settings WHERE user_id = %s", [0 if user_id == HOUSEHOLD_ID else user_id])
+    return queries
+
+def summary_all_queries(period):
+    """
+    summary_queries() for every view at once: each statement groups by user_id (or returns
+    every user's latest snapshot) and summary_all_payload() rolls the members up into the household.
+    """
+    date_clause, date_params = get_date_filter(period, table_alias='transactions')
+    share_date_clause, share_date_params = get_date_filter(period, table_alias='s')
+    queries = {'members': MEMBERS_QUERY}
+
+    if uses_live_net_worth(period):
+        queries['net_worth'] = ("SELECT user_id, SUM(current_value) as nw FROM assets GROUP BY user_id", [])
+    else:
+        queries['net_worth'] = (_latest_snapshots_sql('net_worth_history', 'total_value', 'nw'), [snapshot_target_date(period)])
+
+    if is_specific_month(period) or period == 'last_month':
+        queries['income_snapshot'] = (_latest_snapshots_sql('income_history', 'total_net_income', 'inc'), [snapshot_target_date(period)])
+    else:
+        queries['recurring_income'] = ("SELECT user_id, SUM(monthly_gross * (1 - tax_rate/100)) as inc FROM income_streams GROUP BY user_id", [])
+        if period == 'lifetime':
+            queries['lifetime_months'] = ("SELECT TIMESTAMPDIFF(MONTH, MIN(date), NOW()) + 1 as mos FROM transactions", [])
+        queries['one_off_income'] = (f"SELECT SUM(ABS(total_amount)) as one_off FROM transactions WHERE category_id = {ONE_OFF_ID_SQL} {date_clause}", date_params)
+
+    # Conditional sums: `total` feeds the household, `own` is the member view's spend
+    queries['spent'] = (f"""
+        SELECT s.user_id, SUM(s.share) as total,
+               SUM(CASE WHEN t.user_id = s.user_id OR s.share > 0 THEN s.share ELSE 0 END) as own
+        FROM transaction_shares s
+        JOIN transactions t ON t.id = s.transaction_id AND t.date = s.date
+        WHERE t.category_id != {ONE_OFF_ID_SQL} {share_date_clause}
+        GROUP BY s.user_id
+    """, share_date_params)
+    queries['settings'] = ("SELECT * FROM user_settings", [])
+    return queries
+
+def summary_all_payload(period, results):
+    """{view_id: summary_payload()} from summary_all_queries() rows (name -> list of rows)."""
+    def first(name):
+        rows = results.get(name)
+        return rows[0] if rows else None
+
+    settings = {r['user_id']: r for r in results['settings']}
+    spent_rows = results['spent']
+    payload = {}
+    for view in view_ids(results['members']):
+        household = view == HOUSEHOLD_ID
+        view_results = {
+            'lifetime_months': first('lifetime_months'),
+            'one_off_income': first('one_off_income'),
+            'settings': settings.get(0 if household else view),
+            'spent': {'spent': sum(r['total'] or 0 for r in spent_rows) if household else _by_user(spent_rows, 'own').get(view)},
+        }
+        if 'recurring_income' in results:
+            incomes = _by_user(results['recurring_income'], 'inc')
+            view_results['recurring_income'] = {'inc': sum(v or 0 for v in incomes.values()) if household else incomes.get(view)}
+        else:
+            rows = results['income_snapshot']
+            view_results['income_snapshot'] = {'inc': _household_snapshot(rows, 'inc') if household else _by_user(rows, 'inc').get(view)}
+        rows = results['net_worth']
+        if uses_live_net_worth(period):
+            view_results['net_worth'] = {'nw': sum(r['nw'] or 0 for r in rows) if household else _by_user(rows, 'nw').get(view)}
+        else:
+            view_results['net_worth'] = {'nw': _household_snapshot(rows, 'nw') if household else _by_user(rows, 'nw').get(view)}
+        payload[str(view)] = summary_payload(period, view_results)
+    return payload
+
+def summary_payload(period, results):
+    """Combines the summary_queries() rows (name -> row dict or None) into the KPI payload."""
+    def value(name, key):
+        row = results.get(name)
+        return float(row[key] or 0) if row else 0.0
+
+    nw = value('net_worth', 'nw')
+    if 'income_snapshot' in results:
+        inc = value('income_snapshot', 'inc')
+    else:
+        if period == 'last_3':
+            num_months = 3
+        elif period == 'lifetime':
+            num_months = value('lifetime_months', 'mos') or 1
+        else:
+            num_months = 1
+        inc = value('recurring_income', 'inc') * num_months + value('one_off_income', 'one_off')
+    spent = value('spent', 'spent')
+
+    settings = results.get('settings') or {"savings_goal_pct": 20.0, "expenses_goal_pct": 50.0}
+    return {
+        "net_worth": nw, "income": inc,
+        "spent": spent, "savings": inc - spent,
+        "savings_goal_pct": float(settings['savings_goal_pct']),
+        "expenses_goal_pct": float(settings['expenses_goal_pct'])
+    }
+
+# --- SPENDING BREAKDOWNS ---
+def parent_spending_query(user_id, period):
+    date_clause, date_params = get_date_filter(period, table_alias='s')
+    member_clause, member_params = member_filter(user_id)
+    by_member = member_column(user_id)
+    return f"""
+        SELECT COALESCE(NULLIF(c.parent_name, ''), 'Other') as parent_class,
+               SUM(s.share) as total{by_member}
+        FROM transaction_shares s
+        JOIN transactions t ON t.id = s.transaction_id AND t.date = s.date
+        LEFT JOIN categories c ON t.category_id = c.id
+        WHERE s.share > 0 AND t.category_id != {ONE_OFF_ID_SQL} {member_clause} {date_clause}
+        GROUP BY parent_class{by_member} ORDER BY total DESC
+    """, member_params + date_params
+
+def sub_spending_query(user_id, parent_name, period):
+    # Same share rows as parent_spending_query, so a drill-down adds up to its parent slice
+    date_clause, date_params = get_date_filter(period, table_alias='s')
+    member_clause, member_params = member_filter(user_id)
+    by_member = member_column(user_id)
+    return f"""
+        SELECT c.name as sub_category, SUM(s.share) as total{by_member}
+        FROM transaction_shares s
+        JOIN transactions t ON t.id = s.transaction_id AND t.date = s.date
+        JOIN categories c ON t.category_id = c.id
+        WHERE s.share > 0 AND c.parent_name = %s {member_clause} {date_clause}
+        GROUP BY c.name{by_member} ORDER BY total DESC
+    """, [parent_name] + member_params + date_params
+
+def budget_progress_query(user_id, parent_name, period):
+    """Budget vs actual per sub-category of `parent_name`, or per parent category when omitted."""
+    date_clause, date_params = get_date_filter(period, table_alias='s')
+    member_clause, member_params = member_filter(user_id)
+
+    if parent_name:
+        # Actuals are aggregated per category from the member's share range, then attached to every sub-category
+        return f"""
+            SELECT
+                c.name as label,
+                COALESCE(b.target_amount, 0) as budget,
+                COALESCE(SUM(a.actual), 0) as actual
+            FROM categories c
+            LEFT JOIN budgets b ON c.name = b.category_name AND b.user_id = %s
+            LEFT JOIN (
+                SELECT t.category_id, SUM(s.share) as actual
+                FROM transaction_shares s
+                JOIN transactions t ON t.id = s.transaction_id AND t.date = s.date {member_clause} {date_clause}
+                GROUP BY t.category_id
+            ) a ON a.category_id = c.id
+            WHERE c.parent_name = %s
+            GROUP BY c.name, b.target_amount
+        """, [user_id] + member_params + date_params + [parent_name]
+    return f"""
+        SELECT
+            COALESCE(c.parent_name, 'Other') as label,
+            SUM(DISTINCT b.target_amount) as budget,
+            COALESCE(SUM(s.share), 0) as actual
+        FROM transaction_shares s
+        JOIN transactions t ON t.id = s.transaction_id AND t.date = s.date
+        JOIN categories c ON c.id = t.category_id
+        LEFT JOIN (
+            SELECT category_name, SUM(target_amount) as target_amount
+            FROM budgets WHERE user_id = %s GROUP BY category_name
+        ) b ON c.name = b.category_name
+        WHERE s.share > 0 {member_clause} {date_clause}
+        GROUP BY c.parent_name
+    """, [user_id] + member_params + date_params
+
+def budget_progress_all_queries(parent_name, period):
+    """budget_progress_query() for every view: actuals per (category, member) plus every user's budgets."""
+    date_clause, date_params = get_date_filter(period, table_alias='s')
+    queries = {
+        'members': MEMBERS_QUERY,
+        'budgets': ("SELECT user_id, category_name, SUM(target_amount) as target FROM budgets GROUP BY user_id, category_name", []),
+    }
+    if parent_name:
+        queries['actuals'] = (f"""
+            SELECT c.name as label, a.user_id, a.actual
+            FROM categories c
+            LEFT JOIN (
+                SELECT t.category_id, s.user_id, SUM(s.share) as actual
+                FROM transaction_shares s
+                JOIN transactions t ON t.id = s.transaction_id AND t.date = s.date {date_clause}
+                GROUP BY t.category_id, s.user_id
+            ) a ON a.category_id = c.id
+            WHERE c.parent_name = %s
+        """, date_params + [parent_name])
+    else:
+        queries['actuals'] = (f"""
+            SELECT c.parent_name, c.name as category, s.user_id, SUM(s.share) as actual
+            FROM transaction_shares s
+            JOIN transactions t ON t.id = s.transaction_id AND t.date = s.date
+            JOIN categories c ON c.id = t.category_id
+            WHERE s.share > 0 {date_clause}
+            GROUP BY c.parent_name, c.name, s.user_id
+        """, date_params)
+    return queries
+
+def budget_progress_all_payload(parent_name, results):
+    """{view_id: rows} in the budget_progress_query() row shape, ordered by label."""
+    targets = {}
+    for r in results['budgets']:
+        targets.setdefault(r['user_id'], {})[r['category_name']] = r['target']
+
+    payload = {}
+    for view in view_ids(results['members']):
+        budgets = targets.get(view, {})
+        in_view = lambda r: r['user_id'] is not None and (view == HOUSEHOLD_ID or r['user_id'] == view)
+        if parent_name:
+            # Every sub-category is listed, with zero actual when the view has no shares in it
+            actuals = {}
+            for r in results['actuals']:
+                actuals[r['label']] = actuals.get(r['label'], 0.0) + (float(r['actual']) if in_view(r) else 0.0)
+            rows = [{"label": label, "budget": budgets.get(label, 0), "actual": actual} for label, actual in actuals.items()]
+        else:
+            parents = {}
+            for r in filter(in_view, results['actuals']):
+                entry = parents.setdefault(r['parent_name'], {"categories": set(), "actual": 0.0})
+                entry['categories'].add(r['category'])
+                entry['actual'] += float(r['actual'])
+            rows = []
+            for parent, entry in parents.items():
+                # Distinct targets, as SUM(DISTINCT b.target_amount) in the single-view query
+                distinct = {budgets[c] for c in entry['categories'] if budgets.get(c) is not None}
+                rows.append({"label": parent or 'Other', "budget": sum(distinct) if distinct else None, "actual": entry['actual']})
+        payload[str(view)] = sorted(rows, key=lambda r: r['label'])
+    return payload
+
+def breakdown_payload(rows, label_key):
+    return {"labels": [r[label_key] for r in rows], "values": [float(r['total']) for r in rows]}
+
+def breakdown_all_payload(results, label_key):
+    """{view_id: breakdown_payload()} from a breakdown query built with user_id=ALL_VIEWS."""
+    views = split_views(results['rows'], view_ids(results['members']), {'total': sum})
+    return {str(view): breakdown_payload(sorted(rows, key=lambda r: -r['total']), label_key) for view, rows in views.items()}
+
+# --- BURN RATE ---
+def burn_rate_queries(user_id):
+    member_clause, member_params = member_filter(user_id)
+    queries = {}
+    for key, interval in BURN_RATE_PERIODS.items():
+        date_condition = f"AND s.date >= DATE_SUB(CURDATE(), {interval})" if interval else ""
+        # Everything needed is on transaction_shares, so no join back to transactions
+        queries[key] = (f"""
+            SELECT SUM(s.share) as total,
+                   TIMESTAMPDIFF(MONTH, MIN(s.date), CURDATE()) + 1 as months
+            FROM transaction_shares s
+            WHERE s.share > 0 {member_clause} {date_condition}
+        """, member_params)
+    return queries
+
+def burn_rate_all_query():
+    """
+    Every burn-rate window for every member in one scan of transaction_shares: each
+    window is a conditional SUM / MIN over the rows that fall inside it.
+    """
+    columns = []
+    for key, interval in BURN_RATE_PERIODS.items():
+        if interval:
+            in_window = f"s.date >= DATE_SUB(CURDATE(), {interval})"
+            share, day = f"CASE WHEN {in_window} THEN s.share END", f"CASE WHEN {in_window} THEN s.date END"
+        else:
+            share, day = "s.share", "s.date"
+        columns.append(f"SUM({share}) as total_{key}, TIMESTAMPDIFF(MONTH, MIN({day}), CURDATE()) + 1 as months_{key}")
+    return f"""
+        SELECT s.user_id, {', '.join(columns)}
+        FROM transaction_shares s
+        WHERE s.share > 0
+        GROUP BY s.user_id
+    """, []
+
+def burn_rate_all_payload(results):
+    # Household spans the earliest member's start, so months roll up with max()
+    values = {}
+    for key in BURN_RATE_PERIODS:
+        values[f"total_{key}"] = sum
+        values[f"months_{key}"] = max
+    views = split_views(results['rows'], view_ids(results['members']), values)
+    payload = {}
+    for view, rows in views.items():
+        row = rows[0] if rows else {}
+        payload[str(view)] = burn_rate_payload({
+            key: {'total': row.get(f"total_{key}"), 'months': row.get(f"months_{key}")} for key in BURN_RATE_PERIODS
+        })
+    return payload
+
+def burn_rate_payload(results):
+    payload = {}
+    for key in BURN_RATE_PERIODS:
+        row = results.get(key) or {}
+        total_spend = float(row.get('total') or 0)
+        num_months = 1 if key == "30d" else (row.get('months') or 1)
+        avg_burn = total_spend / num_months
+        payload[key] = {
+            "actual": avg_burn,
+            "cushioned": avg_burn * 1.15
+        }
+    return payload
+
+# --- HOUSING RATIO ---
+def housing_queries(user_id, period):
+    date_clause, date_params = get_date_filter(period, table_alias='s')
+    member_clause, member_params = member_filter(user_id)
+    if user_id == HOUSEHOLD_ID:
+        income = ("SELECT SUM(monthly_gross * (1 - tax_rate/100)) as inc FROM income_streams", [])
+    else:
+        income = ("SELECT SUM(monthly_gross * (1 - tax_rate/100)) as inc FROM income_streams WHERE user_id = %s", [user_id])
+
+    # Housing costs are categories under 'Home' or 'Utilities'
+    housing = (f"""
+        SELECT SUM(s.share) as total
+        FROM transaction_shares s
+        JOIN transactions t ON t.id = s.transaction_id AND t.date = s.date
+        JOIN categories c ON t.category_id = c.id
+        WHERE (c.parent_name IN ('Home', 'Utilities'))
+        {member_clause} {date_clause}
+    """, member_params + date_params)
+    return {"income": income, "housing": housing}
+
+def housing_all_queries(period):
+    date_clause, date_params = get_date_filter(period, table_alias='s')
+    return {
+        'members': MEMBERS_QUERY,
+        'income': ("SELECT user_id, SUM(monthly_gross * (1 - tax_rate/100)) as inc FROM income_streams GROUP BY user_id", []),
+        'housing': (f"""
+            SELECT s.user_id, SUM(s.share) as total
+            FROM transaction_shares s
+            JOIN transactions t ON t.id = s.transaction_id AND t.date = s.date
+            JOIN categories c ON t.category_id = c.id
+            WHERE (c.parent_name IN ('Home', 'Utilities'))
+            {date_clause}
+            GROUP BY s.user_id
+        """, date_params),
+    }
+
+def housing_all_payload(results):
+    incomes = _by_user(results['income'], 'inc')
+    housing = _by_user(results['housing'], 'total')
+    payload = {}
+    for view in view_ids(results['members']):
+        if view == HOUSEHOLD_ID:
+            view_results = {'income': {'inc': sum(v or 0 for v in incomes.values())},
+                            'housing': {'total': sum(v or 0 for v in housing.values())}}
+        else:
+            view_results = {'income': {'inc': incomes.get(view)}, 'housing': {'total': housing.get(view)}}
+        payload[str(view)] = housing_payload(view_results)
+    return payload
+
+def housing_payload(results):
+    income = float((results.get('income') or {}).get('inc') or 0)
+    housing_cost = float((results.get('housing') or {}).get('total') or 0)
+    ratio = (housing_cost / income * 100) if income > 0 else 0
+    return {
+        "income": income,
+        "housing_cost": housing_cost,
+        "ratio": round(ratio, 1)
+    }
@@ -4,16 +4,28 @@ import time
 import traceback
 import logging
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
 from dotenv import load_dotenv
 
-from flask import Flask, jsonify, render_template, request, redirect, url_for, flash, g
+from flask import Flask, jsonify, render_template, request, redirect, url_for, flash, g, has_request_context
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 import mysql.connector
 
 from config import Config
+from db import get_pool, PoolTimeout
 from importer import run_import, generate_transaction_hash
+from categorizer import bulk_set_categories
+import analytics
+import repository
+from analytics import get_date_filter
+import history_service
+import responses
+from snapshot_job import snapshot_all_users, start_snapshot_timer
+import metrics
+import static_assets
+from slow_queries import SlowQueryLog
 
 # --- LOGGING SETUP ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -43,44 +55,119 @@ def load_user(user_id):
     return None
 
 # --- DATABASE CONNECTION ---
-from mysql.connector import pooling
+# The pool is resolved per call so each forked worker lazily builds its own
+metrics.register_gauge('budget_db_pool', 'Shared DB pool state (size, open, in_use, idle, waiting, timeouts).', lambda: get_pool().stats())
 
-db_pool = mysql.connector.pooling.MySQLConnectionPool(
-    pool_name="mypool",
-    pool_size=10,
-    host=app.config['DB_HOST'],
-    user=app.config['DB_USER'],
-    password=app.config['DB_PASS'],
-    database=app.config['DB_NAME']
-)
+slow_query_log = SlowQueryLog(app.config['SLOW_QUERY_MS'], app.config['SLOW_QUERY_BUFFER'],
+                              shared_dir=app.config['MULTIPROC_DIR'])
+
+def collect_query(sql, params, duration):
+    """Queues slow (or, in profiling mode, all) statements for EXPLAIN at teardown."""
+    profiling = g.get('profile_queries', False)
+    g.query_count = g.get('query_count', 0) + 1
+    g.query_time = g.get('query_time', 0.0) + duration
+    if slow_query_log.should_capture(duration, profiling):
+        g.setdefault('slow_pending', []).append((sql, params, duration))
 
 def get_db():
     if 'db' not in g:
-        g.db = db_pool.get_connection()
+        g.db = metrics.InstrumentedConnection(get_pool().get_connection(), on_query=collect_query)
     return g.db
 
 @app.teardown_appcontext
 def teardown_db(exception):
     db = g.pop('db', None)
+    pending = g.pop('slow_pending', None)
     if db is not None:
+        if pending:
+            route = request.url_rule.rule if has_request_context() and request.url_rule else None
+            slow_query_log.flush(db.raw.raw, pending, route)
         db.close()
 
+@app.errorhandler(PoolTimeout)
+def handle_pool_timeout(e):
+    logger.warning(f"DB pool exhausted: {e}")
+    return jsonify({"error": "Server busy, please retry."}), 503
+
+@app.before_request
+def enable_query_profiling():
+    # Per-request profiling: capture and EXPLAIN every statement, not just slow ones
+    if request.headers.get('X-Profile-Queries') == '1' and current_user.is_authenticated and current_user.name == 'Gus':
+        g.profile_queries = True
+
+@app.after_request
+def add_query_profile_headers(response):
+    if g.get('profile_queries'):
+        response.headers['X-Query-Count'] = str(g.get('query_count', 0))
+        response.headers['X-Query-Time-Ms'] = f"{g.get('query_time', 0.0) * 1000:.2f}"
+    return response
+
+# --- METRICS (request timing + /metrics) ---
+metrics.init_app(app)
+
+# --- STATIC ASSETS (fingerprinted build, see static_assets.py) ---
+static_assets.init_app(app)
+
 # --- HELPER UTILITIES ---
-def get_date_filter(period, table_alias='t'):
-    """Returns SQL WHERE clause fragment and params for time frames."""
-    prefix = f"{table_alias}." if table_alias else ""
-    if period == 'last_month':
-        return f"AND {prefix}date >= DATE_SUB(DATE_FORMAT(NOW(), '%Y-%m-01'), INTERVAL 1 MONTH) AND {prefix}date < DATE_FORMAT(NOW(), '%Y-%m-01')", []
-    elif period == 'last_3':
-        return f"AND {prefix}date >= DATE_SUB(CURRENT_DATE(), INTERVAL 3 MONTH)", []
-    elif period == 'lifetime':
-        return "", []
-    elif period and len(period) == 7 and period[4] == '-': # YYYY-MM format
-        year, month = period.split('-')
-        return f"AND YEAR({prefix}date) = %s AND MONTH({prefix}date) = %s", [year, month]
-    else:
-        # Default: Current Month
-        return f"AND MONTH({prefix}date) = MONTH(CURRENT_DATE()) AND YEAR({prefix}date) = YEAR(CURRENT_DATE())", []
+def run_serial(conn, queries, fetch=repository.fetch_one):
+    """Executes (name, (sql, params)) queries in turn on one connection; returns name -> fetch() result."""
+    return {name: fetch(conn, sql, params) for name, (sql, params) in queries}
+
+_fanout_executor = None
+_fanout_pid = None
+
+def get_fanout_executor():
+    # Sized to the pool: every submitted lane holds its own connection, so work never queues.
+    # Rebuilt after fork since executor threads don't survive it.
+    global _fanout_executor, _fanout_pid
+    if _fanout_pid != os.getpid():
+        _fanout_executor = ThreadPoolExecutor(max_workers=app.config['DB_POOL_SIZE'], thread_name_prefix='query-fanout')
+        _fanout_pid = os.getpid()
+    return _fanout_executor
+
+def run_queries(queries, fetch=repository.fetch_one):
+    """
+    Runs independent analytics (sql, params) queries, returning name -> first row
+    (or name -> all rows with fetch=repository.fetch_all).
+    Queries are dealt round-robin onto the request connection plus up to QUERY_FANOUT - 1
+    extra pooled connections that run on worker threads, so latency approaches the
+    slowest query. Extra connections are only taken when the pool has spare capacity;
+    otherwise everything runs serially on the request connection.
+    """
+    items = list(queries.items())
+    wanted = min(len(items), app.config['QUERY_FANOUT']) - 1
+    pool = get_pool()
+    captured = []
+    extra = []
+    while len(extra) < wanted:
+        conn = pool.try_get_connection(reserve=app.config['QUERY_FANOUT_RESERVE'])
+        if conn is None:
+            break
+        # Worker threads have no app context, so statements are reported to collect_query afterwards
+        extra.append(metrics.InstrumentedConnection(conn, on_query=lambda *q: captured.append(q)))
+
+    lanes = [items[i::len(extra) + 1] for i in range(len(extra) + 1)]
+    results = {}
+    futures = []
+    try:
+        for conn, lane in zip(extra, lanes[1:]):
+            futures.append(get_fanout_executor().submit(run_serial, conn, lane, fetch))
+        results.update(run_serial(get_db(), lanes[0], fetch))
+        for future in futures:
+            results.update(future.result())
+    finally:
+        # Even when a lane raised, the others must finish before their connections go back to the pool
+        wait(futures)
+        for conn in extra:
+            conn.close()
+        for sql, params, duration in captured:
+            collect_query(sql, params, duration)
+    return results
+
+def view_arg():
+    """The user_id query argument: a single view id, or analytics.ALL_VIEWS for every view at once."""
+    value = request.args.get('user_id', 0)
+    return value if value == analytics.ALL_VIEWS else int(value)
 
 # ==========================================
 # AUTHENTICATION ROUTES
@@ -141,200 +228,39 @@ def index():
 @login_required
 def dashboard_summary():
     """Top-level KPIs for Net Worth, Income, Spending, and Savings"""
-    user_id = int(request.args.get('user_id', 0))
+    user_id = view_arg()
     period = request.args.get('period', 'current')
-    cursor = get_db().cursor(dictionary=True)
-    
-    date_clause, date_params = get_date_filter(period, table_alias='transactions')
-    
-    # Helper to check if period is a specific month (YYYY-MM)
-    is_specific_month = period and len(period) == 7 and period[4] == '-'
-
-    try:
-        # 1. GET NET WORTH (Live or Historical)
-        if period == 'current' or period == 'last_3' or period == 'lifetime':
-            # Use current live values for "Live" views
-            if user_id == 2: # Household
-                cursor.execute("SELECT SUM(current_value) as nw FROM assets")
-            else:
-                cursor.execute("SELECT SUM(current_value) as nw FROM assets WHERE user_id = %s", (user_id,))
-            res = cursor.fetchone()
-            nw = float(res['nw'] or 0)
-        else:
-            # Historical lookup from snapshots
-            if is_specific_month:
-                cursor.execute("SELECT LAST_DAY(STR_TO_DATE(CONCAT(%s, '-01'), '%Y-%m-%d')) as ld", (period,))
-                target_date = cursor.fetchone()['ld']
-            elif period == 'last_month':
-                cursor.execute("SELECT LAST_DAY(DATE_SUB(NOW(), INTERVAL 1 MONTH)) as ld")
-                target_date = cursor.fetchone()['ld']
-            else:
-                target_date = datetime.now().strftime('%Y-%m-%d')
-
-            if user_id == 2:
-                cursor.execute("""
-                    SELECT SUM(total_value) as nw FROM net_worth_history 
-                    WHERE snapshot_date = (SELECT MAX(snapshot_date) FROM net_worth_history WHERE snapshot_date <= %s)
-                """, (target_date,))
-            else:
-                cursor.execute("""
-                    SELECT total_value as nw FROM net_worth_history 
-                    WHERE user_id = %s AND snapshot_date <= %s 
-                    ORDER BY snapshot_date DESC LIMIT 1
-                """, (user_id, target_date))
-            res = cursor.fetchone()
-            nw = float(res['nw'] or 0)
-
-        # 2. GET INCOME (Aggregated for period)
-        cursor.execute("SELECT id FROM categories WHERE name = 'One-Off Income'")
-        one_off_cat = cursor.fetchone()
-        one_off_cat_id = one_off_cat['id'] if one_off_cat else -1
-
-        # Calculate monthly recurring net based on current streams
-        if user_id == 2:
-            cursor.execute("SELECT SUM(monthly_gross * (1 - tax_rate/100)) as inc FROM income_streams")
-        else:
-            cursor.execute("SELECT SUM(monthly_gross * (1 - tax_rate/100)) as inc FROM income_streams WHERE user_id = %s", (user_id,))
-        res = cursor.fetchone()
-        monthly_recurring_net = float(res['inc'] or 0)
-
-        if is_specific_month or period == 'last_month':
-            # For specific months, use the snapshot
-            if is_specific_month:
-                cursor.execute("SELECT LAST_DAY(STR_TO_DATE(CONCAT(%s, '-01'), '%Y-%m-%d')) as ld", (period,))
-                target_date = cursor.fetchone()['ld']
-            else:
-                cursor.execute("SELECT LAST_DAY(DATE_SUB(NOW(), INTERVAL 1 MONTH)) as ld")
-                target_date = cursor.fetchone()['ld']
-
-            if user_id == 2:
-                cursor.execute("""
-                    SELECT SUM(total_net_income) as inc FROM income_history 
-                    WHERE snapshot_date = (SELECT MAX(snapshot_date) FROM income_history WHERE snapshot_date <= %s)
-                """, (target_date,))
-            else:
-                cursor.execute("""
-                    SELECT total_net_income as inc FROM income_history 
-                    WHERE user_id = %s AND snapshot_date <= %s 
-                    ORDER BY snapshot_date DESC LIMIT 1
-                """, (user_id, target_date))
-            res = cursor.fetchone()
-            inc = float(res['inc'] or 0)
-        else:
-            # Aggregated income for current, last_3, or lifetime
-            if period == 'last_3':
-                num_months = 3
-            elif period == 'lifetime':
-                cursor.execute("SELECT TIMESTAMPDIFF(MONTH, MIN(date), NOW()) + 1 as mos FROM transactions")
-                res = cursor.fetchone()
-                num_months = float(res['mos'] or 1)
-            else:
-                num_months = 1
-
-            # Sum One-off Income in the period
-            cursor.execute(f"SELECT SUM(ABS(total_amount)) as one_off FROM transactions WHERE category_id = %s {date_clause}", [one_off_cat_id] + date_params)
-            res = cursor.fetchone()
-            one_off_inc_total = float(res['one_off'] or 0)
-            
-            inc = (monthly_recurring_net * num_months) + one_off_inc_total
-
-        # 3. GET SPENDING (Always aggregated for period)
-        if user_id == 2:
-            cursor.execute(f"SELECT SUM(Gus_share + Joules_share) as spent FROM transactions WHERE category_id != %s {date_clause}", [one_off_cat_id] + date_params)
-        else:
-            share_col = "Gus_share" if user_id == 0 else "Joules_share"
-            cursor.execute(f"SELECT SUM({share_col}) as spent FROM transactions WHERE category_id != %s AND (user_id = %s OR ({share_col} > 0 AND user_id != %s)) {date_clause}", [one_off_cat_id, user_id, user_id] + date_params)
-        res = cursor.fetchone()
-        spent = float(res['spent'] or 0)
-        
-        # 4. GET GOALS
-        cursor.execute("SELECT * FROM user_settings WHERE user_id = %s", (0 if user_id == 2 else user_id,))
-        settings = cursor.fetchone()
-        if not settings:
-            settings = {"savings_goal_pct": 20.0, "expenses_goal_pct": 50.0}
-
-        return jsonify({
-            "net_worth": float(nw), "income": float(inc),
-            "spent": float(spent), "savings": float(inc - spent),
-            "savings_goal_pct": float(settings['savings_goal_pct']),
-            "expenses_goal_pct": float(settings['expenses_goal_pct'])
-        })
-    finally:
-        cursor.close()
+    if user_id == analytics.ALL_VIEWS:
+        results = run_queries(analytics.summary_all_queries(period), fetch=repository.fetch_all)
+        return jsonify(analytics.summary_all_payload(period, results))
+    results = run_queries(analytics.summary_queries(user_id, period))
+    return jsonify(analytics.summary_payload(period, results))
 
 
 @app.route('/api/spending/parent-categories', methods=['GET'])
 @login_required
 def get_parent_spending():
-    user_id = int(request.args.get('user_id', 0))
+    user_id = view_arg()
     period = request.args.get('period', 'current')
-    cursor = get_db().cursor(dictionary=True)
-    
-    date_clause, date_params = get_date_filter(period)
-    
-    # Get One-Off Income Category ID to exclude
-    cursor.execute("SELECT id FROM categories WHERE name = 'One-Off Income'")
-    one_off_cat = cursor.fetchone()
-    one_off_cat_id = one_off_cat['id'] if one_off_cat else -1
-
-    if user_id == 2: # Household
-        share_calc = "SUM(t.Gus_share + t.Joules_share)"
-        user_filter = "(t.Gus_share > 0 OR t.Joules_share > 0)"
-    elif user_id == 0: # Gus
-        share_calc = "SUM(t.Gus_share)"
-        user_filter = "t.Gus_share > 0"
-    else: # Joules (user_id 1)
-        share_calc = "SUM(t.Joules_share)"
-        user_filter = "t.Joules_share > 0"
-    
-    try:
-        query = f"""
-            SELECT COALESCE(NULLIF(c.parent_name, ''), 'Other') as parent_class, 
-                   {share_calc} as total
-            FROM transactions t
-            LEFT JOIN categories c ON t.category_id = c.id
-            WHERE {user_filter} AND t.category_id != %s {date_clause}
-            GROUP BY parent_class ORDER BY total DESC
-        """
-        cursor.execute(query, [one_off_cat_id] + date_params)
-        rows = cursor.fetchall()
-        return jsonify({"labels": [r['parent_class'] for r in rows], "values": [float(r['total']) for r in rows]})
-    finally:
-        cursor.close()
+    if user_id == analytics.ALL_VIEWS:
+        results = run_queries({'members': analytics.MEMBERS_QUERY,
+                               'rows': analytics.parent_spending_query(user_id, period)}, fetch=repository.fetch_all)
+        return jsonify(analytics.breakdown_all_payload(results, 'parent_class'))
+    rows = repository.fetch_all(get_db(), *analytics.parent_spending_query(user_id, period))
+    return jsonify(analytics.breakdown_payload(rows, 'parent_class'))
 
 @app.route('/api/spending/sub-categories', methods=['GET'])
 @login_required
 def get_sub_spending():
-    user_id = int(request.args.get('user_id', 0))
+    user_id = view_arg()
     parent_name = request.args.get('parent_name')
     period = request.args.get('period', 'current')
-    cursor = get_db().cursor(dictionary=True)
-    
-    date_clause, date_params = get_date_filter(period)
-    
-    if user_id == 2:
-        share_calc = "SUM(t.Gus_share + t.Joules_share)"
-        user_filter = "t.user_id IN (0, 1, 2)" # Adjusted for safety
-    elif user_id == 0:
-        share_calc = "SUM(t.Gus_share)"
-        user_filter = "t.user_id = 0"
-    else:
-        share_calc = "SUM(t.Joules_share)"
-        user_filter = "t.user_id = 1"
-
-    try:
-        query = f"""
-            SELECT c.name as sub_category, {share_calc} as total
-            FROM transactions t
-            JOIN categories c ON t.category_id = c.id
-            WHERE {user_filter} AND c.parent_name = %s {date_clause}
-            GROUP BY c.name ORDER BY total DESC
-        """
-        cursor.execute(query, [parent_name] + date_params)
-        rows = cursor.fetchall()
-        return jsonify({"labels": [r['sub_category'] for r in rows], "values": [float(r['total']) for r in rows]})
-    finally:
-        cursor.close()
+    if user_id == analytics.ALL_VIEWS:
+        results = run_queries({'members': analytics.MEMBERS_QUERY,
+                               'rows': analytics.sub_spending_query(user_id, parent_name, period)}, fetch=repository.fetch_all)
+        return jsonify(analytics.breakdown_all_payload(results, 'sub_category'))
+    rows = repository.fetch_all(get_db(), *analytics.sub_spending_query(user_id, parent_name, period))
+    return jsonify(analytics.breakdown_payload(rows, 'sub_category'))
 
 # ==========================================
 # TRANSACTIONS & CLEANUP PAGES
@@ -379,7 +305,7 @@ def get_transactions_paginated():
     
     # Fetch rows with filters
     query = f"""
-        SELECT t.id, DATE_FORMAT(t.date, '%Y-%m-%d') as clean_date, t.description, 
+        SELECT t.id, t.date as clean_date, t.description,
                t.total_amount, t.Gus_share, t.Joules_share, t.category_id, c.name as category_name
         FROM transactions t
         LEFT JOIN categories c ON t.category_id = c.id
@@ -389,14 +315,9 @@ def get_transactions_paginated():
     cursor.execute(query, params + [offset])
     rows = cursor.fetchall()
     cursor.close()
-    
-    # Ensure all numbers are float for JSON
-    for r in rows:
-        r['total_amount'] = float(r['total_amount'])
-        r['Gus_share'] = float(r['Gus_share'])
-        r['Joules_share'] = float(r['Joules_share'])
-        
-    return jsonify({"transactions": rows, "total": total_count, "page": page})
+
+    # DECIMAL and DATE columns are serialized by responses.dumps as-is
+    return responses.json_response({"transactions": responses.rows_payload(rows), "total": total_count, "page": page})
 
 @app.route('/api/transactions/update', methods=['POST'])
 @login_required
@@ -411,6 +332,10 @@ def update_transaction():
         """
         cursor.execute(query, (int(data['category_id']), data['description'], float(data['total_amount']),
                                float(data['Gus_share']), float(data['Joules_share']), int(data['id'])))
+        cursor.execute("SELECT date FROM transactions WHERE id = %s", (int(data['id']),))
+        row = cursor.fetchone()
+        if row:
+            repository.save_shares(cursor, int(data['id']), row[0], {0: float(data['Gus_share']), 1: float(data['Joules_share'])})
         db.commit()
         return jsonify({"status": "success"})
     except Exception as e:
@@ -426,6 +351,8 @@ def delete_transaction():
     db = get_db()
     cursor = db.cursor()
     try:
+        # Explicit: partitioned tables can't carry the ON DELETE CASCADE foreign key
+        cursor.execute("DELETE FROM transaction_shares WHERE transaction_id = %s", (int(data['id']),))
         query = "DELETE FROM transactions WHERE id = %s"
         cursor.execute(query, (int(data['id']),))
         db.commit()
@@ -441,21 +368,86 @@ def delete_transaction():
 def cleanup_page():
     return render_template('cleanup.html')
 
+UNCATEGORIZED_FILTER = "(c.name = 'General' OR c.parent_name = 'Uncategorized')"
+
 @app.route('/api/uncategorized')
 @login_required
 def get_uncategorized():
+    page = max(1, int(request.args.get('page', 1)))
+    page_size = min(max(1, int(request.args.get('page_size', 100))), 500)
+    offset = (page - 1) * page_size
+
     cursor = get_db().cursor(dictionary=True)
-    query = """
-        SELECT t.id, DATE_FORMAT(t.date, '%Y-%m-%d') as date, t.description, t.total_amount, c.name as current_category
-        FROM transactions t
-        JOIN categories c ON t.category_id = c.id
-        WHERE c.name = 'General' OR c.parent_name = 'Uncategorized'
-        ORDER BY t.date DESC
+    try:
+        cursor.execute(f"""
+            SELECT COUNT(*) as count
+            FROM transactions t
+            JOIN categories c ON t.category_id = c.id
+            WHERE {UNCATEGORIZED_FILTER}
+        """)
+        total_count = cursor.fetchone()['count']
+
+        query = f"""
+            SELECT t.id, t.date, t.description, t.total_amount, c.name as current_category
+            FROM transactions t
+            JOIN categories c ON t.category_id = c.id
+            WHERE {UNCATEGORIZED_FILTER}
+            ORDER BY t.date DESC, t.id DESC LIMIT %s OFFSET %s
+        """
+        cursor.execute(query, (page_size, offset))
+        results = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    return responses.json_response({"transactions": responses.rows_payload(results), "total": total_count,
+                                    "page": page, "page_size": page_size})
+
+@app.route('/api/bulk_update_category', methods=['POST'])
+@login_required
+def bulk_update_category():
     """
-    cursor.execute(query)
-    results = cursor.fetchall()
-    cursor.close()
-    return jsonify(results)
+    Recategorizes many transactions in one DB transaction.
+    Accepts either explicit pairs:
+        {"updates": [{"transaction_id": 1, "category_id": 5}, ...]}
+    or a description rule:
+        {"rule": {"contains": "Tesco", "category_id": 5, "only_uncategorized": true}}
+    """
+    data = request.json or {}
+    db = get_db()
+    cursor = db.cursor()
+    try:
+        updated = 0
+
+        if data.get('updates'):
+            pairs = [(int(u['transaction_id']), int(u['category_id'])) for u in data['updates']]
+            updated = bulk_set_categories(cursor, pairs)
+
+        elif data.get('rule'):
+            rule = data['rule']
+            pattern = str(rule.get('contains', '')).strip()
+            if not pattern:
+                return jsonify({"error": "Rule requires a non-empty 'contains' pattern"}), 400
+            # Escape LIKE wildcards so the rule is a plain substring match ('!' works as ESCAPE on every backend)
+            like = '%' + pattern.replace('!', '!!').replace('%', '!%').replace('_', '!_') + '%'
+            scope = f"WHERE {UNCATEGORIZED_FILTER}" if rule.get('only_uncategorized', True) else ""
+            cursor.execute(f"""
+                UPDATE transactions SET category_id = %s
+                WHERE description LIKE %s ESCAPE '!'
+                  AND category_id IN (SELECT c.id FROM categories c {scope})
+            """, (int(rule['category_id']), like))
+            updated = cursor.rowcount
+
+        else:
+            return jsonify({"error": "Provide either 'updates' or 'rule'"}), 400
+
+        db.commit()
+        return jsonify({"status": "success", "updated": updated})
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error bulk updating categories: {e}")
+        return jsonify({"error": str(e)}), 500
+    finally:
+        cursor.close()
 
 # ==========================================
 # INPUT (MANUAL & CSV) PAGES
@@ -532,6 +524,7 @@ def save_manual_income_entry():
 
         cursor.execute(query, (data['date'], data['description'], -total, user_id, int(data['category_id']), 
                                user_id, g_share, j_share, 0, t_hash))
+        repository.save_shares(cursor, cursor.lastrowid, data['date'], {0: g_share, 1: j_share})
         db.commit()
         return jsonify({"status": "success"}), 201
     except Exception as e:
@@ -677,6 +670,7 @@ def save_manual_expense():
             1 if data['split_gus'] > 0 and data['split_joules'] > 0 else 0,
             t_hash
         ))
+        repository.save_shares(cursor, cursor.lastrowid, data['date'], {0: data['split_gus'], 1: data['split_joules']})
         db.commit()
         return jsonify({"status": "success"}), 201
     except mysql.connector.errors.IntegrityError:
@@ -710,7 +704,7 @@ def list_budget_categories():
     cursor.execute(query, (user_id,))
     rows = cursor.fetchall()
     cursor.close()
-    return jsonify(rows)
+    return responses.json_response(responses.rows_payload(rows))
 
 @app.route('/api/budget/settings', methods=['GET', 'POST'])
 @login_required
@@ -861,55 +855,14 @@ def delete_income():
 @app.route('/api/budget/progress')
 @login_required
 def budget_progress():
-    user_id = int(request.args.get('user_id', 0))
+    user_id = view_arg()
     parent_name = request.args.get('parent_name')
     period = request.args.get('period', 'current')
-    cursor = get_db().cursor(dictionary=True)
-    
-    date_clause, date_params = get_date_filter(period, table_alias='t')
-    
-    if user_id == 2:
-        share_calc = "t.Gus_share + t.Joules_share"
-        user_filter = "(t.Gus_share > 0 OR t.Joules_share > 0)"
-    else:
-        share_calc = "t.Gus_share" if user_id == 0 else "t.Joules_share"
-        user_filter = f"t.{'Gus' if user_id == 0 else 'Joules'}_share > 0"
-
-    try:
-        if parent_name:
-            query = f"""
-                SELECT 
-                    c.name as label,
-                    COALESCE(b.target_amount, 0) as budget,
-                    COALESCE(SUM({share_calc}), 0) as actual
-                FROM categories c
-                LEFT JOIN budgets b ON c.name = b.category_name AND b.user_id = %s
-                LEFT JOIN transactions t ON c.id = t.category_id {date_clause}
-                WHERE c.parent_name = %s
-                GROUP BY c.name, b.target_amount
-            """
-            cursor.execute(query, [user_id] + date_params + [parent_name])
-        else:
-            query = f"""
-                SELECT 
-                    COALESCE(c.parent_name, 'Other') as label,
-                    SUM(DISTINCT b.target_amount) as budget,
-                    COALESCE(SUM({share_calc}), 0) as actual
-                FROM categories c
-                LEFT JOIN (
-                    SELECT category_name, SUM(target_amount) as target_amount 
-                    FROM budgets WHERE user_id = %s GROUP BY category_name
-                ) b ON c.name = b.category_name
-                LEFT JOIN transactions t ON c.id = t.category_id {date_clause}
-                WHERE {user_filter}
-                GROUP BY c.parent_name
-            """
-            cursor.execute(query, [user_id] + date_params)
-            
-        rows = cursor.fetchall()
-        return jsonify(rows)
-    finally:
-        cursor.close()
+    if user_id == analytics.ALL_VIEWS:
+        results = run_queries(analytics.budget_progress_all_queries(parent_name, period), fetch=repository.fetch_all)
+        return jsonify(analytics.budget_progress_all_payload(parent_name, results))
+    rows = repository.fetch_all(get_db(), *analytics.budget_progress_query(user_id, parent_name, period))
+    return jsonify(rows)
 
 @app.route('/api/finance/available-months')
 @login_required
@@ -927,45 +880,12 @@ def get_available_months():
 @app.route('/api/finance/burn-rate')
 @login_required
 def calculate_burn_rate():
-    user_id = int(request.args.get('user_id', 0))
-    cursor = get_db().cursor(dictionary=True)
-    
-    if user_id == 2:
-        share_calc = "SUM(t.Gus_share + t.Joules_share)"
-        user_filter = "(t.Gus_share > 0 OR t.Joules_share > 0)"
-    else:
-        share_calc = f"SUM(t.{'Gus' if user_id == 0 else 'Joules'}_share)"
-        user_filter = f"t.{'Gus' if user_id == 0 else 'Joules'}_share > 0"
-
-    periods = {
-        "30d": "INTERVAL 30 DAY",
-        "3m": "INTERVAL 3 MONTH",
-        "1y": "INTERVAL 1 YEAR",
-        "lifetime": None
-    }
-    
-    results = {}
-    try:
-        for key, interval in periods.items():
-            date_condition = f"AND t.date >= DATE_SUB(CURDATE(), {interval})" if interval else ""
-            query = f"""
-                SELECT {share_calc} as total, 
-                       TIMESTAMPDIFF(MONTH, MIN(t.date), CURDATE()) + 1 as months
-                FROM transactions t
-                WHERE {user_filter} {date_condition}
-            """
-            cursor.execute(query)
-            row = cursor.fetchone()
-            total_spend = float(row['total'] or 0)
-            num_months = 1 if key == "30d" else (row['months'] or 1)
-            avg_burn = total_spend / num_months
-            results[key] = {
-                "actual": avg_burn,
-                "cushioned": avg_burn * 1.15
-            }
-        return jsonify(results)
-    finally:
-        cursor.close()
+    user_id = view_arg()
+    if user_id == analytics.ALL_VIEWS:
+        results = run_queries({'members': analytics.MEMBERS_QUERY, 'rows': analytics.burn_rate_all_query()}, fetch=repository.fetch_all)
+        return jsonify(analytics.burn_rate_all_payload(results))
+    results = run_queries(analytics.burn_rate_queries(user_id))
+    return jsonify(analytics.burn_rate_payload(results))
 
 # ==========================================
 # NET WORTH & ASSETS PAGES
@@ -1041,31 +961,17 @@ def delete_asset():
 @app.route('/api/finance/history')
 @login_required
 def finance_history():
-    user_id = int(request.args.get('user_id', 0))
-    cursor = get_db().cursor(dictionary=True)
-    if user_id == 2:
-        query = """
-            WITH DateRange AS (SELECT DISTINCT snapshot_date FROM net_worth_history UNION SELECT DISTINCT snapshot_date FROM income_history)
-            SELECT d.snapshot_date,
-                   (SELECT SUM(total_value) FROM net_worth_history WHERE snapshot_date = d.snapshot_date) as nw_total,
-                   (SELECT SUM(total_net_income) FROM income_history WHERE snapshot_date = d.snapshot_date) as inc_total
-            FROM DateRange d ORDER BY d.snapshot_date ASC
-        """
-        cursor.execute(query)
-    else:
-        query = """
-            SELECT n.snapshot_date, n.total_value as nw_total, COALESCE(i.total_net_income, 0) as inc_total
-            FROM net_worth_history n LEFT JOIN income_history i ON n.snapshot_date = i.snapshot_date AND n.user_id = i.user_id
-            WHERE n.user_id = %s ORDER BY n.snapshot_date ASC
-        """
-        cursor.execute(query, (user_id,))
-    rows = cursor.fetchall()
-    cursor.close()
-    return jsonify({
-        "dates": [r['snapshot_date'].strftime('%d %b') for r in rows],
-        "nw_values": [float(r['nw_total'] or 0) for r in rows],
-        "inc_values": [float(r['inc_total'] or 0) for r in rows]
-    })
+    user_id = view_arg()
+    try:
+        max_points, start, end = history_service.parse_view_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if user_id == analytics.ALL_VIEWS:
+        results = run_queries({'members': analytics.MEMBERS_QUERY, 'rows': history_service.history_rows_query()}, fetch=repository.fetch_all)
+        return jsonify(history_service.chart_views(results['rows'], analytics.view_ids(results['members']), max_points, start, end))
+    series = history_service.get_series(get_db(), user_id)
+    series = history_service.downsample(history_service.window(series, start, end), max_points)
+    return jsonify(history_service.chart_payload(series))
 
 # ==========================================
 # SHARED CORE APIS (Categories)
@@ -1083,48 +989,13 @@ def get_categories():
 @app.route('/api/finance/housing-ratio')
 @login_required
 def get_housing_ratio():
-    user_id = int(request.args.get('user_id', 0))
+    user_id = view_arg()
     period = request.args.get('period', 'current')
-    cursor = get_db().cursor(dictionary=True)
-    
-    date_clause, date_params = get_date_filter(period, table_alias='t')
-    
-    try:
-        # 1. Get Monthly Net Income
-        if user_id == 2: # Household
-            cursor.execute("SELECT SUM(monthly_gross * (1 - tax_rate/100)) as inc FROM income_streams")
-        else: # Gus (0) or Joules (1)
-            cursor.execute("SELECT SUM(monthly_gross * (1 - tax_rate/100)) as inc FROM income_streams WHERE user_id = %s", (user_id,))
-        inc_res = cursor.fetchone()
-        income = float(inc_res['inc'] or 0)
-
-        # 2. Get Monthly Housing Costs (Rent, Utilities, Home Maintenance)
-        # Categories with parent_name 'Home' or 'Utilities'
-        if user_id == 2:
-            share_calc = "SUM(t.Gus_share + t.Joules_share)"
-        else:
-            share_calc = f"SUM(t.{'Gus' if user_id == 0 else 'Joules'}_share)"
-
-        query = f"""
-            SELECT {share_calc} as total
-            FROM transactions t
-            JOIN categories c ON t.category_id = c.id
-            WHERE (c.parent_name IN ('Home', 'Utilities'))
-            {date_clause}
-        """
-        cursor.execute(query, date_params)
-        cost_res = cursor.fetchone()
-        housing_cost = float(cost_res['total'] or 0)
-
-        ratio = (housing_cost / income * 100) if income > 0 else 0
-        
-        return jsonify({
-            "income": income,
-            "housing_cost": housing_cost,
-            "ratio": round(ratio, 1)
-        })
-    finally:
-        cursor.close()
+    if user_id == analytics.ALL_VIEWS:
+        results = run_queries(analytics.housing_all_queries(period), fetch=repository.fetch_all)
+        return jsonify(analytics.housing_all_payload(results))
+    results = run_queries(analytics.housing_queries(user_id, period))
+    return jsonify(analytics.housing_payload(results))
 
 @app.route('/api/update_category', methods=['POST'])
 @login_required
@@ -1153,60 +1024,16 @@ def take_financial_snapshot():
     cursor = db.cursor(dictionary=True)
     
     try:
-        # 1. Calculate Total Net Worth for current user
-        cursor.execute("SELECT SUM(current_value) as nw FROM assets WHERE user_id = %s", (user_id,))
-        nw_res = cursor.fetchone()
-        nw_total = float(nw_res['nw'] or 0)
-        
-        # 2. Calculate Total Net Income for current user
-        cursor.execute("SELECT SUM(monthly_gross * (1 - tax_rate/100)) as inc FROM income_streams WHERE user_id = %s", (user_id,))
-        inc_res = cursor.fetchone()
-        inc_total = float(inc_res['inc'] or 0)
-        
-        # 3. Save to History for current user
-        cursor.execute("""
-            INSERT INTO net_worth_history (user_id, snapshot_date, total_value) 
-            VALUES (%s, %s, %s)
-            ON DUPLICATE KEY UPDATE total_value = VALUES(total_value)
-        """, (user_id, today, nw_total))
-        
-        cursor.execute("""
-            INSERT INTO income_history (user_id, snapshot_date, total_net_income) 
-            VALUES (%s, %s, %s)
-            ON DUPLICATE KEY UPDATE total_net_income = VALUES(total_net_income)
-        """, (user_id, today, inc_total))
-
-        # --- SMEARING LOGIC FOR HOUSEHOLD VIEW ---
-        other_user_id = 1 if user_id == 0 else 0
-        
-        # Ensure other user has records for today (LOF)
-        # Net Worth
-        cursor.execute("SELECT id FROM net_worth_history WHERE user_id = %s AND snapshot_date = %s", (other_user_id, today))
-        if not cursor.fetchone():
-            cursor.execute("""
-                SELECT total_value FROM net_worth_history 
-                WHERE user_id = %s AND snapshot_date < %s 
-                ORDER BY snapshot_date DESC LIMIT 1
-            """, (other_user_id, today))
-            prev = cursor.fetchone()
-            if prev:
-                cursor.execute("INSERT INTO net_worth_history (user_id, snapshot_date, total_value) VALUES (%s, %s, %s)", 
-                               (other_user_id, today, float(prev['total_value'])))
-
-        # Income
-        cursor.execute("SELECT id FROM income_history WHERE user_id = %s AND snapshot_date = %s", (other_user_id, today))
-        if not cursor.fetchone():
-            cursor.execute("""
-                SELECT total_net_income FROM income_history 
-                WHERE user_id = %s AND snapshot_date < %s 
-                ORDER BY snapshot_date DESC LIMIT 1
-            """, (other_user_id, today))
-            prev = cursor.fetchone()
-            if prev:
-                cursor.execute("INSERT INTO income_history (user_id, snapshot_date, total_net_income) VALUES (%s, %s, %s)", 
-                               (other_user_id, today, float(prev['total_net_income'])))
-        
+        # Snapshot every user at once; users without live data are carried forward (LOF)
+        totals = snapshot_all_users(cursor, today)
         db.commit()
+
+        if user_id == 2: # Household
+            nw_total = sum(t['nw'] for t in totals.values())
+            inc_total = sum(t['inc'] for t in totals.values())
+        else:
+            nw_total = totals.get(user_id, {}).get('nw', 0.0)
+            inc_total = totals.get(user_id, {}).get('inc', 0.0)
         return jsonify({"status": "success", "nw": nw_total, "inc": inc_total})
     except Exception as e:
         logger.error(f"Snapshot Error: {e}")
@@ -1256,6 +1083,24 @@ def setup_db():
     finally:
         cursor.close()
 
+@app.route('/api/admin/slow-queries', methods=['GET', 'DELETE'])
+@login_required
+def admin_slow_queries():
+    """Browse (or clear) captured slow statements with their EXPLAIN plans."""
+    if current_user.name != 'Gus':
+        return jsonify({"error": "Unauthorized"}), 403
+
+    if request.method == 'DELETE':
+        slow_query_log.clear()
+        return jsonify({"status": "success"})
+
+    limit = request.args.get('limit', 50, type=int)
+    min_ms = request.args.get('min_ms', type=float)
+    return jsonify({
+        "threshold_ms": slow_query_log.threshold_ms,
+        "queries": slow_query_log.entries(limit=limit, min_ms=min_ms)
+    })
+
 @app.route('/networth-explorer')
 @login_required
 def networth_explorer():
@@ -1265,46 +1110,23 @@ def networth_explorer():
 @login_required
 def get_raw_history():
     user_id = int(request.args.get('user_id', 0))
-    cursor = get_db().cursor(dictionary=True)
-    
-    if user_id == 2:
-        # Household: Combined view + Individual breakdowns
-        query = """
-            SELECT 
-                n.snapshot_date, 
-                SUM(n.total_value) as nw_total, 
-                SUM(i.total_net_income) as inc_total,
-                MAX(CASE WHEN n.user_id = 0 THEN n.total_value ELSE 0 END) as nw_gus,
-                MAX(CASE WHEN n.user_id = 1 THEN n.total_value ELSE 0 END) as nw_joules,
-                MAX(CASE WHEN i.user_id = 0 THEN i.total_net_income ELSE 0 END) as inc_gus,
-                MAX(CASE WHEN i.user_id = 1 THEN i.total_net_income ELSE 0 END) as inc_joules
-            FROM net_worth_history n
-            LEFT JOIN income_history i ON n.snapshot_date = i.snapshot_date AND n.user_id = i.user_id
-            GROUP BY n.snapshot_date
-            ORDER BY n.snapshot_date DESC
-        """
-        cursor.execute(query)
-    else:
-        # Individual view
-        query = """
-            SELECT n.id as nw_id, i.id as inc_id, n.snapshot_date, 
-                   n.total_value as nw_total, i.total_net_income as inc_total
-            FROM net_worth_history n
-            LEFT JOIN income_history i ON n.snapshot_date = i.snapshot_date AND n.user_id = i.user_id
-            WHERE n.user_id = %s
-            ORDER BY n.snapshot_date DESC
-        """
-        cursor.execute(query, (user_id,))
-        
-    rows = cursor.fetchall()
-    cursor.close()
-    
-    # Format dates for JSON
-    for r in rows:
-        if r['snapshot_date']:
-            r['snapshot_date'] = r['snapshot_date'].strftime('%Y-%m-%d')
-            
-    return jsonify(rows)
+    try:
+        max_points, start, end = history_service.parse_view_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    limit, offset = history_service.parse_page_args(request.args)
+    # Household: LOCF-aligned combined view + individual breakdowns
+    series = history_service.get_series(get_db(), user_id)
+    series = history_service.downsample(history_service.window(series, start, end), max_points)
+
+    # Explorer lists newest snapshots first; limit/offset page through that order
+    series = series[::-1]
+    total = len(series)
+    if limit is not None or offset:
+        series = series[offset:offset + limit if limit is not None else None]
+    response = responses.json_response(responses.rows_payload(history_service.explorer_rows(series, user_id)))
+    response.headers['X-Total-Count'] = str(total)
+    return response
 
 @app.route('/api/finance/history/update', methods=['POST'])
 @login_required
@@ -1395,7 +1217,13 @@ def delete_history_entry():
     finally:
         cursor.close()
 
+def start_background_jobs():
+    """Starts in-process timers. Called once per serving process (after fork under gunicorn)."""
+    if app.config['AUTO_SNAPSHOT_HOURS'] > 0:
+        start_snapshot_timer(app.config['AUTO_SNAPSHOT_HOURS'], lock_dir=app.config['MULTIPROC_DIR'])
+
 if __name__ == '__main__':
-    # For production, use gunicorn
+    # For production, use gunicorn with gunicorn.conf.py
     # Enabled threaded=True to handle parallel dashboard API calls efficiently
+    start_background_jobs()
     app.run(debug=app.config['DEBUG'], host='0.0.0.0', port=5001, threaded=True)
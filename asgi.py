@@ -0,0 +1,18 @@
+from hypercorn.middleware import AsyncioWSGIMiddleware
+
+from app import app as flask_app, start_background_jobs
+from async_api import app as async_app, ASYNC_PATHS
+
+# One ASGI process: the read-only analytics APIs run on the event loop (async_api.py),
+# every other route is the unchanged Flask app running in the loop's thread pool.
+wsgi_app = AsyncioWSGIMiddleware(flask_app)
+
+@async_app.before_serving
+async def start_jobs():
+    start_background_jobs()
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan' or scope.get('path') in ASYNC_PATHS:
+        await async_app(scope, receive, send)
+    else:
+        await wsgi_app(scope, receive, send)
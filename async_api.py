@@ -0,0 +1,152 @@
+import re
+import time
+import asyncio
+import logging
+from functools import wraps
+
+import aiomysql
+from quart import Quart, jsonify, request, session
+
+from config import Config
+import analytics
+import history_service
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Read-only analytics endpoints served from the event loop. The SQL and payload
+# shaping live in analytics.py / history_service.py, shared with app.py, so both
+# paths return identical JSON.
+app = Quart(__name__)
+app.config.from_object(Config)
+
+_pool = None
+
+# pymysql-style drivers %-format the whole statement when params are given
+_LITERAL_PERCENT = re.compile(r"%(?!s)")
+
+@app.before_serving
+async def open_pool():
+    global _pool
+    _pool = await aiomysql.create_pool(
+        host=Config.DB_HOST,
+        user=Config.DB_USER,
+        password=Config.DB_PASS,
+        db=Config.DB_NAME,
+        minsize=1,
+        maxsize=Config.DB_POOL_SIZE,
+        pool_recycle=Config.DB_POOL_RECYCLE,
+        autocommit=True
+    )
+
+@app.after_serving
+async def close_pool():
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+
+async def fetch(sql, params=None, one=False):
+    """Runs one statement on its own pooled connection; returns a row dict (one=True) or all rows."""
+    if params:
+        sql = _LITERAL_PERCENT.sub('%%', sql)
+    started = time.perf_counter()
+    async with _pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute(sql, params or None)
+            result = await (cursor.fetchone() if one else cursor.fetchall())
+    metrics.sql_latency.observe((metrics.normalize_sql(sql),), time.perf_counter() - started)
+    return result
+
+async def fetch_many(queries, one=True):
+    """Runs independent name -> (sql, params) queries concurrently; returns name -> first row (or all rows)."""
+    rows = await asyncio.gather(*(fetch(sql, params, one=one) for sql, params in queries.values()))
+    return dict(zip(queries, rows))
+
+def view_arg():
+    value = request.args.get('user_id', 0)
+    return value if value == analytics.ALL_VIEWS else int(value)
+
+def login_required(view):
+    # Same signed session cookie as the Flask app (shared SECRET_KEY), set by flask_login
+    @wraps(view)
+    async def wrapper(*args, **kwargs):
+        if not app.config.get('LOGIN_DISABLED') and session.get('_user_id') is None:
+            return jsonify({"error": "Login required"}), 401
+        return await view(*args, **kwargs)
+    return wrapper
+
+@app.route('/api/dashboard/summary')
+@login_required
+async def dashboard_summary():
+    user_id = view_arg()
+    period = request.args.get('period', 'current')
+    if user_id == analytics.ALL_VIEWS:
+        results = await fetch_many(analytics.summary_all_queries(period), one=False)
+        return jsonify(analytics.summary_all_payload(period, results))
+    results = await fetch_many(analytics.summary_queries(user_id, period))
+    return jsonify(analytics.summary_payload(period, results))
+
+@app.route('/api/spending/parent-categories')
+@login_required
+async def get_parent_spending():
+    user_id = view_arg()
+    period = request.args.get('period', 'current')
+    if user_id == analytics.ALL_VIEWS:
+        results = await fetch_many({'members': analytics.MEMBERS_QUERY,
+                                    'rows': analytics.parent_spending_query(user_id, period)}, one=False)
+        return jsonify(analytics.breakdown_all_payload(results, 'parent_class'))
+    rows = await fetch(*analytics.parent_spending_query(user_id, period))
+    return jsonify(analytics.breakdown_payload(rows, 'parent_class'))
+
+@app.route('/api/spending/sub-categories')
+@login_required
+async def get_sub_spending():
+    user_id = view_arg()
+    parent_name = request.args.get('parent_name')
+    period = request.args.get('period', 'current')
+    if user_id == analytics.ALL_VIEWS:
+        results = await fetch_many({'members': analytics.MEMBERS_QUERY,
+                                    'rows': analytics.sub_spending_query(user_id, parent_name, period)}, one=False)
+        return jsonify(analytics.breakdown_all_payload(results, 'sub_category'))
+    rows = await fetch(*analytics.sub_spending_query(user_id, parent_name, period))
+    return jsonify(analytics.breakdown_payload(rows, 'sub_category'))
+
+@app.route('/api/finance/burn-rate')
+@login_required
+async def calculate_burn_rate():
+    user_id = view_arg()
+    if user_id == analytics.ALL_VIEWS:
+        results = await fetch_many({'members': analytics.MEMBERS_QUERY, 'rows': analytics.burn_rate_all_query()}, one=False)
+        return jsonify(analytics.burn_rate_all_payload(results))
+    results = await fetch_many(analytics.burn_rate_queries(user_id))
+    return jsonify(analytics.burn_rate_payload(results))
+
+@app.route('/api/finance/housing-ratio')
+@login_required
+async def get_housing_ratio():
+    user_id = view_arg()
+    period = request.args.get('period', 'current')
+    if user_id == analytics.ALL_VIEWS:
+        results = await fetch_many(analytics.housing_all_queries(period), one=False)
+        return jsonify(analytics.housing_all_payload(results))
+    results = await fetch_many(analytics.housing_queries(user_id, period))
+    return jsonify(analytics.housing_payload(results))
+
+@app.route('/api/finance/history')
+@login_required
+async def finance_history():
+    user_id = view_arg()
+    try:
+        max_points, start, end = history_service.parse_view_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if user_id == analytics.ALL_VIEWS:
+        results = await fetch_many({'members': analytics.MEMBERS_QUERY, 'rows': history_service.history_rows_query()}, one=False)
+        return jsonify(history_service.chart_views(results['rows'], analytics.view_ids(results['members']), max_points, start, end))
+    rows = await fetch(*history_service.history_rows_query(history_service.series_query_user(user_id)))
+    series = history_service.series_from_rows(rows, user_id)
+    series = history_service.downsample(history_service.window(series, start, end), max_points)
+    return jsonify(history_service.chart_payload(series))
+
+# Paths asgi.py routes here instead of to the Flask app
+ASYNC_PATHS = {rule.rule for rule in app.url_map.iter_rules() if rule.rule.startswith('/api/')}
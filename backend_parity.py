@@ -0,0 +1,300 @@
+import os
+import sys
+import json
+import argparse
+import tempfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from config import Config
+from db import get_connection
+from benchmark import build_cases
+
+# Surrogate keys come from each engine's auto-increment (InnoDB burns ids on INSERT IGNORE), so they are not compared
+ID_KEYS = {'id', 'transaction_id', 'nw_id', 'inc_id'}
+VOLATILE_KEYS = {'created_at', 'last_updated'}
+
+# Final table contents, keyed by natural columns only
+TABLE_DUMPS = {
+    'transactions': """
+        SELECT date, description, total_amount, user_id, category_id, payer_id,
+               Gus_share, Joules_share, is_split, HEX(transaction_hash) as hash
+        FROM transactions
+    """,
+    'transaction_shares': """
+        SELECT HEX(t.transaction_hash) as hash, s.user_id, s.date, s.share
+        FROM transaction_shares s JOIN transactions t ON t.id = s.transaction_id
+    """,
+    'net_worth_history': "SELECT user_id, snapshot_date, total_value FROM net_worth_history",
+    'income_history': "SELECT user_id, snapshot_date, total_net_income FROM income_history",
+    'assets': "SELECT user_id, asset_name, asset_type, current_value FROM assets",
+    'income_streams': "SELECT user_id, source_name, monthly_gross, tax_rate FROM income_streams",
+    'savings': "SELECT user_id, date, category_id, amount, description FROM savings",
+    'budgets': "SELECT user_id, category_name, target_amount FROM budgets",
+    'user_settings': "SELECT user_id, savings_goal_pct, expenses_goal_pct FROM user_settings",
+}
+
+# Read-only endpoints not covered by benchmark.build_cases
+EXTRA_READS = [
+    '/api/transactions?period=lifetime',
+    '/api/transactions?period=lifetime&page=2',
+    '/api/uncategorized',
+    '/api/categories',
+    '/api/budget/list?user_id=0',
+    '/api/budget/settings?user_id=0',
+    '/api/income?user_id=0',
+    '/api/income?user_id=1',
+    '/api/networth?user_id=0',
+    '/api/networth?user_id=1',
+    '/api/finance/available-months',
+    '/api/finance/history/raw?user_id=0',
+    '/api/finance/history/raw?user_id=2',
+    '/api/finance/history/raw?user_id=2&limit=3&offset=1',
+    '/api/spending/sub-categories?parent_name=Food&period=lifetime',
+]
+
+def splitwise_csv(today):
+    """
+    A small Splitwise export: shared and solo rows, a payment, a footer and uncategorized rows.
+    Every row gets its own date, so ORDER BY date never has ties the engines may break differently.
+    """
+    rows = [("Date", "Description", "Category", "Cost", "Currency", "Gus", "Joules")]
+    for months_back in range(6):
+        day = lambda i: (today - timedelta(days=10 + months_back * 30 + i)).isoformat()
+        rows += [
+            (day(0), f"Tesco weekly {months_back}", "Groceries", "84.20", "EUR", "42.10", "-42.10"),
+            (day(1), f"Rent {months_back}", "Rent", "1200.00", "EUR", "-600.00", "600.00"),
+            (day(2), f"Electric Ireland {months_back}", "Electricity", "90.01", "EUR", "45.00", "-45.01"),
+            (day(3), f"Cinema {months_back}", "Entertainment", "24.00", "EUR", "24.00", "0.00"),
+            (day(4), f"Misc shop {months_back}", "General", "17.35", "EUR", "0.00", "17.35"),
+        ]
+    rows += [
+        (today.isoformat(), "Settle up", "Payment", "300.00", "EUR", "300.00", "-300.00"),
+        (today.isoformat(), "Total balance", "", "0", "EUR", "0", "0"),
+    ]
+    return "\n".join(",".join(r) for r in rows) + "\n"
+
+def lookup(sql, params):
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+        cursor.close()
+        return row[0] if row else None
+    finally:
+        conn.close()
+
+def category_id(name):
+    return lookup("SELECT id FROM categories WHERE name = %s", (name,))
+
+def transaction_id(description):
+    return lookup("SELECT id FROM transactions WHERE description = %s", (description,))
+
+def run_scenario(client, months):
+    """
+    Drives every write path through the HTTP API, then every read endpoint. Returns
+    [(step, status, body)] in order.
+    """
+    results = []
+    today = date.today()
+
+    def call(name, url, payload=None, method=None, **kwargs):
+        method = method or ('POST' if payload is not None or kwargs else 'GET')
+        res = client.open(url, method=method, json=payload, **kwargs)
+        results.append((name, res.status_code, res.get_json(silent=True)))
+        return res
+
+    # Imports: the second upload must only report duplicates
+    csv_path = os.path.join(tempfile.mkdtemp(), 'parity_import.csv')
+    with open(csv_path, 'w') as f:
+        f.write(splitwise_csv(today))
+    for label in ('import', 'import_again'):
+        with open(csv_path, 'rb') as f:
+            call(label, '/api/upload_csv', data={'file': (f, 'parity_import.csv')}, content_type='multipart/form-data')
+    os.remove(os.path.join(Config.UPLOAD_FOLDER, 'parity_import.csv'))
+
+    # Manual entries
+    call('expense_manual', '/api/expense/manual', {
+        'date': today.isoformat(), 'description': 'Hardware store', 'amount': 60.5,
+        'category_id': category_id('Shopping'), 'category_name': 'Shopping', 'split_gus': 30.25, 'split_joules': 30.25})
+    call('expense_manual_duplicate', '/api/expense/manual', {
+        'date': today.isoformat(), 'description': 'Hardware store', 'amount': 60.5,
+        'category_id': category_id('Shopping'), 'category_name': 'Shopping', 'split_gus': 30.25, 'split_joules': 30.25})
+    call('income_manual', '/api/income/manual', {
+        'date': (today - timedelta(days=1)).isoformat(), 'description': 'Bonus', 'amount': 500, 'user_id': 1,
+        'category_id': category_id('General')})
+    call('savings_manual', '/api/savings/manual', {
+        'date': today.isoformat(), 'amount': 150, 'user_id': 0, 'category_id': category_id('General'),
+        'description': 'Index fund'})
+
+    # Transaction edits
+    call('transaction_update', '/api/transactions/update', {
+        'id': transaction_id('Cinema 1'), 'category_id': category_id('Travel'), 'description': 'Cinema 1 (edited)',
+        'total_amount': 30, 'Gus_share': 10, 'Joules_share': 20})
+    call('transaction_category', '/api/update_category', {
+        'transaction_id': transaction_id('Tesco weekly 2'), 'category_id': category_id('Dining out')})
+    call('transaction_delete', '/api/transactions/delete', {'id': transaction_id('Cinema 2')})
+
+    # Bulk recategorization, both forms, plus a rule that must match nothing
+    call('bulk_updates', '/api/bulk_update_category', {'updates': [
+        {'transaction_id': transaction_id('Misc shop 0'), 'category_id': category_id('Health')},
+        {'transaction_id': transaction_id('Misc shop 1'), 'category_id': category_id('Health')}]})
+    call('bulk_rule', '/api/bulk_update_category', {'rule': {'contains': 'Misc shop', 'category_id': category_id('Shopping')}})
+    call('bulk_rule_wildcards', '/api/bulk_update_category', {'rule': {'contains': '100%_', 'category_id': category_id('Shopping')}})
+    call('bulk_rule_invalid', '/api/bulk_update_category', {'rule': {'contains': ' ', 'category_id': 1}})
+
+    # Budgets, income streams and assets (the snapshot inputs)
+    call('budget_items', '/api/budget/save_items', {'user_id': 0, 'items': [
+        {'name': 'Groceries', 'amount': 300}, {'name': 'Rent', 'amount': 600}],
+        'savings_goal_pct': 25, 'expenses_goal_pct': 55})
+    call('budget_settings', '/api/budget/settings?user_id=1', {'savings_goal_pct': 10, 'expenses_goal_pct': 60})
+    for user_id, source, gross, tax in ((0, 'Salary', 4000, 30), (1, 'Salary', 3500, 28.5), (1, 'Freelance', 400, 20)):
+        call(f'income_add_{user_id}_{source}', f'/api/income?user_id={user_id}', {'source': source, 'gross': gross, 'tax': tax})
+    freelance = lookup("SELECT id FROM income_streams WHERE source_name = %s", ('Freelance',))
+    call('income_update', '/api/income/update', {'id': freelance, 'source': 'Freelance', 'gross': 450, 'tax': 20})
+    for user_id, name, kind, value in ((0, 'Savings account', 'Cash', 12000), (0, 'ETF', 'Investment', 8000),
+                                       (1, 'Pension', 'Investment', 20000)):
+        call(f'asset_add_{user_id}_{name}', '/api/networth/update', {'user_id': user_id, 'name': name, 'type': kind, 'value': value})
+    etf = lookup("SELECT id FROM assets WHERE asset_name = %s", ('ETF',))
+    call('asset_update', '/api/networth/update', {'id': etf, 'value': 8250.75})
+    call('asset_rename', '/api/networth/edit-name', {'id': etf, 'name': 'World ETF'})
+
+    # History: backdated edits (with household smearing), a snapshot, then a delete
+    for days_back, nw, inc in ((90, 30000, 2700), (60, 31000, 2750), (30, 32500, 2800)):
+        call(f'history_update_{days_back}', '/api/finance/history/update', {
+            'user_id': 0, 'date': (today - timedelta(days=days_back)).isoformat(), 'nw_total': nw, 'inc_total': inc})
+    call('history_update_joules', '/api/finance/history/update', {
+        'user_id': 1, 'date': (today - timedelta(days=45)).isoformat(), 'nw_total': 19000, 'inc_total': 2500})
+    call('history_update_household', '/api/finance/history/update', {'user_id': 2, 'date': today.isoformat()})
+    for user_id in (0, 2):
+        call(f'snapshot_{user_id}', '/api/finance/snapshot', {'user_id': user_id})
+    call('history_delete', '/api/finance/history/delete', {'user_id': 0, 'date': (today - timedelta(days=60)).isoformat()})
+
+    # Deletes last, so the rows above took part in the snapshot
+    call('income_delete', '/api/income/delete', {'id': freelance})
+    call('asset_delete', '/api/networth/delete', {'id': etf})
+
+    for name, user_id, period, url in build_cases(months):
+        call(f"{name}[user={user_id},period={period}]", url)
+    for url in EXTRA_READS:
+        call(url, url)
+    return results
+
+def dump_tables():
+    conn = get_connection()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        tables = {}
+        for table, sql in TABLE_DUMPS.items():
+            cursor.execute(sql)
+            rows = [normalize(r) for r in cursor.fetchall()]
+            tables[table] = sorted(rows, key=lambda r: json.dumps(r, sort_keys=True))
+        cursor.close()
+        return tables
+    finally:
+        conn.close()
+
+def normalize(value):
+    """Drops surrogate ids and timestamps, rounds numbers to cents and stringifies dates so backends compare equal."""
+    if isinstance(value, dict):
+        return {k: normalize(v) for k, v in value.items() if k not in ID_KEYS and k not in VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [normalize(v) for v in value]
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float, Decimal)):
+        return round(float(value), 2)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    return value
+
+def ensure_empty():
+    count = lookup("SELECT COUNT(*) FROM transactions", ())
+    if count:
+        print(f"The {Config.DB_BACKEND} database already holds {count} transactions; point it at a fresh, empty database.")
+        sys.exit(1)
+
+def record(months):
+    import app as app_module
+    app = app_module.app
+    app.config['LOGIN_DISABLED'] = True
+    app.config['TESTING'] = True
+
+    ensure_empty()
+    client = app.test_client()
+    # Some endpoints default to the signed-in user, so run as Gus rather than anonymously
+    with client.session_transaction() as session:
+        session['_user_id'] = '0'
+    steps = run_scenario(client, months)
+    for name, status, _ in steps:
+        print(f"{status} {name}")
+    return {
+        "backend": Config.DB_BACKEND,
+        "recorded_at": datetime.now().isoformat(timespec='seconds'),
+        "steps": [{"step": name, "status": status, "body": normalize(body)} for name, status, body in steps],
+        "tables": dump_tables(),
+    }
+
+def diff(a, b, path, out):
+    if isinstance(a, dict) and isinstance(b, dict):
+        for key in sorted(set(a) | set(b)):
+            if key not in a or key not in b:
+                out.append(f"{path}.{key}: only in {'baseline' if key in a else 'candidate'}")
+            else:
+                diff(a[key], b[key], f"{path}.{key}", out)
+    elif isinstance(a, list) and isinstance(b, list):
+        if len(a) != len(b):
+            out.append(f"{path}: {len(a)} items vs {len(b)}")
+        for i, (x, y) in enumerate(zip(a, b)):
+            diff(x, y, f"{path}[{i}]", out)
+    elif a != b:
+        out.append(f"{path}: {a!r} vs {b!r}")
+
+def compare(baseline_path, candidate_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    with open(candidate_path) as f:
+        candidate = json.load(f)
+    print(f"Baseline:  {baseline['backend']} ({baseline['recorded_at']})")
+    print(f"Candidate: {candidate['backend']} ({candidate['recorded_at']})")
+    if baseline['recorded_at'][:10] != candidate['recorded_at'][:10]:
+        print("Warning: recorded on different days, so date-relative periods and snapshots will differ.")
+
+    differences = []
+    base_steps = {s['step']: s for s in baseline['steps']}
+    for step in candidate['steps']:
+        base = base_steps.pop(step['step'], None)
+        if base is None:
+            differences.append(f"{step['step']}: only in candidate")
+            continue
+        if base['status'] != step['status']:
+            differences.append(f"{step['step']}: HTTP {base['status']} vs {step['status']}")
+        diff(base['body'], step['body'], step['step'], differences)
+    differences += [f"{name}: only in baseline" for name in base_steps]
+    diff(baseline['tables'], candidate['tables'], 'tables', differences)
+
+    if differences:
+        print(f"\n{len(differences)} differences:")
+        for d in differences:
+            print(f"  - {d}")
+        sys.exit(1)
+    print(f"\nAll {len(candidate['steps'])} responses and {len(candidate['tables'])} tables match.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record every endpoint's JSON against an empty database, or compare two recordings across backends.")
+    parser.add_argument('--output', help="Write the recording of the configured backend (DB_BACKEND) to this file")
+    parser.add_argument('--month', action='append', default=[], help="Extra YYYY-MM period to read (repeatable)")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CANDIDATE'), help="Compare two recordings")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+    elif args.output:
+        result = record(args.month or [datetime.now().strftime('%Y-%m')])
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"\nRecorded {len(result['steps'])} steps from {result['backend']} to {args.output}")
+    else:
+        parser.error("pass --output or --compare")
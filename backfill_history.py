@@ -1,12 +1,24 @@
 import mysql.connector
 import hashlib
 import sys
-from config import Config
-from datetime import date
+import random
+import argparse
+import time
+import db
+import repository
+from datetime import date, timedelta
 
 def generate_hash(date_str, description, amount, category_id):
     combined = f"{date_str}|{description}|{amount}|{category_id}"
-    return hashlib.sha256(combined.encode()).hexdigest()
+    return hashlib.sha256(combined.encode()).digest()
+
+def get_connection():
+    try:
+        return db.get_connection()
+    except mysql.connector.Error as err:
+        print(f"❌ Error connecting to Database: {err}")
+        print("Tip: Check your .env file and ensure MySQL is running.")
+        sys.exit(1)
 
 def backfill_history():
     print("🚀 Initializing BudgetArchitect Historical Data...")
@@ -20,18 +32,8 @@ def backfill_history():
         'Bus/train': {'id': 19, 'amount': 40.00}
     }
     
-    try:
-        conn = mysql.connector.connect(
-            host=Config.DB_HOST,
-            user=Config.DB_USER,
-            password=Config.DB_PASS,
-            database=Config.DB_NAME
-        )
-        cursor = conn.cursor()
-    except mysql.connector.Error as err:
-        print(f"❌ Error connecting to Database: {err}")
-        print("Tip: Check your .env file and ensure MySQL is running.")
-        sys.exit(1)
+    conn = get_connection()
+    cursor = conn.cursor()
 
     # 1. SETUP INITIAL INCOME STREAMS
     print("📈 Setting up default income streams...")
@@ -113,7 +115,8 @@ def backfill_history():
         
         cursor.execute(inc_hist_sql, (0, date_str, gus_inc))
         cursor.execute(inc_hist_sql, (1, date_str, joules_inc))
-                
+
+    repository.copy_legacy_shares(cursor)
     conn.commit()
     print(f"✨ Setup Complete!")
     print(f"✅ Initialized Assets & Income Streams.")
@@ -123,5 +126,191 @@ def backfill_history():
     cursor.close()
     conn.close()
 
+# ==========================================
+# SYNTHETIC LOAD-TEST DATASET
+# ==========================================
+
+# (min, max) cost and relative frequency per parent category
+PARENT_PROFILES = {
+    'Home': ((40.0, 900.0), 1),
+    'Utilities': ((20.0, 150.0), 2),
+    'Food': ((3.0, 120.0), 10),
+    'Transport': ((2.0, 60.0), 4),
+    'Lifestyle': ((5.0, 250.0), 5),
+    'Personal': ((5.0, 150.0), 2),
+    'Finance': ((15.0, 200.0), 1),
+    'Work': ((10.0, 300.0), 1),
+}
+DEFAULT_PROFILE = ((5.0, 100.0), 1)
+
+MERCHANTS = ['Tesco', 'Lidl', 'Aldi', 'Dunnes', 'Uber', 'Bolt', 'Amazon', 'Netflix', 'Spotify',
+             'Electric Ireland', 'Bord Gais', 'Eir', 'Irish Rail', 'Dublin Bus', 'Boots', 'Ikea',
+             'Deliveroo', 'Just Eat', 'Cinema', 'Pharmacy', 'Hardware Store', 'Cafe', 'Pub', 'Landlord']
+
+INSERT_CHUNK = 5000
+
+def insert_chunked(conn, cursor, sql, rows):
+    """Streams rows into executemany (multi-row INSERT) one chunk at a time."""
+    batch, total = [], 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= INSERT_CHUNK:
+            cursor.executemany(sql, batch)
+            conn.commit()
+            total += len(batch)
+            batch = []
+    if batch:
+        cursor.executemany(sql, batch)
+        conn.commit()
+        total += len(batch)
+    return total
+
+def generate_transactions(rng, categories, months, tx_per_month, members):
+    """
+    Yields Splitwise-shaped (row, {member: share}) pairs: ~60% split evenly across every
+    member, the rest solo expenses of the payer.
+    """
+    weights = [PARENT_PROFILES.get(c['parent_name'], DEFAULT_PROFILE)[1] for c in categories]
+    seq = 0
+    for month_start in months:
+        next_month = date(month_start.year + (month_start.month == 12), month_start.month % 12 + 1, 1)
+        days = (next_month - month_start).days
+        for cat in rng.choices(categories, weights=weights, k=tx_per_month):
+            (lo, hi), _ = PARENT_PROFILES.get(cat['parent_name'], DEFAULT_PROFILE)
+            cost = round(rng.uniform(lo, hi), 2)
+            d = month_start + timedelta(days=rng.randrange(days))
+            desc = f"{rng.choice(MERCHANTS)} - {cat['name']}"
+            payer = rng.choice(members)
+
+            if len(members) > 1 and rng.random() < 0.6:
+                part = round(cost / len(members), 2)
+                shares = {m: part for m in members[:-1]}
+                # Last member absorbs the rounding cents so shares always sum to the cost
+                shares[members[-1]] = round(cost - part * (len(members) - 1), 2)
+                is_split = 1
+            else:
+                shares, is_split = {payer: cost}, 0
+
+            seq += 1
+            date_str = d.strftime('%Y-%m-%d')
+            # Sequence number keeps the hash unique when the generator repeats a row
+            t_hash = generate_hash(date_str, desc, cost, f"{cat['id']}|{seq}")
+            # The legacy columns only exist for members 0 and 1; transaction_shares holds everyone
+            yield ((date_str, desc, cost, 0, cat['id'], payer, shares.get(0, 0.0), shares.get(1, 0.0), is_split, t_hash),
+                   shares)
+
+def insert_transactions(conn, cursor, generated):
+    """
+    Inserts generated transactions one chunk at a time, then writes every member's share
+    of each chunk to transaction_shares (matched back by hash, so re-runs hit the same rows).
+    """
+    tx_sql = """
+        INSERT IGNORE INTO transactions
+        (date, description, total_amount, user_id, category_id, payer_id, Gus_share, Joules_share, is_split, transaction_hash)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """
+    total = 0
+
+    def flush(batch):
+        cursor.executemany(tx_sql, [row for row, _ in batch])
+        cursor.execute(f"SELECT id, transaction_hash FROM transactions WHERE transaction_hash IN ({', '.join(['%s'] * len(batch))})",
+                       [row[-1] for row, _ in batch])
+        ids = {bytes(r['transaction_hash']): r['id'] for r in cursor.fetchall()}
+        cursor.executemany(repository.SHARES_UPSERT_SQL, [
+            (ids[row[-1]], user_id, row[0], share)
+            for row, shares in batch for user_id, share in shares.items() if share
+        ])
+        conn.commit()
+        return len(batch)
+
+    batch = []
+    for item in generated:
+        batch.append(item)
+        if len(batch) >= INSERT_CHUNK:
+            total += flush(batch)
+            batch = []
+    if batch:
+        total += flush(batch)
+    return total
+
+def generate_dataset(start_year, years, num_users, tx_per_month, seed):
+    """Fills the database with a deterministic synthetic ledger for load testing."""
+    rng = random.Random(seed)
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    started = time.time()
+
+    # Skip FK lookups for the bulk load. unique_checks stays on: INSERT IGNORE and
+    # ON DUPLICATE KEY UPDATE rely on it when the same seed is loaded again.
+    cursor.execute("SET SESSION foreign_key_checks = 0")
+    try:
+        # Members: 0 and 1 already exist, extra members start after the Household id (2)
+        members = [0, 1][:num_users] + list(range(3, 3 + max(0, num_users - 2)))
+        cursor.executemany("INSERT IGNORE INTO users (user_id, name) VALUES (%s, %s)",
+                           [(u, f"Member {u}") for u in members if u > 1])
+        cursor.executemany("INSERT IGNORE INTO user_settings (user_id) VALUES (%s)", [(u,) for u in members])
+
+        cursor.execute("""
+            SELECT id, name, parent_name FROM categories
+            WHERE parent_name NOT IN ('Savings', 'Income') AND name NOT IN ('General', 'Uncategorized')
+        """)
+        categories = cursor.fetchall()
+        months = [date(start_year + y, m, 1) for y in range(years) for m in range(1, 13)]
+        print(f"🧪 Generating {years}y x {tx_per_month} tx/month for {len(members)} members (seed={seed})...")
+
+        # 1. Income streams & assets
+        cursor.executemany("""
+            INSERT IGNORE INTO income_streams (user_id, source_name, monthly_gross, tax_rate)
+            VALUES (%s, %s, %s, %s)
+        """, [(u, 'Synthetic Salary', round(rng.uniform(2000, 6000), 2), round(rng.uniform(10, 40), 1)) for u in members])
+        cursor.executemany("""
+            INSERT INTO assets (user_id, asset_name, asset_type, current_value) VALUES (%s, %s, %s, %s)
+        """, [(u, name, kind, round(rng.uniform(500, 50000), 2))
+              for u in members for name, kind in (('Synthetic Savings', 'Savings'), ('Synthetic Brokerage', 'Investment'))])
+        conn.commit()
+
+        # 2. Transactions and their per-member shares
+        tx_total = insert_transactions(conn, cursor, generate_transactions(rng, categories, months, tx_per_month, members))
+
+        # 3. Weekly history snapshots as a random walk per member
+        def snapshot_rows(value_range, drift):
+            for u in members:
+                value = rng.uniform(*value_range)
+                d, end = months[0], date(start_year + years, 1, 1)
+                while d < end:
+                    value = max(0.0, value + rng.gauss(drift, drift * 3))
+                    yield (u, d.strftime('%Y-%m-%d'), round(value, 2))
+                    d += timedelta(days=7)
+
+        nw_total = insert_chunked(conn, cursor, """
+            INSERT INTO net_worth_history (user_id, snapshot_date, total_value) VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE total_value = VALUES(total_value)
+        """, snapshot_rows((1000, 20000), 100))
+        inc_total = insert_chunked(conn, cursor, """
+            INSERT INTO income_history (user_id, snapshot_date, total_net_income) VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE total_net_income = VALUES(total_net_income)
+        """, snapshot_rows((1500, 4500), 5))
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        # The connection goes back to the shared pool, so the session must be restored
+        cursor.execute("SET SESSION foreign_key_checks = 1")
+        cursor.close()
+        conn.close()
+    print(f"✅ {tx_total} transactions, {nw_total} net worth and {inc_total} income snapshots in {time.time() - started:.1f}s.")
+
 if __name__ == "__main__":
-    backfill_history()
+    parser = argparse.ArgumentParser(description="Seed baseline data, or generate a synthetic load-test dataset.")
+    parser.add_argument('--synthetic', action='store_true', help="Generate a synthetic dataset instead of the baseline backfill")
+    parser.add_argument('--start-year', type=int, default=2016)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--users', type=int, default=2, help="Number of household members")
+    parser.add_argument('--tx-per-month', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        generate_dataset(args.start_year, args.years, args.users, args.tx_per_month, args.seed)
+    else:
+        backfill_history()
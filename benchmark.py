@@ -0,0 +1,256 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import statistics
+import http.cookiejar
+import urllib.parse
+import urllib.request
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+USER_VIEWS = [0, 1, 2]
+PERIODS = ['current', 'last_month', 'last_3', 'lifetime']
+
+# (name, path, takes user_id, takes period)
+ENDPOINTS = [
+    ('dashboard_summary', '/api/dashboard/summary', True, True),
+    ('parent_categories', '/api/spending/parent-categories', True, True),
+    ('budget_progress', '/api/budget/progress', True, True),
+    ('housing_ratio', '/api/finance/housing-ratio', True, True),
+    ('transactions', '/api/transactions', False, True),
+    ('finance_history', '/api/finance/history', True, False),
+    ('burn_rate', '/api/finance/burn-rate', True, False),
+]
+
+def build_cases(months):
+    """Expands every endpoint across user views and periods (plus specific months)."""
+    periods = PERIODS + months
+    cases = []
+    for name, path, by_user, by_period in ENDPOINTS:
+        for user_id in (USER_VIEWS if by_user else [None]):
+            for period in (periods if by_period else [None]):
+                params = {}
+                if user_id is not None:
+                    params['user_id'] = user_id
+                if period is not None:
+                    params['period'] = period
+                query = "&".join(f"{k}={v}" for k, v in params.items())
+                cases.append((name, user_id, period, f"{path}?{query}" if query else path))
+    return cases
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+def summarize(latencies_ms, wall_seconds):
+    values = sorted(latencies_ms)
+    return {
+        "requests": len(values),
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "mean_ms": round(statistics.fmean(values), 3) if values else 0.0,
+        "throughput_rps": round(len(values) / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+    }
+
+def in_process_client():
+    """Returns hit(url) -> ms using the Flask test client (no network, no login)."""
+    from app import app
+
+    app.config['LOGIN_DISABLED'] = True
+    app.config['TESTING'] = True
+
+    def hit(url):
+        # One test client per call keeps threads from sharing request state
+        client = app.test_client()
+        started = time.perf_counter()
+        res = client.get(url)
+        elapsed = (time.perf_counter() - started) * 1000
+        if res.status_code != 200:
+            raise RuntimeError(f"{url} returned {res.status_code}")
+        return elapsed
+    return hit
+
+def http_client(base_url, username, password):
+    """Returns hit(url) -> ms against a running server, logged in through /login."""
+    jar = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+    form = urllib.parse.urlencode({'username': username, 'password': password}).encode()
+    opener.open(f"{base_url}/login", data=form).read()
+    if not any(c.name == 'session' for c in jar):
+        raise RuntimeError("Login failed; check --username / --password")
+
+    def hit(url):
+        started = time.perf_counter()
+        with opener.open(f"{base_url}{url}") as res:
+            res.read()
+            status = res.status
+        elapsed = (time.perf_counter() - started) * 1000
+        if status != 200:
+            raise RuntimeError(f"{url} returned {status}")
+        return elapsed
+    return hit
+
+def run_benchmark(iterations, concurrency, warmup, months, hit):
+    cases = build_cases(months)
+    results = {}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for name, user_id, period, url in cases:
+            for _ in range(warmup):
+                hit(url)
+            wall_start = time.perf_counter()
+            latencies = list(pool.map(hit, [url] * iterations))
+            wall = time.perf_counter() - wall_start
+
+            key = f"{name}[user={user_id},period={period}]"
+            results[key] = dict(summarize(latencies, wall), endpoint=name, user_id=user_id, period=period)
+            print(f"{key:<70} p50={results[key]['p50_ms']:>8.2f}ms p95={results[key]['p95_ms']:>8.2f}ms "
+                  f"p99={results[key]['p99_ms']:>8.2f}ms {results[key]['throughput_rps']:>8.1f} rps")
+
+    # Per-endpoint rollup across all views/periods
+    by_endpoint = {}
+    for r in results.values():
+        by_endpoint.setdefault(r['endpoint'], []).append(r)
+    rollup = {name: {
+        "p50_ms": round(statistics.median(r['p50_ms'] for r in rows), 3),
+        "p95_ms": round(max(r['p95_ms'] for r in rows), 3),
+        "p99_ms": round(max(r['p99_ms'] for r in rows), 3),
+        "throughput_rps": round(statistics.fmean(r['throughput_rps'] for r in rows), 2),
+    } for name, rows in by_endpoint.items()}
+
+    return {"cases": results, "endpoints": rollup}
+
+def rss_mb(pid='self'):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+def process_tree(root_pid):
+    """root_pid plus all its descendants (a gunicorn master and its workers)."""
+    children = {}
+    for pid in (p for p in os.listdir('/proc') if p.isdigit()):
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                ppid = f.read().rsplit(')', 1)[1].split()[1]
+        except (OSError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(pid)
+    tree, stack = [], [str(root_pid)]
+    while stack:
+        pid = stack.pop()
+        tree.append(pid)
+        stack.extend(children.get(pid, []))
+    return tree
+
+def memory_footprint(server_pid=None):
+    """
+    Resident memory of the app and of any local MariaDB/MySQL server. The app is this
+    process when in-process, or the server_pid process tree when benchmarking over HTTP.
+    """
+    server = 0.0
+    pids = [p for p in os.listdir('/proc') if p.isdigit()] if os.path.isdir('/proc') else []
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/comm") as f:
+                if f.read().strip() in ('mariadbd', 'mysqld'):
+                    server += rss_mb(pid)
+        except OSError:
+            continue
+    app = sum(rss_mb(pid) for pid in process_tree(server_pid)) if server_pid else rss_mb()
+    return {"app_rss_mb": round(app, 1), "db_server_rss_mb": round(server, 1)}
+
+def host_info():
+    """CPU, core count and RAM of the machine the numbers come from."""
+    cpu, mem = platform.processor() or platform.machine(), None
+    try:
+        with open('/proc/cpuinfo') as f:
+            cpu = next((line.split(':', 1)[1].strip() for line in f if line.startswith(('model name', 'Model'))), cpu)
+        with open('/proc/meminfo') as f:
+            mem = round(int(f.readline().split()[1]) / 1024 / 1024, 1)
+    except OSError:
+        pass
+    return {"cpu": cpu, "cores": os.cpu_count(), "ram_gb": mem, "python": platform.python_version()}
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except Exception:
+        return None
+
+def compare(baseline_path, candidate_path):
+    """Prints the per-endpoint p50/p95 change between two saved result files."""
+    with open(baseline_path) as f:
+        base = json.load(f)
+    with open(candidate_path) as f:
+        cand = json.load(f)
+
+    print(f"{'endpoint':<22} {'p50 base':>10} {'p50 new':>10} {'Δ%':>8} {'p95 base':>10} {'p95 new':>10} {'Δ%':>8}")
+    for name, b in base['endpoints'].items():
+        c = cand['endpoints'].get(name)
+        if not c:
+            continue
+        d50 = (c['p50_ms'] - b['p50_ms']) / b['p50_ms'] * 100 if b['p50_ms'] else 0
+        d95 = (c['p95_ms'] - b['p95_ms']) / b['p95_ms'] * 100 if b['p95_ms'] else 0
+        print(f"{name:<22} {b['p50_ms']:>10.2f} {c['p50_ms']:>10.2f} {d50:>+7.1f}% "
+              f"{b['p95_ms']:>10.2f} {c['p95_ms']:>10.2f} {d95:>+7.1f}%")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency benchmark for the read-only dashboard APIs.")
+    parser.add_argument('--seed-data', action='store_true', help="Generate a synthetic dataset before benchmarking")
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--tx-per-month', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=50, help="Requests per endpoint/view/period case")
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--month', action='append', default=[], help="Extra YYYY-MM period to include (repeatable)")
+    parser.add_argument('--base-url', help="Benchmark a running server over HTTP (e.g. http://localhost:5001) instead of in-process")
+    parser.add_argument('--username', default='Gus')
+    parser.add_argument('--password', default='')
+    parser.add_argument('--server-pid', type=int, help="With --base-url: PID of the server (e.g. the gunicorn master) whose RSS to record")
+    parser.add_argument('--output', default=None, help="JSON results path (default: bench_<commit>.json)")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CANDIDATE'), help="Compare two saved result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        sys.exit(0)
+
+    if args.seed_data:
+        from backfill_history import generate_dataset
+        generate_dataset(datetime.now().year - args.years + 1, args.years, 2, args.tx_per_month, args.seed)
+
+    commit = git_commit()
+    hit = http_client(args.base_url.rstrip('/'), args.username, args.password) if args.base_url else in_process_client()
+    report = run_benchmark(args.iterations, args.concurrency, args.warmup, args.month, hit)
+    report["meta"] = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "iterations": args.iterations,
+        "concurrency": args.concurrency,
+        "target": args.base_url or "in-process",
+        "backend": os.getenv('DB_BACKEND', 'mysql'),
+        "memory": memory_footprint(args.server_pid),
+        "host": host_info(),
+        "dataset": {"years": args.years, "tx_per_month": args.tx_per_month, "seed": args.seed} if args.seed_data else None,
+    }
+
+    output = args.output or f"bench_{commit or 'local'}.json"
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Backend {report['meta']['backend']}: app RSS {report['meta']['memory']['app_rss_mb']} MB, "
+          f"DB server RSS {report['meta']['memory']['db_server_rss_mb']} MB")
+    print(f"Results saved to {output}")
@@ -0,0 +1,155 @@
+import re
+import sys
+import logging
+import mysql.connector
+from db import get_connection
+from metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+GENERAL_CATEGORY_ID = 39
+BULK_UPDATE_CHUNK = 1000
+
+class Categorizer:
+    """
+    Compiles the category_rules table into a character trie plus one trie-shaped
+    regex. Rules are case-insensitive "description contains" substrings; when
+    several rules hit the same description the one with the highest priority wins.
+    """
+
+    def __init__(self, rules):
+        # rules: iterable of (pattern, priority, category_id)
+        ordered = sorted(
+            ((p.strip().lower(), prio, cat) for p, prio, cat in rules if p and p.strip()),
+            key=lambda r: (-r[1], -len(r[0]))
+        )
+        self.category_ids = [cat for _, _, cat in ordered]
+        self._cache = {}
+        self._trie = {}
+        for rank, (pattern, _, _) in enumerate(ordered):
+            node = self._trie
+            for ch in pattern:
+                node = node.setdefault(ch, {})
+            # Keep the best rank if the same pattern is listed twice
+            node[''] = min(rank, node.get('', rank))
+        # The regex only locates offsets where *some* rule starts, without
+        # backtracking through every alternative; the trie walk then ranks them.
+        self._regex = re.compile(f"(?=(?:{_trie_to_regex(self._trie)}))") if ordered else None
+
+    @classmethod
+    def from_db(cls, cursor):
+        try:
+            cursor.execute("SELECT pattern, priority, category_id FROM category_rules")
+        except mysql.connector.errors.ProgrammingError as e:
+            if e.errno == 1146: # Table doesn't exist
+                logger.warning("category_rules table not found. Skipping rule-based categorization. Please run schema.sql.")
+                return cls([])
+            raise
+        rows = cursor.fetchall()
+        if rows and isinstance(rows[0], dict):
+            rows = [(r['pattern'], r['priority'], r['category_id']) for r in rows]
+        return cls(rows)
+
+    def __len__(self):
+        return len(self.category_ids)
+
+    def match(self, description):
+        """Returns the category_id of the best matching rule, or None."""
+        if self._regex is None or not description:
+            return None
+        description = str(description).lower()
+        if description in self._cache:
+            record_cache('categorizer', True)
+            return self._cache[description]
+        record_cache('categorizer', False)
+
+        best = None
+        for m in self._regex.finditer(description):
+            node = self._trie
+            for ch in description[m.start():]:
+                node = node.get(ch)
+                if node is None:
+                    break
+                rank = node.get('')
+                if rank is not None and (best is None or rank < best):
+                    best = rank
+            if best == 0:
+                break
+        result = self.category_ids[best] if best is not None else None
+        self._cache[description] = result
+        return result
+
+    def match_many(self, descriptions):
+        """Classifies a whole batch, scanning each distinct description only once."""
+        lookup = {d: self.match(d) for d in set(descriptions)}
+        return [lookup[d] for d in descriptions]
+
+def _trie_to_regex(node):
+    """Renders a character trie as a nested regex so shared prefixes are matched once."""
+    branches = [re.escape(ch) + _trie_to_regex(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    return f'(?:{body})?' if '' in node else body
+
+def bulk_set_categories(cursor, pairs):
+    """Applies (transaction_id, category_id) pairs with chunked set-based UPDATEs."""
+    updated = 0
+    for start in range(0, len(pairs), BULK_UPDATE_CHUNK):
+        chunk = pairs[start:start + BULK_UPDATE_CHUNK]
+        case_sql = " ".join(["WHEN %s THEN %s"] * len(chunk))
+        in_sql = ", ".join(["%s"] * len(chunk))
+        params = [v for pair in chunk for v in pair] + [t_id for t_id, _ in chunk]
+        cursor.execute(f"""
+            UPDATE transactions SET category_id = CASE id {case_sql} END
+            WHERE id IN ({in_sql})
+        """, params)
+        updated += cursor.rowcount
+    return updated
+
+def back_apply_rules(dry_run=False):
+    """Reclassifies existing 'General' transactions using the current rule set."""
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+    except mysql.connector.Error as err:
+        logger.error(f"Error connecting to Database: {err}")
+        sys.exit(1)
+
+    try:
+        categorizer = Categorizer.from_db(cursor)
+        if not len(categorizer):
+            logger.info("No categorization rules defined.")
+            return 0
+
+        cursor.execute("SELECT id FROM categories WHERE name = 'General'")
+        row = cursor.fetchone()
+        general_id = row[0] if row else GENERAL_CATEGORY_ID
+
+        cursor.execute("SELECT id, description FROM transactions WHERE category_id = %s", (general_id,))
+        rows = cursor.fetchall()
+        matches = categorizer.match_many([desc for _, desc in rows])
+        pairs = [(t_id, cat) for (t_id, _), cat in zip(rows, matches) if cat is not None and cat != general_id]
+
+        logger.info(f"{len(pairs)} of {len(rows)} 'General' transactions matched {len(categorizer)} rules.")
+        if dry_run or not pairs:
+            return len(pairs)
+
+        updated = bulk_set_categories(cursor, pairs)
+        conn.commit()
+        logger.info(f"Reclassified {updated} transactions.")
+        return updated
+    except Exception as e:
+        logger.error(f"An error occurred: {e}")
+        conn.rollback()
+        return 0
+    finally:
+        cursor.close()
+        conn.close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if len(sys.argv) > 1 and sys.argv[1] == "--apply":
+        back_apply_rules(dry_run="--dry-run" in sys.argv)
+    else:
+        print("Usage: python categorizer.py --apply [--dry-run]")
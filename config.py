@@ -5,12 +5,25 @@ load_dotenv()
 
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'default-very-secret-key-change-it-in-env')
+    DB_BACKEND = os.getenv('DB_BACKEND', 'mysql') # 'mysql' (MariaDB server) or 'sqlite' (embedded, WAL mode)
+    SQLITE_PATH = os.getenv('SQLITE_PATH', os.path.join(os.getcwd(), 'data', 'budget.db'))
     DB_HOST = os.getenv('DB_HOST', 'localhost')
     DB_USER = os.getenv('DB_USER', 'root')
     DB_PASS = os.getenv('DB_PASS', '')
     DB_NAME = os.getenv('DB_NAME', 'budget_tracker')
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '5')) # Seconds to wait for a free connection
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '3600')) # Reopen connections older than this
+    DB_POOL_PING_AFTER = int(os.getenv('DB_POOL_PING_AFTER', '30')) # Ping connections idle longer than this
+    QUERY_FANOUT = int(os.getenv('QUERY_FANOUT', '3')) # Max pooled connections one request spreads independent queries over (1 = serial)
+    QUERY_FANOUT_RESERVE = int(os.getenv('QUERY_FANOUT_RESERVE', '2')) # Pool connections left free for other requests before fanning out
     UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', os.path.join(os.getcwd(), 'data', 'uploads'))
     DEBUG = os.getenv('DEBUG', 'False') == 'True'
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN') # Bearer token for /metrics; without one only localhost may scrape
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '200')) # Statements slower than this are EXPLAINed and logged
+    SLOW_QUERY_BUFFER = int(os.getenv('SLOW_QUERY_BUFFER', '200')) # Ring buffer size for /api/admin/slow-queries
+    AUTO_SNAPSHOT_HOURS = float(os.getenv('AUTO_SNAPSHOT_HOURS', '0')) # 0 disables the in-process timer
+    MULTIPROC_DIR = os.getenv('MULTIPROC_DIR') # Set by gunicorn.conf.py to its private per-server directory: metrics, slow queries, snapshot lock
     
     # Splitwise Credentials
     SPLITWISE_CONSUMER_KEY = os.getenv('SPLITWISE_CONSUMER_KEY')
@@ -0,0 +1,268 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+import mysql.connector
+from mysql.connector import errors
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Prepared statements kept per physical connection (server side: max_prepared_stmt_count)
+PREPARED_CACHE_SIZE = 64
+
+class PoolTimeout(errors.PoolError):
+    """Raised when no connection frees up within the acquire timeout."""
+
+class PooledConnection:
+    """
+    Proxy around a raw connection checked out of ConnectionPool. close() hands it
+    back to the pool instead of closing the socket, so existing
+    `conn.close()` / `conn.is_connected()` call sites keep working unchanged.
+    """
+
+    def __init__(self, pool, conn, created_at):
+        self._pool = pool
+        self._conn = conn
+        self._created_at = created_at
+        self._returned = False
+
+    @property
+    def raw(self):
+        return self._conn
+
+    def prepared_cursor(self, sql):
+        """
+        Prepared-statement cursor dedicated to `sql`, cached on the physical connection
+        so it outlives this checkout. Least recently used statements are deallocated.
+        """
+        cache = getattr(self._conn, '_prepared_cursors', None)
+        if cache is None:
+            cache = self._conn._prepared_cursors = OrderedDict()
+        cursor = cache.get(sql)
+        if cursor is None:
+            cursor = cache[sql] = self._conn.cursor(prepared=True)
+            if len(cache) > PREPARED_CACHE_SIZE:
+                _, evicted = cache.popitem(last=False)
+                evicted.close()
+        else:
+            cache.move_to_end(sql)
+        return cursor
+
+    def close(self):
+        if not self._returned:
+            self._returned = True
+            self._pool._release(self._conn, self._created_at)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+class ConnectionPool:
+    """
+    Thread-safe MySQL connection pool:
+      - connections are opened lazily, up to `size`
+      - get_connection() blocks for up to `timeout` seconds when all are in use
+      - idle connections are pinged before reuse and recycled after `recycle` seconds
+    Pass `connector` to open connections with something other than mysql.connector.connect.
+    """
+
+    def __init__(self, size=10, timeout=5.0, recycle=3600, ping_after=30, connector=None, **connect_args):
+        self.size = size
+        self._connector = connector or mysql.connector.connect
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_after = ping_after
+        self._connect_args = connect_args
+        self._idle = [] # (conn, created_at, returned_at)
+        self._open = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._cond = threading.Condition()
+        self.pid = os.getpid()
+        self._stats = {"acquired": 0, "timeouts": 0, "recycled": 0, "health_failures": 0, "wait_seconds_total": 0.0}
+
+    def _connect(self):
+        return self._connector(**self._connect_args)
+
+    def get_connection(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        started = time.perf_counter()
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            self._waiting += 1
+            try:
+                while not self._idle and self._open >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeout(f"No database connection available within {timeout}s (pool size {self.size})")
+                    self._cond.wait(remaining)
+
+                if self._idle:
+                    conn, created_at, returned_at = self._idle.pop()
+                else:
+                    # Reserve the slot now; the socket is opened outside the lock
+                    conn, created_at, returned_at = None, None, None
+                    self._open += 1
+                self._in_use += 1
+            finally:
+                self._waiting -= 1
+
+        try:
+            conn, created_at = self._prepare(conn, created_at, returned_at)
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        waited = time.perf_counter() - started
+        with self._cond:
+            self._stats["acquired"] += 1
+            self._stats["wait_seconds_total"] += waited
+        _observe_wait(waited)
+        return PooledConnection(self, conn, created_at)
+
+    def try_get_connection(self, reserve=0):
+        """
+        Non-blocking acquire for optional extra work: returns None instead of waiting
+        when anyone is queued or taking one would leave fewer than `reserve` free.
+        """
+        with self._cond:
+            free = len(self._idle) + (self.size - self._open)
+            if self._waiting or free <= reserve:
+                return None
+        try:
+            return self.get_connection(timeout=0)
+        except PoolTimeout:
+            return None
+
+    def _prepare(self, conn, created_at, returned_at):
+        """Opens, recycles or health-checks a connection before handing it out."""
+        now = time.monotonic()
+        if conn is not None and self.recycle and now - created_at > self.recycle:
+            with self._cond:
+                self._stats["recycled"] += 1
+            _quiet_close(conn)
+            conn = None
+        elif conn is not None and self.ping_after is not None and now - returned_at > self.ping_after:
+            try:
+                conn.ping(reconnect=False)
+            except Exception:
+                with self._cond:
+                    self._stats["health_failures"] += 1
+                logger.warning("Discarding pooled DB connection that failed its health check.")
+                _quiet_close(conn)
+                conn = None
+
+        if conn is None:
+            conn = self._connect()
+            created_at = time.monotonic()
+        return conn, created_at
+
+    def _release(self, conn, created_at):
+        # Drop any half-finished transaction so the next borrower starts clean
+        try:
+            if conn.is_connected():
+                conn.rollback()
+                healthy = True
+            else:
+                healthy = False
+        except Exception:
+            healthy = False
+
+        with self._cond:
+            self._in_use -= 1
+            if healthy:
+                self._idle.append((conn, created_at, time.monotonic()))
+            else:
+                self._open -= 1
+                _quiet_close(conn)
+            self._cond.notify()
+
+    def close_all(self):
+        """Closes idle connections (used on graceful worker shutdown)."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+        for conn, _, _ in idle:
+            _quiet_close(conn)
+
+    def stats(self):
+        with self._cond:
+            return dict(self._stats, size=self.size, open=self._open, in_use=self._in_use,
+                        idle=len(self._idle), waiting=self._waiting)
+
+def _quiet_close(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+def _observe_wait(seconds):
+    try:
+        from metrics import pool_wait
+        pool_wait.observe((), seconds)
+    except ImportError:
+        pass
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """
+    Process-wide pool built from Config on first use. A pool inherited across
+    fork() is never reused: its sockets belong to the parent, so the child
+    builds its own.
+    """
+    global _pool
+    if _pool is None or _pool.pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool.pid != os.getpid():
+                _pool = _build_pool()
+    return _pool
+
+def _build_pool():
+    options = dict(
+        size=Config.DB_POOL_SIZE,
+        timeout=Config.DB_POOL_TIMEOUT,
+        recycle=Config.DB_POOL_RECYCLE,
+        ping_after=Config.DB_POOL_PING_AFTER
+    )
+    if Config.DB_BACKEND == 'sqlite':
+        import sqlite_backend
+        return ConnectionPool(connector=sqlite_backend.connect, path=Config.SQLITE_PATH, **options)
+    return ConnectionPool(
+        host=Config.DB_HOST,
+        user=Config.DB_USER,
+        password=Config.DB_PASS,
+        database=Config.DB_NAME,
+        **options
+    )
+
+def close_pool():
+    if _pool is not None and _pool.pid == os.getpid():
+        _pool.close_all()
+
+def _forget_pool_after_fork():
+    # Drop the parent's pool without closing its sockets (that would send
+    # COM_QUIT on connections the parent is still using)
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_pool_after_fork)
+
+def get_connection(timeout=None):
+    """Checks a connection out of the shared pool; call close() to return it."""
+    return get_pool().get_connection(timeout)
@@ -0,0 +1,62 @@
+# Production serving config: gunicorn -c gunicorn.conf.py wsgi:app
+# Tuned for a 4-core Raspberry Pi; override any value through the environment.
+import os
+import shutil
+import tempfile
+import multiprocessing
+from dotenv import load_dotenv
+
+# Load .env first so its values win over the defaults below
+load_dotenv()
+
+bind = os.getenv('BIND', '0.0.0.0:5001')
+
+# Requests spend most of their time waiting on MariaDB, so a few threaded
+# workers per core beat many single-threaded ones on a memory-limited Pi.
+workers = int(os.getenv('WEB_CONCURRENCY', min(multiprocessing.cpu_count(), 4)))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+# Import the app once in the master and fork it, so workers share its pages.
+# This is safe because the DB pool is built lazily after fork (see db.get_pool).
+preload_app = True
+
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then to cap slow memory growth
+max_requests = 1000
+max_requests_jitter = 100
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', None)
+errorlog = '-'
+
+# Each worker thread holds at most one pooled connection per request
+os.environ.setdefault('DB_POOL_SIZE', str(threads + 2))
+
+# Workers share metrics, slow queries and the snapshot leader lock through a private directory,
+# so /metrics and /api/admin/slow-queries cover every worker, not just the one answering.
+# It is always a fresh mkdtemp (inside MULTIPROC_DIR when the operator sets one), so each start
+# counts from zero and on_exit only ever deletes what this server created.
+# Set before the preloaded app reads its config; the marker stops a config reload nesting it again.
+if os.environ.get('MULTIPROC_OWNER') != str(os.getpid()):
+    os.environ['MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='budget-app-', dir=os.getenv('MULTIPROC_DIR') or None)
+    os.environ['MULTIPROC_OWNER'] = str(os.getpid())
+
+def on_exit(server):
+    shutil.rmtree(os.environ['MULTIPROC_DIR'], ignore_errors=True)
+
+def post_fork(server, worker):
+    import metrics
+    from app import start_background_jobs
+    metrics.enable_multiprocess(os.environ['MULTIPROC_DIR'])
+    start_background_jobs()
+
+def worker_exit(server, worker):
+    import metrics
+    from app import slow_query_log
+    from db import close_pool
+    metrics.retire_worker()
+    slow_query_log.retire()
+    close_pool()
@@ -0,0 +1,206 @@
+from datetime import datetime
+import repository
+
+HOUSEHOLD_ID = 2
+
+# Per-member column suffixes used by the household explorer payload
+USER_KEYS = {0: 'gus', 1: 'joules'}
+
+# Largest explorer table page a client may ask for
+MAX_PAGE_SIZE = 500
+
+def history_rows_query(user_id=None):
+    """
+    SQL returning one row per (snapshot_date, user_id) carrying both metrics and their
+    row ids, ordered by date. Pass user_id to restrict the scan to a single member.
+    """
+    user_filter = "WHERE user_id = %s" if user_id is not None else ""
+    params = [user_id, user_id] if user_id is not None else []
+    return f"""
+        SELECT snapshot_date, user_id,
+               MAX(nw_id) as nw_id, MAX(nw) as nw,
+               MAX(inc_id) as inc_id, MAX(inc) as inc
+        FROM (
+            SELECT snapshot_date, user_id, id as nw_id, total_value as nw, NULL as inc_id, NULL as inc
+            FROM net_worth_history {user_filter}
+            UNION ALL
+            SELECT snapshot_date, user_id, NULL, NULL, id, total_net_income
+            FROM income_history {user_filter}
+        ) h
+        GROUP BY snapshot_date, user_id
+        ORDER BY snapshot_date ASC, user_id ASC
+    """, params
+
+def household_series(rows):
+    """
+    Aligns every member on the union of snapshot dates using Last Observation
+    Carried Forward, then sums them into household totals.
+    """
+    users = sorted({r['user_id'] for r in rows if r['user_id'] != HOUSEHOLD_ID})
+    last_nw = {u: 0.0 for u in users}
+    last_inc = {u: 0.0 for u in users}
+
+    series = []
+    i = 0
+    while i < len(rows):
+        d = rows[i]['snapshot_date']
+        while i < len(rows) and rows[i]['snapshot_date'] == d:
+            r = rows[i]
+            if r['user_id'] in last_nw:
+                if r['nw'] is not None:
+                    last_nw[r['user_id']] = float(r['nw'])
+                if r['inc'] is not None:
+                    last_inc[r['user_id']] = float(r['inc'])
+            i += 1
+        series.append({
+            "snapshot_date": d,
+            "nw_total": sum(last_nw.values()),
+            "inc_total": sum(last_inc.values()),
+            "nw_by_user": dict(last_nw),
+            "inc_by_user": dict(last_inc),
+        })
+    return series
+
+def user_series(rows, user_id):
+    """Observed snapshots for one member (dates where a net worth row exists)."""
+    return [{
+        "snapshot_date": r['snapshot_date'],
+        "nw_id": r['nw_id'],
+        "inc_id": r['inc_id'],
+        "nw_total": float(r['nw']),
+        "inc_total": float(r['inc']) if r['inc'] is not None else None,
+    } for r in rows if r['user_id'] == user_id and r['nw'] is not None]
+
+def series_query_user(user_id):
+    """Member filter for history_rows_query(): the household view needs every member."""
+    return None if user_id == HOUSEHOLD_ID else user_id
+
+def series_from_rows(rows, user_id):
+    """Household (LOCF-aligned) or single-member series, oldest first."""
+    if user_id == HOUSEHOLD_ID:
+        return household_series(rows)
+    return user_series(rows, user_id)
+
+def get_series(conn, user_id):
+    rows = repository.fetch_all(conn, *history_rows_query(series_query_user(user_id)))
+    return series_from_rows(rows, user_id)
+
+def parse_view_args(args):
+    """
+    Parses the optional max_points / start / end chart windowing parameters. Raises
+    ValueError with a client-facing message for malformed values (routes answer 400).
+    """
+    max_points = args.get('max_points', type=int)
+    if max_points is not None and max_points < 1:
+        raise ValueError("max_points must be at least 1")
+    return max_points, _parse_date(args, 'start'), _parse_date(args, 'end')
+
+def _parse_date(args, name):
+    value = args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f"{name} must be a YYYY-MM-DD date") from None
+
+def parse_page_args(args):
+    """Parses the optional limit / offset paging parameters of the explorer table."""
+    limit = args.get('limit', type=int)
+    offset = max(args.get('offset', 0, type=int), 0)
+    return (min(max(limit, 1), MAX_PAGE_SIZE) if limit is not None else None), offset
+
+def chart_payload(series):
+    """Line-chart payload for /api/finance/history."""
+    return {
+        "dates": [p['snapshot_date'].strftime('%d %b') for p in series],
+        "nw_values": [p['nw_total'] for p in series],
+        "inc_values": [p['inc_total'] or 0 for p in series]
+    }
+
+def chart_views(rows, views, max_points=None, start=None, end=None):
+    """{view_id: chart_payload()} for every view, all built from one history_rows_query() scan."""
+    return {
+        str(view): chart_payload(downsample(window(series_from_rows(rows, view), start, end), max_points))
+        for view in views
+    }
+
+def explorer_rows(series, user_id):
+    """Flattens a series into the row shape used by the history explorer table (dates left as date objects)."""
+    if user_id != HOUSEHOLD_ID:
+        return series
+
+    rows = []
+    for p in series:
+        row = {
+            "snapshot_date": p['snapshot_date'],
+            "nw_total": p['nw_total'],
+            "inc_total": p['inc_total'],
+        }
+        for u, key in USER_KEYS.items():
+            row[f"nw_{key}"] = p['nw_by_user'].get(u, 0.0)
+            row[f"inc_{key}"] = p['inc_by_user'].get(u, 0.0)
+        rows.append(row)
+    return rows
+
+def lttb_indices(xs, ys, threshold):
+    """
+    Largest-Triangle-Three-Buckets: picks `threshold` indices that preserve the
+    visual shape of the line. First and last points are always kept.
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    indices = [0]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+    for b in range(threshold - 2):
+        # Average of the next bucket acts as the third triangle vertex
+        next_start = int((b + 1) * bucket_size) + 1
+        next_end = min(int((b + 2) * bucket_size) + 1, n)
+        span = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / span
+        avg_y = sum(ys[next_start:next_end]) / span
+
+        start = int(b * bucket_size) + 1
+        end = int((b + 1) * bucket_size) + 1
+        ax, ay = xs[a], ys[a]
+        best_area, best_idx = -1, start
+        for i in range(start, end):
+            area = abs((ax - avg_x) * (ys[i] - ay) - (ax - xs[i]) * (avg_y - ay))
+            if area > best_area:
+                best_area, best_idx = area, i
+        indices.append(best_idx)
+        a = best_idx
+    indices.append(n - 1)
+    return indices
+
+def downsample(series, max_points):
+    """
+    Bounds a series to at most max_points snapshots. Net worth and income each get
+    half of the budget so step changes in either line survive; budgets too small to
+    split (under 6) go to net worth alone.
+    """
+    if not max_points or len(series) <= max_points:
+        return series
+    n = len(series)
+    if max_points < 3:
+        # LTTB needs three points; keep the latest, then the earliest
+        return [series[i] for i in ([n - 1] if max_points == 1 else [0, n - 1])]
+    xs = [p['snapshot_date'].toordinal() for p in series]
+    nw = [p['nw_total'] for p in series]
+    if max_points < 6:
+        return [series[i] for i in lttb_indices(xs, nw, max_points)]
+    inc = [p['inc_total'] or 0 for p in series]
+    half = max_points // 2
+    keep = set(lttb_indices(xs, nw, half)) | set(lttb_indices(xs, inc, max_points - half))
+    return [series[i] for i in sorted(keep)]
+
+def window(series, start=None, end=None):
+    """Restricts a series to snapshot dates within [start, end] (either bound optional)."""
+    if start is None and end is None:
+        return series
+    return [p for p in series
+            if (start is None or p['snapshot_date'] >= start)
+            and (end is None or p['snapshot_date'] <= end)]
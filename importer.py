@@ -1,4 +1,3 @@
-import pandas as pd
 import mysql.connector
 import os
 import hashlib
@@ -8,7 +7,9 @@ import glob
 from datetime import datetime
 from dotenv import load_dotenv
 
-from config import Config
+from db import get_connection
+from categorizer import Categorizer
+import repository
 
 # 1. SETUP LOGGING
 logger = logging.getLogger(__name__)
@@ -19,23 +20,18 @@ c_handler.setFormatter(log_format)
 logger.addHandler(c_handler)
 
 def get_db_connection():
-    """Establishes connection to MySQL/MariaDB."""
+    """Checks a connection out of the shared MySQL/MariaDB pool."""
     try:
-        return mysql.connector.connect(
-            host=Config.DB_HOST,
-            user=Config.DB_USER,
-            password=Config.DB_PASS,
-            database=Config.DB_NAME
-        )
+        return get_connection()
     except mysql.connector.Error as err:
         logger.error(f"MySQL Connection Error: {err}")
         raise
 
 def generate_transaction_hash(row):
     """Creates a unique fingerprint to prevent duplicate spending records."""
-    # Standard hash without salt for production deduplication
+    # Standard hash without salt for production deduplication (raw 32-byte digest, BINARY(32) column)
     combined = f"{row['Date']}|{row['Description']}|{row['Cost']}|{row['Category']}"
-    return hashlib.sha256(combined.encode()).hexdigest()
+    return hashlib.sha256(combined.encode()).digest()
 
 def get_metadata(cursor):
     """Fetches user and category mappings from DB."""
@@ -47,6 +43,8 @@ def get_metadata(cursor):
 
 def run_import(csv_file_path):
     """Processes Splitwise CSVs into the transactions table."""
+    # pandas is heavy on the Pi, so it is only loaded once a CSV is actually imported
+    import pandas as pd
     print(f"--- Scanning: {csv_file_path} ---")
     
     try:
@@ -61,6 +59,14 @@ def run_import(csv_file_path):
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
         user_map, cat_map = get_metadata(cursor)
+        general_id = cat_map.get('General', 39)
+
+        # Resolve categories for the whole batch up front; rules only fill in
+        # rows Splitwise left unknown or as 'General'
+        categorizer = Categorizer.from_db(cursor)
+        base_cats = df['Category'].map(cat_map).fillna(general_id).astype(int)
+        rule_cats = pd.Series(categorizer.match_many(df['Description'].astype(str).tolist()), index=df.index)
+        df['_cat_id'] = base_cats.where((base_cats != general_id) | rule_cats.isna(), rule_cats).astype(int)
         
         # User ID Mapping
         gus_id, joules_id = 0, 1
@@ -75,6 +81,7 @@ def run_import(csv_file_path):
         """
 
         import_count, skip_count = 0, 0
+        closed_years = repository.archived_years(cursor)
         for index, row in df.iterrows():
             # Filter out internal payments and footer totals
             if row['Category'] == 'Payment' or str(row['Description']).strip() == 'Total balance':
@@ -83,7 +90,11 @@ def run_import(csv_file_path):
             try:
                 cost = float(row['Cost'])
                 clean_date = pd.to_datetime(row['Date']).strftime('%Y-%m-%d')
-                cat_id = cat_map.get(row['Category'], cat_map.get('General', 39))
+                if int(clean_date[:4]) in closed_years:
+                    # Archived years only hold rollups; their detail rows are already accounted for
+                    skip_count += 1
+                    continue
+                cat_id = int(row['_cat_id'])
 
                 # Extract liability directly from user columns
                 gus_val = abs(float(row.get(gus_col, 0)))
@@ -101,6 +112,7 @@ def run_import(csv_file_path):
                 ))
                 
                 if cursor.rowcount > 0:
+                    repository.save_shares(cursor, cursor.lastrowid, clean_date, {gus_id: gus_val, joules_id: joules_val})
                     import_count += 1
                 else:
                     skip_count += 1
@@ -0,0 +1,397 @@
+import os
+import re
+import hmac
+import json
+import time
+import fcntl
+import threading
+from bisect import bisect_left
+
+# Latency buckets in seconds, tuned for a Pi serving small JSON payloads
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|%\(\w+\)s")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+_CASE_WHEN = re.compile(r"(?:WHEN \? THEN \?\s*)+")
+
+_normalized_cache = {}
+_NORMALIZED_CACHE_MAX = 2048
+
+def normalize_sql(sql):
+    """Collapses literals, placeholders and IN/CASE lists so one statement shape = one label."""
+    cached = _normalized_cache.get(sql)
+    if cached is not None:
+        return cached
+    text = sql.decode() if isinstance(sql, bytes) else str(sql)
+    text = _STRING_LITERAL.sub('?', text)
+    text = _PLACEHOLDER.sub('?', text)
+    text = _NUMBER_LITERAL.sub('?', text)
+    text = _WHITESPACE.sub(' ', text).strip()
+    text = _IN_LIST.sub('(...)', text)
+    text = _CASE_WHEN.sub('WHEN ... ', text)
+    if len(_normalized_cache) < _NORMALIZED_CACHE_MAX:
+        _normalized_cache[sql] = text
+    return text
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values."""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    def dump(self):
+        """JSON-safe copy of every series: [[labels, bucket counts, sum, count], ...]."""
+        with self._lock:
+            return [[list(labels), list(s[0]), s[1], s[2]] for labels, s in self._series.items()]
+
+    @staticmethod
+    def combine(states):
+        merged = {}
+        for state in states:
+            for labels, counts, total, count in state:
+                m = merged.setdefault(tuple(labels), [[0] * len(counts), 0.0, 0])
+                m[0] = [a + b for a, b in zip(m[0], counts)]
+                m[1] += total
+                m[2] += count
+        return [[list(labels), m[0], m[1], m[2]] for labels, m in merged.items()]
+
+    def render(self, others=()):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        snapshot = self.combine([self.dump(), *others]) if others else self.dump()
+        for labels, counts, total, count in snapshot:
+            base = _format_labels(self.label_names, labels)
+            running = 0
+            for bound, c in zip(self.buckets, counts):
+                running += c
+                lines.append(f"{self.name}_bucket{{{base}{',' if base else ''}le=\"{bound}\"}} {running}")
+            lines.append(f"{self.name}_bucket{{{base}{',' if base else ''}le=\"+Inf\"}} {count}")
+            lines.append(f"{self.name}_sum{{{base}}} {total}")
+            lines.append(f"{self.name}_count{{{base}}} {count}")
+        return lines
+
+class Counter:
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dump(self):
+        with self._lock:
+            return [[list(labels), value] for labels, value in self._values.items()]
+
+    @staticmethod
+    def combine(states):
+        merged = {}
+        for state in states:
+            for labels, value in state:
+                merged[tuple(labels)] = merged.get(tuple(labels), 0) + value
+        return [[list(labels), value] for labels, value in merged.items()]
+
+    def render(self, others=()):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        snapshot = self.combine([self.dump(), *others]) if others else self.dump()
+        for labels, value in snapshot:
+            lines.append(f"{self.name}{{{_format_labels(self.label_names, labels)}}} {value}")
+        return lines
+
+class Gauge:
+    """Gauge family whose values are read from a callback at scrape time."""
+
+    def __init__(self, name, help_text, collect):
+        self.name = name
+        self.help_text = help_text
+        self.collect = collect
+
+    def dump(self):
+        try:
+            return dict(self.collect())
+        except Exception:
+            return {}
+
+    @staticmethod
+    def combine(states):
+        # Per-process values (e.g. pool connections) add up to the server-wide figure
+        merged = {}
+        for state in states:
+            for key, value in state.items():
+                if isinstance(value, (int, float)):
+                    merged[key] = merged.get(key, 0) + value
+        return merged
+
+    def render(self, others=()):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        values = self.combine([self.dump(), *others]) if others else self.dump()
+        for key, value in values.items():
+            lines.append(f'{self.name}{{stat="{_escape(key)}"}} {value}')
+        return lines
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+def _format_labels(names, values):
+    return ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+
+# --- REGISTRY ---
+http_latency = Histogram('budget_http_request_duration_seconds', 'Request latency per route.',
+                         ('route', 'method'), LATENCY_BUCKETS)
+http_requests = Counter('budget_http_requests_total', 'Requests per route and status.',
+                        ('route', 'method', 'status'))
+sql_latency = Histogram('budget_sql_query_duration_seconds', 'Statement latency per normalized SQL.',
+                        ('statement',), LATENCY_BUCKETS)
+sql_rows = Histogram('budget_sql_rows_returned', 'Rows fetched per normalized SQL.',
+                     ('statement',), ROW_BUCKETS)
+pool_wait = Histogram('budget_db_pool_wait_seconds', 'Time spent waiting for a pooled connection.',
+                      (), LATENCY_BUCKETS)
+cache_events = Counter('budget_cache_events_total', 'Cache hits and misses per cache.',
+                       ('cache', 'result'))
+
+REGISTRY = [http_latency, http_requests, sql_latency, sql_rows, pool_wait, cache_events]
+
+def render_prometheus():
+    peers = peer_states()
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render([p[metric.name] for p in peers if metric.name in p]))
+    return "\n".join(lines) + "\n"
+
+def register_gauge(name, help_text, collect):
+    REGISTRY.append(Gauge(name, help_text, collect))
+
+def record_cache(cache, hit):
+    cache_events.inc((cache, 'hit' if hit else 'miss'))
+
+# Clients allowed to scrape /metrics when no METRICS_TOKEN is configured
+LOOPBACK = {'127.0.0.1', '::1'}
+
+# --- MULTI-PROCESS (gunicorn workers) ---
+# Every worker keeps its own registry. With a shared directory set, each one publishes a
+# copy every SYNC_INTERVAL seconds and /metrics adds up all of them, whichever worker
+# answers the scrape. Retiring workers fold their counts into a file that outlives them,
+# so counters never go backwards when gunicorn recycles a worker.
+SYNC_INTERVAL = 5.0
+RETIRED_FILE = 'metrics-retired.json'
+_shared_dir = None
+
+def _state_path(pid):
+    return os.path.join(_shared_dir, f"metrics-{pid}.json")
+
+def _write_json(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+def shared_lock(shared_dir, name, exclusive=True):
+    """Opens `name` in the shared directory holding an flock; closing the file releases it."""
+    f = open(os.path.join(shared_dir, name), 'a+')
+    fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+    return f
+
+def dump_state():
+    return {metric.name: metric.dump() for metric in REGISTRY}
+
+def peer_states():
+    """Published registries of the other workers (gauges only from live ones) plus retired totals."""
+    if _shared_dir is None:
+        return []
+    # Shared lock: a retiring worker moves its counts and deletes its file in one step
+    with shared_lock(_shared_dir, 'metrics.lock', exclusive=False):
+        return _read_peers()
+
+def _read_peers():
+    peers = []
+    for name in os.listdir(_shared_dir):
+        if not (name.startswith('metrics-') and name.endswith('.json')) or name == RETIRED_FILE:
+            continue
+        try:
+            pid = int(name[len('metrics-'):-len('.json')])
+        except ValueError:
+            continue
+        if pid == os.getpid():
+            continue
+        state = _read_json(os.path.join(_shared_dir, name))
+        if state is None:
+            continue
+        if not _alive(pid):
+            # Killed without worker_exit: its counts still count, its gauges don't
+            state = {k: v for k, v in state.items() if isinstance(v, list)}
+        peers.append(state)
+    retired = _read_json(os.path.join(_shared_dir, RETIRED_FILE))
+    if retired:
+        peers.append(retired)
+    return peers
+
+def enable_multiprocess(shared_dir):
+    """Starts publishing this process's registry to `shared_dir`. Call once per forked worker."""
+    global _shared_dir
+    _shared_dir = shared_dir
+    os.makedirs(shared_dir, exist_ok=True)
+
+    def _sync():
+        while True:
+            time.sleep(SYNC_INTERVAL)
+            try:
+                _write_json(_state_path(os.getpid()), dump_state())
+            except OSError:
+                pass
+
+    threading.Thread(target=_sync, name='metrics-sync', daemon=True).start()
+
+def retire_worker():
+    """Folds this worker's counters and histograms into the retired totals (gunicorn worker_exit)."""
+    if _shared_dir is None:
+        return
+    with shared_lock(_shared_dir, 'metrics.lock'):
+        retired = _read_json(os.path.join(_shared_dir, RETIRED_FILE)) or {}
+        for metric in REGISTRY:
+            if isinstance(metric, Gauge):
+                continue
+            retired[metric.name] = metric.combine([retired.get(metric.name, []), metric.dump()])
+        _write_json(os.path.join(_shared_dir, RETIRED_FILE), retired)
+        try:
+            os.remove(_state_path(os.getpid()))
+        except OSError:
+            pass
+
+# --- DB INSTRUMENTATION ---
+class InstrumentedCursor:
+    """Thin cursor proxy that times execute() and counts fetched rows per statement."""
+
+    def __init__(self, cursor, on_query=None):
+        self._cursor = cursor
+        self._on_query = on_query
+        self._statement = None
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        self._statement = normalize_sql(operation)
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, params, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            sql_latency.observe((self._statement,), elapsed)
+            if self._on_query is not None:
+                self._on_query(operation, params, elapsed)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        self._statement = normalize_sql(operation)
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            sql_latency.observe((self._statement,), elapsed)
+            if self._on_query is not None:
+                # EXPLAIN the first row's shape; the statement text is the same for all
+                self._on_query(operation, seq_params[0] if isinstance(seq_params, (list, tuple)) and seq_params else None, elapsed)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if self._statement is not None:
+            sql_rows.observe((self._statement,), 1 if row is not None else 0)
+        return row
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        if self._statement is not None:
+            sql_rows.observe((self._statement,), len(rows))
+        return rows
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+class InstrumentedConnection:
+    """
+    Connection proxy whose cursors are InstrumentedCursor instances. on_query, if
+    given, is called with (sql, params, seconds) after every statement.
+    """
+
+    def __init__(self, conn, on_query=None):
+        self._conn = conn
+        self._on_query = on_query
+
+    @property
+    def raw(self):
+        return self._conn
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._conn.cursor(*args, **kwargs), self._on_query)
+
+    def prepared_cursor(self, sql):
+        return InstrumentedCursor(self._conn.prepared_cursor(sql), self._on_query)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+# --- FLASK INTEGRATION ---
+def init_app(app):
+    """Registers request-timing hooks and the /metrics endpoint on a Flask app."""
+    from flask import g, request, Response, abort
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        started = g.pop('_metrics_start', None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            http_latency.observe((route, request.method), time.perf_counter() - started)
+            http_requests.inc((route, request.method, str(response.status_code)))
+        return response
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        # Route and statement timings are not for the whole LAN: without a token, loopback only
+        token = app.config.get('METRICS_TOKEN')
+        if token:
+            if not hmac.compare_digest(request.headers.get('Authorization', '').encode(), f"Bearer {token}".encode()):
+                abort(401)
+        elif request.remote_addr not in LOOPBACK:
+            abort(403)
+        return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
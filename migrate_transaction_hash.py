@@ -0,0 +1,169 @@
+import mysql.connector
+import os
+import sys
+import time
+import hashlib
+import argparse
+import logging
+from config import Config
+from db import get_connection
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+BENCH_TABLES = {
+    'hash_bench_hex': 'VARCHAR(64)', # Old layout: hex text
+    'hash_bench_bin': 'BINARY(32)',  # New layout: raw SHA-256 digest
+}
+BENCH_CHUNK = 1000
+
+def column_type(cursor):
+    """Current storage type of transactions.transaction_hash ('varchar', 'binary', ...)."""
+    if Config.DB_BACKEND == 'sqlite':
+        cursor.execute("SELECT typeof(transaction_hash) FROM transactions WHERE transaction_hash IS NOT NULL LIMIT 1")
+        row = cursor.fetchone()
+        return 'binary' if row is None or row[0] == 'blob' else 'varchar'
+    cursor.execute("""
+        SELECT DATA_TYPE FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'transactions' AND COLUMN_NAME = 'transaction_hash'
+    """)
+    return cursor.fetchone()[0].lower()
+
+def migrate(dry_run=False):
+    """Converts hex VARCHAR(64) hashes to BINARY(32) digests in place. Safe to re-run."""
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+    except mysql.connector.Error as err:
+        logger.error(f"Error connecting to Database: {err}")
+        sys.exit(1)
+
+    try:
+        current = column_type(cursor)
+        if current == 'binary':
+            logger.info("transaction_hash is already BINARY(32); nothing to do.")
+            return 0
+
+        cursor.execute("SELECT COUNT(*) FROM transactions WHERE transaction_hash IS NOT NULL")
+        total = cursor.fetchone()[0]
+        if dry_run:
+            logger.info(f"Dry run: would convert {total} hashes from {current} to BINARY(32).")
+            return total
+
+        if Config.DB_BACKEND == 'sqlite':
+            # Column affinity is advisory in SQLite, so the values can be rewritten in place
+            cursor.execute("""
+                UPDATE transactions SET transaction_hash = UNHEX(transaction_hash)
+                WHERE typeof(transaction_hash) = 'text' AND UNHEX(transaction_hash) IS NOT NULL
+            """)
+        else:
+            cursor.execute("ALTER TABLE transactions ADD COLUMN IF NOT EXISTS transaction_hash_bin BINARY(32) DEFAULT NULL")
+            # Anything that is not a 64-char hex digest (hand-edited rows) is re-hashed so it stays unique
+            cursor.execute("""
+                UPDATE transactions SET transaction_hash_bin = CASE
+                    WHEN transaction_hash REGEXP '^[0-9a-fA-F]{64}$' THEN UNHEX(transaction_hash)
+                    ELSE UNHEX(SHA2(transaction_hash, 256))
+                END
+                WHERE transaction_hash IS NOT NULL
+            """)
+            cursor.execute("""
+                ALTER TABLE transactions
+                    DROP COLUMN transaction_hash,
+                    CHANGE COLUMN transaction_hash_bin transaction_hash BINARY(32) DEFAULT NULL,
+                    ADD UNIQUE KEY transaction_hash (transaction_hash)
+            """)
+        conn.commit()
+        logger.info(f"Converted {total} transaction hashes to BINARY(32).")
+        return total
+
+    except Exception as e:
+        logger.error(f"Migration failed: {e}")
+        conn.rollback()
+        return 0
+    finally:
+        cursor.close()
+        conn.close()
+
+def index_size_bytes(cursor, table):
+    """On-disk size of the table's secondary indexes, or None if the backend can't report it."""
+    try:
+        if Config.DB_BACKEND == 'sqlite':
+            cursor.execute("SELECT SUM(pgsize) FROM dbstat WHERE name LIKE %s", (f"sqlite_autoindex_{table}%",))
+        else:
+            cursor.execute(f"ANALYZE TABLE {table}")
+            cursor.fetchall()
+            cursor.execute("""
+                SELECT INDEX_LENGTH FROM information_schema.TABLES
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+            """, (table,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+    except mysql.connector.Error:
+        # SQLite builds without the dbstat virtual table
+        return None
+
+def timed_insert(conn, cursor, table, values):
+    started = time.perf_counter()
+    for i in range(0, len(values), BENCH_CHUNK):
+        cursor.executemany(f"INSERT IGNORE INTO {table} (h) VALUES (%s)", [(v,) for v in values[i:i + BENCH_CHUNK]])
+        conn.commit()
+    return time.perf_counter() - started
+
+def benchmark(rows, probes):
+    """
+    Loads the same synthetic hashes into a hex and a binary scratch table and reports
+    index size, bulk insert time, duplicate re-insert (dedupe) time and point-probe time.
+    """
+    digests = [hashlib.sha256(os.urandom(16)).digest() for _ in range(rows)]
+    conn = get_connection()
+    cursor = conn.cursor()
+    results = {}
+    try:
+        for table, col_type in BENCH_TABLES.items():
+            values = [d.hex() for d in digests] if col_type.startswith('VARCHAR') else digests
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            cursor.execute(f"CREATE TABLE {table} (id INT AUTO_INCREMENT PRIMARY KEY, h {col_type} UNIQUE) ENGINE=InnoDB")
+
+            insert_s = timed_insert(conn, cursor, table, values)
+            # Every row is already present: this is the importer/sync dedupe path
+            dedupe_s = timed_insert(conn, cursor, table, values)
+
+            sample = values[::max(1, len(values) // probes)][:probes]
+            started = time.perf_counter()
+            for v in sample:
+                cursor.execute(f"SELECT id FROM {table} WHERE h = %s", (v,))
+                cursor.fetchall()
+            probe_s = time.perf_counter() - started
+
+            results[table] = {
+                'index_bytes': index_size_bytes(cursor, table),
+                'insert_s': insert_s,
+                'dedupe_s': dedupe_s,
+                'probe_us': probe_s / max(1, len(sample)) * 1e6,
+            }
+    finally:
+        for table in BENCH_TABLES:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.commit()
+        cursor.close()
+        conn.close()
+    return results
+
+def print_benchmark(results, rows):
+    print(f"\n{rows} hashes ({Config.DB_BACKEND})")
+    print(f"{'layout':<16}{'index':>12}{'insert':>10}{'dedupe':>10}{'probe':>10}")
+    for table, r in results.items():
+        size = f"{r['index_bytes'] / 1024 / 1024:.1f} MB" if r['index_bytes'] else "n/a"
+        print(f"{BENCH_TABLES[table]:<16}{size:>12}{r['insert_s']:>9.2f}s{r['dedupe_s']:>9.2f}s{r['probe_us']:>8.0f}us")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert transactions.transaction_hash from hex VARCHAR(64) to BINARY(32).")
+    parser.add_argument('--dry-run', action='store_true', help="Report how many hashes would be converted without writing")
+    parser.add_argument('--benchmark', type=int, metavar='ROWS', help="Compare hex vs binary hash indexes on ROWS synthetic rows instead of migrating")
+    parser.add_argument('--probes', type=int, default=2000, help="Point lookups timed per layout in --benchmark")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        print_benchmark(benchmark(args.benchmark, args.probes), args.benchmark)
+    else:
+        migrate(dry_run=args.dry_run)
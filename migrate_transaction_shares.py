@@ -0,0 +1,51 @@
+import mysql.connector
+import sys
+import argparse
+import logging
+from db import get_connection
+import repository
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def migrate(dry_run=False):
+    """
+    Populates transaction_shares from the legacy Gus_share / Joules_share columns.
+    Existing share rows are overwritten, so it is safe to re-run.
+    """
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+    except mysql.connector.Error as err:
+        logger.error(f"Error connecting to Database: {err}")
+        sys.exit(1)
+
+    try:
+        counts = {}
+        for user_id, column in repository.LEGACY_SHARE_COLUMNS.items():
+            cursor.execute(f"SELECT COUNT(*) FROM transactions WHERE {column} != 0")
+            counts[user_id] = cursor.fetchone()[0]
+        summary = ", ".join(f"user {u}: {n}" for u, n in counts.items())
+
+        if dry_run:
+            logger.info(f"Dry run: would write {sum(counts.values())} share rows ({summary}).")
+            return counts
+
+        repository.copy_legacy_shares(cursor)
+        conn.commit()
+        logger.info(f"transaction_shares populated ({summary}).")
+        return counts
+
+    except Exception as e:
+        logger.error(f"Migration failed: {e}")
+        conn.rollback()
+        return {}
+    finally:
+        cursor.close()
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Populate transaction_shares from the legacy per-member share columns.")
+    parser.add_argument('--dry-run', action='store_true', help="Report how many share rows would be written")
+    args = parser.parse_args()
+    migrate(dry_run=args.dry_run)
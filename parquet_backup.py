@@ -0,0 +1,303 @@
+import mysql.connector
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import logging
+from decimal import Decimal
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pyarrow as pa
+import pyarrow.parquet as pq
+from config import Config
+from db import get_connection
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema.sql')
+MANIFEST = 'manifest.json'
+FORMAT_VERSION = 1
+COMPRESSION = 'zstd'
+CHUNK_ROWS = 20000   # Rows per fetch and per Parquet row group; bounds memory on export
+INSERT_BATCH = 5000  # Rows per multi-row INSERT on restore; stays well under max_allowed_packet
+
+def schema_tables():
+    """Tables in schema.sql, in creation order (parents before the tables that reference them)."""
+    with open(SCHEMA_PATH) as f:
+        return re.findall(r"CREATE TABLE IF NOT EXISTS (\w+)", f.read())
+
+def connect():
+    try:
+        return get_connection()
+    except mysql.connector.Error as err:
+        logger.error(f"Error connecting to Database: {err}")
+        sys.exit(1)
+
+# --- TYPES ---
+def declared_columns(cursor, table):
+    """[(name, declared SQL type)] for a live table, or [] if it doesn't exist."""
+    if Config.DB_BACKEND == 'sqlite':
+        cursor.execute(f"PRAGMA table_info({table})")
+        columns = [(row[1], row[2]) for row in cursor.fetchall()]
+        # Declared types are advisory in SQLite: migrate_transaction_hash.py rewrites hex
+        # text to digests in place, so a VARCHAR column can hold BLOBs
+        for i, (name, declared) in enumerate(columns):
+            if arrow_type(declared) == pa.string():
+                cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {table} WHERE typeof({name}) = 'blob')")
+                if cursor.fetchone()[0]:
+                    columns[i] = (name, 'BLOB')
+        return columns
+    cursor.execute("""
+        SELECT COLUMN_NAME, COLUMN_TYPE FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY ORDINAL_POSITION
+    """, (table,))
+    return [(row[0], row[1]) for row in cursor.fetchall()]
+
+def arrow_type(declared):
+    """Maps a MySQL or SQLite column type onto the Arrow type it is stored as."""
+    t = declared.lower()
+    decimal = re.match(r"decimal\((\d+),\s*(\d+)\)", t)
+    if decimal:
+        return pa.decimal128(int(decimal.group(1)), int(decimal.group(2)))
+    if re.match(r"(tiny|small|medium|big)?int", t):
+        return pa.int64()
+    if t.startswith(('float', 'double', 'real')):
+        return pa.float64()
+    if t == 'date':
+        return pa.date32()
+    if t.startswith(('timestamp', 'datetime')):
+        return pa.timestamp('us')
+    if t.startswith(('binary', 'varbinary', 'blob')):
+        return pa.binary()
+    return pa.string()
+
+def column_values(values, arrow):
+    if pa.types.is_decimal(arrow):
+        # SQLite keeps DECIMAL as REAL, so values can carry more digits than the column's scale
+        step = Decimal(1).scaleb(-arrow.scale)
+        return [None if v is None else Decimal(v).quantize(step) for v in values]
+    return values
+
+# --- EXPORT ---
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def export_table(conn, table, out_dir, chunk_rows):
+    cursor = conn.cursor()
+    try:
+        columns = declared_columns(cursor, table)
+    except mysql.connector.errors.ProgrammingError:
+        columns = []
+    if not columns:
+        cursor.close()
+        logger.warning(f"Skipping {table}: not present in this database.")
+        return None
+
+    schema = pa.schema([(name, arrow_type(declared)) for name, declared in columns])
+    path = os.path.join(out_dir, f"{table}.parquet")
+    rows = 0
+    try:
+        cursor.execute(f"SELECT {', '.join(name for name, _ in columns)} FROM {table}")
+        with pq.ParquetWriter(path, schema, compression=COMPRESSION) as writer:
+            while True:
+                chunk = cursor.fetchmany(chunk_rows)
+                if not chunk:
+                    break
+                arrays = [pa.array(column_values(list(values), field.type), type=field.type)
+                          for values, field in zip(zip(*chunk), schema)]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                rows += len(chunk)
+    finally:
+        cursor.close()
+
+    return {
+        "name": table,
+        "file": os.path.basename(path),
+        "rows": rows,
+        "bytes": os.path.getsize(path),
+        "sha256": file_sha256(path),
+        "columns": [{"name": name, "type": declared} for name, declared in columns],
+    }
+
+def export(out_dir, chunk_rows=CHUNK_ROWS):
+    """
+    Streams every schema.sql table into `<out_dir>/<table>.parquet`, `chunk_rows` at a time,
+    then writes the manifest. All tables are read from one consistent snapshot.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    conn = connect()
+    started = time.perf_counter()
+    tables = []
+    try:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN" if Config.DB_BACKEND == 'sqlite' else "START TRANSACTION WITH CONSISTENT SNAPSHOT")
+        cursor.close()
+        for table in schema_tables():
+            table_started = time.perf_counter()
+            entry = export_table(conn, table, out_dir, chunk_rows)
+            if entry:
+                tables.append(entry)
+                logger.info(f"{table}: {entry['rows']} rows, {entry['bytes'] / 1024:.0f} KB in {time.perf_counter() - table_started:.2f}s")
+        conn.rollback()
+    except Exception as e:
+        logger.error(f"Export failed: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "created_at": datetime.now().isoformat(timespec='seconds'),
+        "source_backend": Config.DB_BACKEND,
+        "compression": COMPRESSION,
+        "tables": tables,
+    }
+    # Written last: a directory without a manifest is an incomplete export
+    with open(os.path.join(out_dir, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    total_rows = sum(t['rows'] for t in tables)
+    total_mb = sum(t['bytes'] for t in tables) / 1024 / 1024
+    logger.info(f"Exported {len(tables)} tables ({total_rows} rows, {total_mb:.1f} MB) to {out_dir} in {time.perf_counter() - started:.2f}s")
+    return manifest
+
+# --- RESTORE ---
+def load_manifest(in_dir):
+    path = os.path.join(in_dir, MANIFEST)
+    if not os.path.exists(path):
+        logger.error(f"No {MANIFEST} in {in_dir}; the export is missing or incomplete.")
+        sys.exit(1)
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != FORMAT_VERSION:
+        logger.error(f"Unsupported backup format {manifest.get('format_version')} (expected {FORMAT_VERSION}).")
+        sys.exit(1)
+    return manifest
+
+def verify(in_dir, entries):
+    """Checks every file against its manifest checksum before anything is written."""
+    for entry in entries:
+        path = os.path.join(in_dir, entry['file'])
+        if not os.path.exists(path) or file_sha256(path) != entry['sha256']:
+            logger.error(f"{entry['file']} is missing or does not match the manifest checksum.")
+            sys.exit(1)
+
+def load_table(cursor, in_dir, entry):
+    """Replaces a table's rows with the contents of its Parquet file. Returns rows loaded."""
+    table = entry['name']
+    live = {name for name, _ in declared_columns(cursor, table)}
+    if not live:
+        raise RuntimeError(f"table {table} does not exist; apply the schema first")
+    parquet = pq.ParquetFile(os.path.join(in_dir, entry['file']))
+    columns = [name for name in parquet.schema_arrow.names if name in live]
+    dropped = [name for name in parquet.schema_arrow.names if name not in live]
+    if dropped:
+        logger.warning(f"{table}: columns no longer in the schema are not restored: {', '.join(dropped)}")
+
+    cursor.execute(f"DELETE FROM {table}")
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    loaded = 0
+    for batch in parquet.iter_batches(batch_size=INSERT_BATCH, columns=columns):
+        rows = list(zip(*(batch.column(i).to_pylist() for i in range(batch.num_columns))))
+        cursor.executemany(sql, rows)
+        loaded += len(rows)
+    return loaded
+
+def restore_worker(in_dir, entry):
+    """One table on its own pooled connection and transaction (MariaDB parallel restore)."""
+    conn = connect()
+    cursor = conn.cursor()
+    started = time.perf_counter()
+    try:
+        # Tables load concurrently, so references are only consistent once every table is in
+        cursor.execute("SET SESSION unique_checks = 0, foreign_key_checks = 0")
+        loaded = load_table(cursor, in_dir, entry)
+        conn.commit()
+        return loaded, time.perf_counter() - started
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute("SET SESSION unique_checks = 1, foreign_key_checks = 1")
+        cursor.close()
+        conn.close()
+
+def restore(in_dir, workers=4, tables=None, dry_run=False):
+    """
+    Replaces the contents of every table in the backup (or just `tables`). On MariaDB the
+    tables load in parallel, one connection each, largest first. SQLite has a single writer,
+    so there they load one after another inside a single transaction.
+    """
+    manifest = load_manifest(in_dir)
+    entries = [t for t in manifest['tables'] if not tables or t['name'] in tables]
+    verify(in_dir, entries)
+    if dry_run:
+        for t in entries:
+            logger.info(f"Dry run: would restore {t['rows']} rows into {t['name']}.")
+        return
+
+    started = time.perf_counter()
+    failed = []
+    if Config.DB_BACKEND == 'sqlite':
+        conn = connect()
+        cursor = conn.cursor()
+        # As on MariaDB, references are not enforced mid-restore (and a partial restore must
+        # not cascade into tables it isn't loading). The pragma only applies outside a transaction.
+        cursor.execute("PRAGMA foreign_keys = OFF")
+        try:
+            for entry in entries:
+                logger.info(f"{entry['name']}: {load_table(cursor, in_dir, entry)} rows")
+            conn.commit()
+        except Exception as e:
+            logger.error(f"Restore failed, nothing was changed: {e}")
+            conn.rollback()
+            failed = [t['name'] for t in entries]
+        finally:
+            cursor.execute("PRAGMA foreign_keys = ON")
+            cursor.close()
+            conn.close()
+    else:
+        workers = max(1, min(workers, Config.DB_POOL_SIZE))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='restore') as pool:
+            futures = {pool.submit(restore_worker, in_dir, entry): entry
+                       for entry in sorted(entries, key=lambda t: t['bytes'], reverse=True)}
+            for future in as_completed(futures):
+                entry = futures[future]
+                try:
+                    loaded, seconds = future.result()
+                    logger.info(f"{entry['name']}: {loaded} rows in {seconds:.2f}s")
+                except Exception as e:
+                    logger.error(f"Restoring {entry['name']} failed: {e}")
+                    failed.append(entry['name'])
+
+    if failed:
+        logger.error(f"Restore incomplete; failed tables: {', '.join(failed)}")
+        sys.exit(1)
+    logger.info(f"Restored {len(entries)} tables ({sum(t['rows'] for t in entries)} rows) from {in_dir} in {time.perf_counter() - started:.2f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Back up the database to Parquet files and restore it from them.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('export', help="Stream every table to compressed Parquet plus a manifest")
+    p.add_argument('--out', default=os.path.join('data', 'backups', datetime.now().strftime('%Y%m%d-%H%M%S')),
+                   help="Backup directory (default: data/backups/<timestamp>)")
+    p.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help="Rows fetched and written per Parquet row group")
+    p = commands.add_parser('restore', help="Replace table contents with a Parquet backup")
+    p.add_argument('path', help="Backup directory containing manifest.json")
+    p.add_argument('--workers', type=int, default=4, help="Tables loaded in parallel (MariaDB only)")
+    p.add_argument('--tables', nargs='+', help="Only restore these tables")
+    p.add_argument('--dry-run', action='store_true', help="Verify checksums and report row counts without writing")
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        export(args.out, args.chunk_rows)
+    else:
+        restore(args.path, args.workers, args.tables, args.dry_run)
@@ -0,0 +1,308 @@
+import mysql.connector
+import sys
+import argparse
+import logging
+from datetime import date
+from config import Config
+from db import get_connection
+import analytics
+import repository
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Tables split by RANGE COLUMNS(date), one partition per year. MySQL requires every unique
+# key to contain the partition column, so date joins their primary keys.
+PARTITIONED_TABLES = {
+    'transactions': "DROP PRIMARY KEY, ADD PRIMARY KEY (id, date), "
+                    "DROP INDEX transaction_hash, ADD UNIQUE KEY transaction_hash (transaction_hash, date)",
+    'transaction_shares': "DROP PRIMARY KEY, ADD PRIMARY KEY (transaction_id, user_id, date)",
+}
+FUTURE_PARTITION = 'pfuture'
+
+ARCHIVE_COLUMNS = ("id, date, description, total_amount, user_id, category_id, payer_id, "
+                   "Gus_share, Joules_share, is_split, transaction_hash, created_at")
+SHARE_COLUMNS = "transaction_id, user_id, date, share"
+NOT_ROLLUP = "NOT IN (SELECT transaction_id FROM transaction_rollups)"
+
+def connect():
+    try:
+        conn = get_connection()
+        return conn, conn.cursor()
+    except mysql.connector.Error as err:
+        logger.error(f"Error connecting to Database: {err}")
+        sys.exit(1)
+
+def require_mysql():
+    if Config.DB_BACKEND == 'sqlite':
+        logger.error("Partitioning needs MariaDB/MySQL; the SQLite backend has no table partitions.")
+        sys.exit(1)
+
+# --- PARTITIONS ---
+def partition_names(cursor, table):
+    cursor.execute("""
+        SELECT PARTITION_NAME FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """, (table,))
+    return [row[0] for row in cursor.fetchall()]
+
+def year_partition(year):
+    return f"PARTITION p{year} VALUES LESS THAN ('{year + 1}-01-01')"
+
+def foreign_keys(cursor):
+    """(table, constraint) for every foreign key on or pointing at a partitioned table."""
+    tables = list(PARTITIONED_TABLES)
+    marks = ", ".join(["%s"] * len(tables))
+    cursor.execute(f"""
+        SELECT TABLE_NAME, CONSTRAINT_NAME FROM information_schema.REFERENTIAL_CONSTRAINTS
+        WHERE CONSTRAINT_SCHEMA = DATABASE() AND (TABLE_NAME IN ({marks}) OR REFERENCED_TABLE_NAME IN ({marks}))
+    """, tables + tables)
+    return cursor.fetchall()
+
+def enable(ahead=1, dry_run=False):
+    """
+    Converts transactions and transaction_shares to yearly RANGE partitions, from the first
+    recorded year to `ahead` years past the current one, plus a catch-all future partition.
+    """
+    require_mysql()
+    conn, cursor = connect()
+    try:
+        if partition_names(cursor, 'transactions'):
+            logger.info("transactions is already partitioned; adding any missing years instead.")
+            return ensure(ahead, dry_run)
+
+        cursor.execute("SELECT date FROM transactions ORDER BY date LIMIT 1")
+        first = (cursor.fetchone() or [None])[0]
+        current = date.today().year
+        years = range(first.year if first else current, current + ahead + 1)
+        layout = ", ".join([year_partition(y) for y in years] + [f"PARTITION {FUTURE_PARTITION} VALUES LESS THAN (MAXVALUE)"])
+
+        # Partitioned InnoDB tables can't have foreign keys; the app deletes shares explicitly
+        statements = [f"ALTER TABLE {table} DROP FOREIGN KEY {name}" for table, name in foreign_keys(cursor)]
+        for table, keys in PARTITIONED_TABLES.items():
+            statements.append(f"ALTER TABLE {table} {keys}")
+            statements.append(f"ALTER TABLE {table} PARTITION BY RANGE COLUMNS(date) ({layout})")
+
+        for sql in statements:
+            logger.info(f"{'Would run' if dry_run else 'Running'}: {sql}")
+            if not dry_run:
+                cursor.execute(sql)
+        if not dry_run:
+            logger.info(f"Partitioned {', '.join(PARTITIONED_TABLES)} into {len(years)} yearly partitions.")
+    finally:
+        cursor.close()
+        conn.close()
+
+def ensure(ahead=1, dry_run=False):
+    """Splits next years out of the future partition. Idempotent, so it can run from cron."""
+    require_mysql()
+    conn, cursor = connect()
+    try:
+        current = date.today().year
+        for table in PARTITIONED_TABLES:
+            existing = partition_names(cursor, table)
+            if not existing:
+                logger.warning(f"{table} is not partitioned; run `partition_transactions.py enable` first.")
+                continue
+            for year in range(current, current + ahead + 1):
+                if f"p{year}" in existing:
+                    continue
+                sql = (f"ALTER TABLE {table} REORGANIZE PARTITION {FUTURE_PARTITION} INTO "
+                       f"({year_partition(year)}, PARTITION {FUTURE_PARTITION} VALUES LESS THAN (MAXVALUE))")
+                logger.info(f"{'Would run' if dry_run else 'Running'}: {sql}")
+                if not dry_run:
+                    cursor.execute(sql)
+    finally:
+        cursor.close()
+        conn.close()
+
+def explain_partitions(cursor, sql, params):
+    """Partitions of `transactions` / `transaction_shares` a statement reads, per table alias."""
+    try:
+        cursor.execute(f"EXPLAIN PARTITIONS {sql}", params) # MariaDB
+    except mysql.connector.Error:
+        cursor.execute(f"EXPLAIN {sql}", params) # MySQL 8 always reports partitions
+    columns = [d[0] for d in cursor.description]
+    rows = [dict(zip(columns, r)) for r in cursor.fetchall()]
+    return {r['table']: r.get('partitions') for r in rows if r['table'] in ('s', 't')}
+
+def status():
+    require_mysql()
+    conn, cursor = connect()
+    try:
+        for table in list(PARTITIONED_TABLES) + ['transactions_archive']:
+            cursor.execute("""
+                SELECT PARTITION_NAME, TABLE_ROWS, DATA_LENGTH + INDEX_LENGTH FROM information_schema.PARTITIONS
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY PARTITION_ORDINAL_POSITION
+            """, (table,))
+            print(f"\n{table}")
+            for name, rows, size in cursor.fetchall():
+                print(f"  {name or '(unpartitioned)':<16}{rows or 0:>10} rows{(size or 0) / 1024 / 1024:>9.1f} MB")
+
+        print("\nPartitions read by the spending breakdown (user 0 / household):")
+        for period in ('current', 'last_3', 'last_month', 'lifetime'):
+            for user_id in (0, analytics.HOUSEHOLD_ID):
+                sql, params = analytics.parent_spending_query(user_id, period)
+                print(f"  {period:<11} user={user_id}: {explain_partitions(cursor, sql, params)}")
+    finally:
+        cursor.close()
+        conn.close()
+
+# --- ARCHIVE TIER ---
+def rollup_groups(details, shares):
+    """
+    Groups a year's transactions so that every analytics filter still selects whole groups:
+    month, category, owner, sign of the amount and which members hold a positive share.
+    Summing inside a group then gives the same totals for every view as the detail rows.
+    """
+    by_txn = {}
+    for txn_id, user_id, share in shares:
+        by_txn.setdefault(txn_id, {})[user_id] = share
+
+    groups = {}
+    for txn_id, d, category_id, owner, amount, gus, joules in details:
+        member_shares = by_txn.get(txn_id, {})
+        positive = tuple(sorted(u for u, s in member_shares.items() if s > 0))
+        key = (d.year, d.month, category_id, owner, amount < 0, positive)
+        group = groups.setdefault(key, {"date": d, "count": 0, "total": 0, "gus": 0, "joules": 0, "shares": {}})
+        # Earliest date keeps MIN(date)-based month counts (burn rate, lifetime income) unchanged
+        group['date'] = min(group['date'], d)
+        group['count'] += 1
+        group['total'] += amount
+        group['gus'] += gus or 0
+        group['joules'] += joules or 0
+        for u, s in member_shares.items():
+            group['shares'][u] = group['shares'].get(u, 0) + s
+    return groups
+
+def archive_year(cursor, year, dry_run=False):
+    bounds = (date(year, 1, 1), date(year + 1, 1, 1))
+    cursor.execute(f"""
+        SELECT id, date, category_id, user_id, total_amount, Gus_share, Joules_share FROM transactions
+        WHERE date >= %s AND date < %s AND id {NOT_ROLLUP}
+    """, bounds)
+    details = cursor.fetchall()
+    if not details:
+        return 0, 0
+    cursor.execute(f"""
+        SELECT transaction_id, user_id, share FROM transaction_shares
+        WHERE date >= %s AND date < %s AND transaction_id {NOT_ROLLUP}
+    """, bounds)
+    groups = rollup_groups(details, cursor.fetchall())
+    if dry_run:
+        return len(details), len(groups)
+
+    cursor.execute(f"""
+        INSERT INTO transactions_archive ({ARCHIVE_COLUMNS})
+        SELECT {ARCHIVE_COLUMNS} FROM transactions WHERE date >= %s AND date < %s AND id {NOT_ROLLUP}
+    """, bounds)
+    cursor.execute(f"""
+        INSERT INTO transaction_shares_archive ({SHARE_COLUMNS})
+        SELECT {SHARE_COLUMNS} FROM transaction_shares WHERE date >= %s AND date < %s AND transaction_id {NOT_ROLLUP}
+    """, bounds)
+    cursor.execute(f"DELETE FROM transaction_shares WHERE date >= %s AND date < %s AND transaction_id {NOT_ROLLUP}", bounds)
+    cursor.execute(f"DELETE FROM transactions WHERE date >= %s AND date < %s AND id {NOT_ROLLUP}", bounds)
+
+    for (y, m, category_id, owner, _, positive), g in groups.items():
+        cursor.execute("""
+            INSERT INTO transactions (date, description, total_amount, user_id, category_id, payer_id,
+                                      Gus_share, Joules_share, is_split, transaction_hash)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, NULL)
+        """, (g['date'], f"Archived rollup {y}-{m:02d} ({g['count']} transactions)", g['total'], owner,
+              category_id, owner, g['gus'], g['joules'], 1 if len(positive) > 1 else 0))
+        txn_id = cursor.lastrowid
+        cursor.execute("INSERT INTO transaction_rollups (transaction_id, archive_year) VALUES (%s, %s)", (txn_id, year))
+        repository.save_shares(cursor, txn_id, g['date'], g['shares'])
+    return len(details), len(groups)
+
+def archive(through_year, dry_run=False):
+    """Moves every year up to `through_year` into the archive tier, one transaction per year."""
+    # Rolling windows (last 3 months, burn rate's 1 year) must never reach a rollup row
+    latest_allowed = date.today().year - 2
+    if through_year > latest_allowed:
+        logger.error(f"Only years up to {latest_allowed} can be archived; the last full year stays detailed.")
+        sys.exit(1)
+
+    conn, cursor = connect()
+    try:
+        cursor.execute("SELECT date FROM transactions ORDER BY date LIMIT 1")
+        first = (cursor.fetchone() or [None])[0]
+        if first is None:
+            logger.info("No transactions to archive.")
+            return
+        for year in range(first.year, through_year + 1):
+            try:
+                moved, rollups = archive_year(cursor, year, dry_run)
+            except Exception as e:
+                logger.error(f"Archiving {year} failed: {e}")
+                conn.rollback()
+                return
+            if not moved:
+                continue
+            if dry_run:
+                logger.info(f"Dry run: {year} would collapse {moved} transactions into {rollups} rollups.")
+            else:
+                conn.commit()
+                logger.info(f"Archived {year}: {moved} transactions -> {rollups} rollups.")
+    finally:
+        cursor.close()
+        conn.close()
+
+def restore(year):
+    """Puts an archived year's detail rows back and removes its rollups."""
+    bounds = (date(year, 1, 1), date(year + 1, 1, 1))
+    conn, cursor = connect()
+    try:
+        rollup_ids = "SELECT transaction_id FROM transaction_rollups WHERE archive_year = %s"
+        cursor.execute(f"DELETE FROM transaction_shares WHERE transaction_id IN ({rollup_ids})", (year,))
+        cursor.execute(f"DELETE FROM transactions WHERE id IN ({rollup_ids})", (year,))
+        cursor.execute("DELETE FROM transaction_rollups WHERE archive_year = %s", (year,))
+        cursor.execute(f"""
+            INSERT INTO transactions ({ARCHIVE_COLUMNS})
+            SELECT {ARCHIVE_COLUMNS} FROM transactions_archive WHERE date >= %s AND date < %s
+        """, bounds)
+        restored = cursor.rowcount
+        cursor.execute(f"""
+            INSERT INTO transaction_shares ({SHARE_COLUMNS})
+            SELECT {SHARE_COLUMNS} FROM transaction_shares_archive WHERE date >= %s AND date < %s
+        """, bounds)
+        cursor.execute("DELETE FROM transaction_shares_archive WHERE date >= %s AND date < %s", bounds)
+        cursor.execute("DELETE FROM transactions_archive WHERE date >= %s AND date < %s", bounds)
+        conn.commit()
+        logger.info(f"Restored {restored} transactions for {year}.")
+    except Exception as e:
+        logger.error(f"Restoring {year} failed: {e}")
+        conn.rollback()
+    finally:
+        cursor.close()
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Yearly partitions and the archive tier for transactions.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('enable', help="Partition transactions / transaction_shares by year (MariaDB/MySQL)")
+    p.add_argument('--ahead', type=int, default=1, help="Future years to create partitions for")
+    p.add_argument('--dry-run', action='store_true')
+    p = commands.add_parser('ensure', help="Create partitions for the current and next years (cron-safe)")
+    p.add_argument('--ahead', type=int, default=1)
+    p.add_argument('--dry-run', action='store_true')
+    commands.add_parser('status', help="Partition sizes and which partitions dashboard queries read")
+    p = commands.add_parser('archive', help="Move closed years to the compressed archive, leaving monthly rollups")
+    p.add_argument('--through', type=int, required=True, help="Last year to archive")
+    p.add_argument('--dry-run', action='store_true')
+    p = commands.add_parser('restore', help="Bring an archived year's detail rows back")
+    p.add_argument('year', type=int)
+    args = parser.parse_args()
+
+    if args.command == 'enable':
+        enable(args.ahead, args.dry_run)
+    elif args.command == 'ensure':
+        ensure(args.ahead, args.dry_run)
+    elif args.command == 'status':
+        status()
+    elif args.command == 'archive':
+        archive(args.through, args.dry_run)
+    else:
+        restore(args.year)
@@ -0,0 +1,125 @@
+import re
+import sys
+import argparse
+from datetime import datetime
+from config import Config
+from db import get_connection
+from benchmark import build_cases
+
+# Upper bound on SQL statements per request, to catch N+1 style regressions
+MAX_STATEMENTS = {
+    'dashboard_summary': 6,
+    'parent_categories': 1,
+    'budget_progress': 1,
+    'housing_ratio': 2,
+    'transactions': 2,
+    'finance_history': 1,
+    'burn_rate': 4,
+}
+
+# Indexes on the ledger tables that count as "expected" access paths, per table alias
+TRANSACTION_INDEXES = {'date', 'category_id', 'user_id', 'PRIMARY'}
+SHARE_INDEXES = {'idx_shares_user_date', 'idx_shares_date', 'PRIMARY'}
+EXPECTED_INDEXES = {
+    't': TRANSACTION_INDEXES, 'transactions': TRANSACTION_INDEXES,
+    's': SHARE_INDEXES, 'transaction_shares': SHARE_INDEXES,
+}
+DATE_PREDICATE = re.compile(r"\bdate\s*(?:>=|<=|<|>|=|BETWEEN)", re.IGNORECASE)
+
+def explain(conn, sql, params):
+    cursor = conn.cursor(dictionary=True, buffered=True)
+    try:
+        cursor.execute(f"EXPLAIN {sql}", params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+def check_plan(plan, sql):
+    """Returns a list of problems with how the plan reads `transactions` / `transaction_shares`."""
+    problems = []
+    # Statements without any date bound legitimately read the whole ledger
+    date_bounded = bool(DATE_PREDICATE.search(sql))
+    for row in plan:
+        table = row.get('table')
+        table = table.decode() if isinstance(table, (bytes, bytearray)) else table
+        if table not in EXPECTED_INDEXES:
+            continue
+        access, key = row.get('type'), row.get('key')
+        if date_bounded and access == 'ALL':
+            problems.append(f"full scan (type=ALL) on {table}")
+        elif date_bounded and key not in EXPECTED_INDEXES[table]:
+            problems.append(f"{table} read via unexpected key {key!r} (type={access})")
+    return problems
+
+def run_checks(months):
+    import app as app_module
+    app = app_module.app
+    app.config['LOGIN_DISABLED'] = True
+    app.config['TESTING'] = True
+    client = app.test_client()
+
+    conn = get_connection()
+    # SQLite's EXPLAIN QUERY PLAN has no table/type/key columns; cross-backend results are backend_parity.py's job
+    check_plans = Config.DB_BACKEND != 'sqlite'
+    if not check_plans:
+        print("SQLite backend: checking HTTP status and statement budgets only.")
+
+    failures = []
+    original_collect = app_module.collect_query
+    try:
+        for name, user_id, period, url in build_cases(months):
+            captured = []
+
+            def recorder(sql, params, duration):
+                captured.append((sql, params))
+                original_collect(sql, params, duration)
+
+            # get_db() looks collect_query up at call time, so this sees every statement
+            app_module.collect_query = recorder
+            res = client.get(url)
+            app_module.collect_query = original_collect
+
+            label = f"{name}[user={user_id},period={period}]"
+            if res.status_code != 200:
+                failures.append(f"{label}: HTTP {res.status_code}")
+                continue
+
+            limit = MAX_STATEMENTS.get(name)
+            if limit is not None and len(captured) > limit:
+                failures.append(f"{label}: {len(captured)} statements (max {limit})")
+
+            for sql, params in (captured if check_plans else []):
+                text = sql.decode() if isinstance(sql, bytes) else str(sql)
+                if not text.lstrip().upper().startswith(('SELECT', 'WITH')) or 'transaction' not in text:
+                    continue
+                for problem in check_plan(explain(conn, text, params), text):
+                    failures.append(f"{label}: {problem}\n    {' '.join(text.split())[:200]}")
+
+            print(f"{'FAIL' if failures and failures[-1].startswith(label) else 'ok  '} {label} ({len(captured)} statements)")
+    finally:
+        app_module.collect_query = original_collect
+        conn.close()
+
+    return failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EXPLAIN every analytics query and enforce per-endpoint statement budgets.")
+    parser.add_argument('--seed-data', action='store_true', help="Generate a synthetic dataset first (use a scratch database)")
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--tx-per-month', type=int, default=200)
+    parser.add_argument('--month', action='append', default=[], help="Extra YYYY-MM period to check (repeatable)")
+    args = parser.parse_args()
+
+    if args.seed_data:
+        from backfill_history import generate_dataset
+        generate_dataset(datetime.now().year - args.years + 1, args.years, 2, args.tx_per_month, 42)
+
+    # Always include one specific month so the YYYY-MM branch is covered
+    months = args.month or [datetime.now().strftime('%Y-%m')]
+    failures = run_checks(months)
+    if failures:
+        print(f"\n{len(failures)} query plan / statement budget failures:")
+        for f in failures:
+            print(f"  - {f}")
+        sys.exit(1)
+    print("\nAll query plans and statement budgets OK.")
@@ -1,22 +1,45 @@
 import mysql.connector
 import sys
+import argparse
 import logging
-from config import Config
+from db import get_connection
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def repair_data():
+# table -> value column
+HISTORY_TABLES = {
+    'net_worth_history': 'total_value',
+    'income_history': 'total_net_income',
+}
+
+def compute_locf_gaps(rows, all_dates, users):
+    """
+    Single pass Last Observation Carried Forward.
+    rows: (user_id, snapshot_date, value) tuples sorted by user_id, snapshot_date.
+    Returns the (user_id, snapshot_date, value) rows that are missing.
+    """
+    observed = {}
+    for user_id, d, value in rows:
+        observed.setdefault(user_id, {})[d] = value
+
+    missing = []
+    for user_id in users:
+        series = observed.get(user_id, {})
+        last = 0
+        for d in all_dates:
+            if d in series:
+                last = series[d]
+            elif last > 0:
+                missing.append((user_id, d, last))
+    return missing
+
+def repair_data(users=None, dry_run=False):
     logger.info("Starting historical data repair (LOF - Last Observation Carried Forward)...")
-    
+
     try:
-        conn = mysql.connector.connect(
-            host=Config.DB_HOST,
-            user=Config.DB_USER,
-            password=Config.DB_PASS,
-            database=Config.DB_NAME
-        )
-        cursor = conn.cursor(dictionary=True, buffered=True)
+        conn = get_connection()
+        cursor = conn.cursor()
     except mysql.connector.Error as err:
         logger.error(f"Error connecting to Database: {err}")
         sys.exit(1)
@@ -30,51 +53,66 @@ def repair_data():
                 SELECT snapshot_date FROM income_history
             ) AS all_dates ORDER BY snapshot_date ASC
         """)
-        all_dates = [row['snapshot_date'] for row in cursor.fetchall()]
-        
+        all_dates = [row[0] for row in cursor.fetchall()]
+
         if not all_dates:
             logger.info("No history data found to repair.")
-            return
-
-        # 2. For each user and each date, ensure a record exists
-        users = [0, 1] # Gus and Joules
-        
-        for user_id in users:
-            logger.info(f"Repairing data for User {user_id}...")
-            
-            # Net Worth
-            last_nw = 0
-            for d in all_dates:
-                cursor.execute("SELECT total_value FROM net_worth_history WHERE user_id = %s AND snapshot_date = %s", (user_id, d))
-                row = cursor.fetchone()
-                if row:
-                    last_nw = row['total_value']
-                else:
-                    if last_nw > 0:
-                        logger.info(f"  [NW] Filling missing {d} for User {user_id} with {last_nw}")
-                        cursor.execute("INSERT INTO net_worth_history (user_id, snapshot_date, total_value) VALUES (%s, %s, %s)", (user_id, d, last_nw))
-            
-            # Income
-            last_inc = 0
-            for d in all_dates:
-                cursor.execute("SELECT total_net_income FROM income_history WHERE user_id = %s AND snapshot_date = %s", (user_id, d))
-                row = cursor.fetchone()
-                if row:
-                    last_inc = row['total_net_income']
-                else:
-                    if last_inc > 0:
-                        logger.info(f"  [INC] Filling missing {d} for User {user_id} with {last_inc}")
-                        cursor.execute("INSERT INTO income_history (user_id, snapshot_date, total_net_income) VALUES (%s, %s, %s)", (user_id, d, last_inc))
-        
-        conn.commit()
-        logger.info("Data repair complete!")
-        
+            return {}
+
+        # 2. Default to every individual user that has any history
+        if users is None:
+            cursor.execute("""
+                SELECT user_id FROM net_worth_history
+                UNION
+                SELECT user_id FROM income_history
+            """)
+            users = sorted(row[0] for row in cursor.fetchall())
+
+        if not users:
+            logger.info("No users selected for repair.")
+            return {}
+
+        # 3. One read and one bulk insert per table, regardless of history length
+        user_sql = ", ".join(["%s"] * len(users))
+        plan = {}
+        for table, value_col in HISTORY_TABLES.items():
+            cursor.execute(f"""
+                SELECT user_id, snapshot_date, {value_col} FROM {table}
+                WHERE user_id IN ({user_sql})
+                ORDER BY user_id, snapshot_date
+            """, list(users))
+            missing = compute_locf_gaps(cursor.fetchall(), all_dates, users)
+            plan[table] = missing
+
+            for user_id, d, value in missing:
+                logger.info(f"  [{table}] {'Would fill' if dry_run else 'Filling'} missing {d} for User {user_id} with {value}")
+
+            if missing and not dry_run:
+                cursor.executemany(f"""
+                    INSERT IGNORE INTO {table} (user_id, snapshot_date, {value_col})
+                    VALUES (%s, %s, %s)
+                """, missing)
+
+        summary = ", ".join(f"{table}: {len(rows)}" for table, rows in plan.items())
+        if dry_run:
+            conn.rollback()
+            logger.info(f"Dry run complete, nothing written ({summary}).")
+        else:
+            conn.commit()
+            logger.info(f"Data repair complete! ({summary})")
+        return plan
+
     except Exception as e:
         logger.error(f"An error occurred: {e}")
         conn.rollback()
+        return {}
     finally:
         cursor.close()
         conn.close()
 
 if __name__ == "__main__":
-    repair_data()
+    parser = argparse.ArgumentParser(description="Fill history gaps with Last Observation Carried Forward.")
+    parser.add_argument('--users', type=int, nargs='+', help="User IDs to repair (default: all users with history)")
+    parser.add_argument('--dry-run', action='store_true', help="Show the rows that would be inserted without writing them")
+    args = parser.parse_args()
+    repair_data(users=args.users, dry_run=args.dry_run)
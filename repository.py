@@ -0,0 +1,78 @@
+import sys
+import mysql.connector
+from decimal import Decimal
+
+def convert_row(columns, row):
+    """
+    The one place DB values become JSON-ready Python values: DECIMAL -> float and
+    binary-protocol strings (bytearray on some connector versions) -> str. Dates
+    stay date objects so callers can format or compare them.
+    """
+    out = {}
+    for col, value in zip(columns, row):
+        if isinstance(value, Decimal):
+            value = float(value)
+        elif isinstance(value, (bytes, bytearray)):
+            value = value.decode()
+        out[col] = value
+    return out
+
+def fetch_all(conn, sql, params=()):
+    """
+    Runs a hot read query through a server-side prepared statement cached on the
+    pooled connection, so repeats skip parsing and planning. Returns converted dict rows.
+    """
+    # Interned text: the connector only reuses a prepared statement for the same string object
+    sql = sys.intern(sql)
+    cursor = conn.prepared_cursor(sql)
+    cursor.execute(sql, tuple(params))
+    rows = cursor.fetchall()
+    columns = [d[0] for d in cursor.description] if cursor.description else []
+    return [convert_row(columns, r) for r in rows]
+
+def fetch_one(conn, sql, params=()):
+    rows = fetch_all(conn, sql, params)
+    return rows[0] if rows else None
+
+# --- TRANSACTION SHARES ---
+# Legacy per-member columns on `transactions`, kept for the transaction editor and
+# mirrored into transaction_shares, which is what the analytics read.
+LEGACY_SHARE_COLUMNS = {0: 'Gus_share', 1: 'Joules_share'}
+
+SHARES_UPSERT_SQL = """
+    INSERT INTO transaction_shares (transaction_id, user_id, date, share)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE date = VALUES(date), share = VALUES(share)
+"""
+
+def save_shares(cursor, transaction_id, txn_date, shares):
+    """
+    Writes one transaction's {user_id: share} to transaction_shares, replacing any
+    previous split. Zero shares are not stored.
+    """
+    cursor.execute("DELETE FROM transaction_shares WHERE transaction_id = %s", (transaction_id,))
+    rows = [(transaction_id, user_id, txn_date, share) for user_id, share in shares.items() if share]
+    if rows:
+        cursor.executemany(SHARES_UPSERT_SQL, rows)
+
+def copy_legacy_shares(cursor, min_id=0):
+    """Fills transaction_shares from the legacy share columns for transactions with id >= min_id."""
+    copied = 0
+    for user_id, column in LEGACY_SHARE_COLUMNS.items():
+        cursor.execute(f"""
+            INSERT INTO transaction_shares (transaction_id, user_id, date, share)
+            SELECT id, %s, date, {column} FROM transactions
+            WHERE id >= %s AND {column} != 0
+            ON DUPLICATE KEY UPDATE date = VALUES(date), share = VALUES(share)
+        """, (user_id, min_id))
+        copied += cursor.rowcount
+    return copied
+
+def archived_years(cursor):
+    """Years moved to the archive tier; they are closed, so imports and syncs leave them alone."""
+    try:
+        cursor.execute("SELECT DISTINCT archive_year FROM transaction_rollups")
+    except mysql.connector.errors.ProgrammingError:
+        # Database created before the archive tables existed
+        return set()
+    return {r['archive_year'] if isinstance(r, dict) else r[0] for r in cursor.fetchall()}
@@ -1,16 +1,10 @@
-import mysql.connector
 import sys
 from werkzeug.security import generate_password_hash
-from config import Config
+from db import get_connection
 
 def reset_password(username, new_password):
     try:
-        conn = mysql.connector.connect(
-            host=Config.DB_HOST,
-            user=Config.DB_USER,
-            password=Config.DB_PASS,
-            database=Config.DB_NAME
-        )
+        conn = get_connection()
         cursor = conn.cursor()
         
         pw_hash = generate_password_hash(new_password)
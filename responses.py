@@ -0,0 +1,89 @@
+import json
+import gzip
+from decimal import Decimal
+from datetime import date, datetime
+from flask import Response, request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this go out uncompressed; the headers would eat most of the saving
+MIN_COMPRESS_BYTES = 1024
+# Low levels: on the Pi the CPU spent compressing matters more than the last few percent of size
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    if isinstance(obj, (bytes, bytearray)):
+        return obj.hex()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+def dumps(payload):
+    """
+    JSON bytes with DECIMAL columns as numbers and dates as ISO strings, so rows straight
+    from a cursor need no per-row conversion. Uses orjson when installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default)
+    return json.dumps(payload, default=_default, separators=(',', ':')).encode()
+
+def wants_columns():
+    return request.args.get('format') == 'columns'
+
+def rows_payload(rows):
+    """
+    Rows as sent to the client: a list of objects, or with ?format=columns one array
+    per column ({"id": [...], "date": [...]}), which doesn't repeat every key per row.
+    """
+    if not wants_columns():
+        return rows
+    if not rows:
+        return {}
+    return {key: [r[key] for r in rows] for key in rows[0]}
+
+def accepted_encodings():
+    """Codings from Accept-Encoding with a non-zero q value."""
+    accepted = set()
+    for part in request.headers.get('Accept-Encoding', '').split(','):
+        coding, _, params = part.strip().partition(';')
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+def compress(body):
+    """(body, Content-Encoding or None), preferring brotli over gzip when the client takes both."""
+    if len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+    accepted = accepted_encodings()
+    if brotli is not None and 'br' in accepted:
+        return brotli.compress(body, quality=BROTLI_QUALITY), 'br'
+    if 'gzip' in accepted:
+        return gzip.compress(body, compresslevel=GZIP_LEVEL), 'gzip'
+    return body, None
+
+def json_response(payload, status=200):
+    """Serializes with dumps() and compresses according to the request's Accept-Encoding."""
+    body, encoding = compress(dumps(payload))
+    response = Response(body, status=status, mimetype='application/json')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
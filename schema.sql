@@ -69,7 +69,7 @@ CREATE TABLE IF NOT EXISTS transactions (
     Gus_share DECIMAL(10, 2) DEFAULT 0.00,
     Joules_share DECIMAL(10, 2) DEFAULT 0.00,
     is_split TINYINT(1) DEFAULT 0,
-    transaction_hash VARCHAR(64) UNIQUE,
+    transaction_hash BINARY(32) UNIQUE, -- raw SHA-256 digest (see migrate_transaction_hash.py)
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE SET NULL,
     INDEX (date),
@@ -156,3 +156,66 @@ CREATE TABLE IF NOT EXISTS savings (
     FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
     FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE SET NULL
 ) ENGINE=InnoDB;
+
+
+-- 11. Categorization Rules Table
+-- Case-insensitive "description contains" rules applied at import/sync time
+CREATE TABLE IF NOT EXISTS category_rules (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    pattern VARCHAR(255) NOT NULL,
+    priority INT DEFAULT 0,
+    category_id INT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY unique_pattern (pattern),
+    FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+-- 12. Transaction Shares Table
+-- One row per household member with a non-zero share of a transaction. The date is copied
+-- from the transaction so per-member views are (user_id, date) index range scans.
+CREATE TABLE IF NOT EXISTS transaction_shares (
+    transaction_id INT NOT NULL,
+    user_id INT NOT NULL,
+    date DATE NOT NULL,
+    share DECIMAL(10, 2) NOT NULL,
+    PRIMARY KEY (transaction_id, user_id),
+    INDEX idx_shares_user_date (user_id, date),
+    INDEX idx_shares_date (date),
+    FOREIGN KEY (transaction_id) REFERENCES transactions(id) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+-- 13. Archive Tier (see partition_transactions.py)
+-- Closed years are moved here, compressed. In their place `transactions` keeps one pre-summed
+-- rollup row per (month, category, owner, share signs), listed in transaction_rollups, so
+-- lifetime and per-month views over archived years still add up.
+CREATE TABLE IF NOT EXISTS transactions_archive (
+    id INT PRIMARY KEY,
+    date DATE NOT NULL,
+    description VARCHAR(255) NOT NULL,
+    total_amount DECIMAL(10, 2) NOT NULL,
+    user_id INT NOT NULL,
+    category_id INT,
+    payer_id INT,
+    Gus_share DECIMAL(10, 2) DEFAULT 0.00,
+    Joules_share DECIMAL(10, 2) DEFAULT 0.00,
+    is_split TINYINT(1) DEFAULT 0,
+    transaction_hash BINARY(32),
+    created_at TIMESTAMP NULL DEFAULT NULL,
+    INDEX (date),
+    INDEX (transaction_hash)
+) ENGINE=InnoDB ROW_FORMAT=COMPRESSED;
+
+CREATE TABLE IF NOT EXISTS transaction_shares_archive (
+    transaction_id INT NOT NULL,
+    user_id INT NOT NULL,
+    date DATE NOT NULL,
+    share DECIMAL(10, 2) NOT NULL,
+    PRIMARY KEY (transaction_id, user_id),
+    INDEX (date)
+) ENGINE=InnoDB ROW_FORMAT=COMPRESSED;
+
+CREATE TABLE IF NOT EXISTS transaction_rollups (
+    transaction_id INT PRIMARY KEY,
+    archive_year INT NOT NULL,
+    INDEX (archive_year)
+) ENGINE=InnoDB;
@@ -0,0 +1,203 @@
+-- BudgetApp schema for the embedded SQLite backend (DB_BACKEND=sqlite)
+-- Table-for-table equivalent of schema.sql; applied automatically on first connect and safe to re-run.
+-- Text keys compare case-insensitively (NOCASE) to match MySQL's default collation.
+
+-- 1. Users Table
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    name VARCHAR(100) NOT NULL COLLATE NOCASE,
+    password_hash VARCHAR(255) DEFAULT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Initial users (Default IDs for multi-profile toggle)
+INSERT OR IGNORE INTO users (user_id, name) VALUES
+(0, 'Gus'),
+(1, 'Joules'),
+(2, 'Household');
+
+-- 2. Categories Table
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(255) NOT NULL UNIQUE COLLATE NOCASE,
+    parent_name VARCHAR(255) DEFAULT 'Other' COLLATE NOCASE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Standardized Categories
+INSERT OR IGNORE INTO categories (id, name, parent_name) VALUES
+(2, 'Electricity', 'Utilities'),
+(4, 'Gas', 'Utilities'),
+(6, 'TV/Phone/Internet', 'Utilities'),
+(13, 'Rent', 'Home'),
+(19, 'Bus/train', 'Transport'),
+(39, 'General', 'Other');
+
+-- Expanded Categories for immediate usability
+INSERT OR IGNORE INTO categories (name, parent_name) VALUES
+('Groceries', 'Food'),
+('Dining out', 'Food'),
+('Entertainment', 'Lifestyle'),
+('Health', 'Personal'),
+('Shopping', 'Lifestyle'),
+('Travel', 'Lifestyle'),
+('Insurance', 'Finance'),
+('Maintenance', 'Home'),
+('Water', 'Utilities'),
+('Subscriptions', 'Lifestyle'),
+('Other', 'Other'),
+('Uncategorized', 'Other'),
+('High liquidity (bank accounts)', 'Savings'),
+('Brokerage', 'Savings'),
+('Pension', 'Savings'),
+('Other Savings', 'Savings'),
+('Home Office', 'Work'),
+('Gifts', 'Personal'),
+('One-Off Income', 'Income');
+
+-- 3. Transactions Table
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date DATE NOT NULL,
+    description VARCHAR(255) NOT NULL,
+    total_amount DECIMAL(10, 2) NOT NULL,
+    user_id INTEGER NOT NULL,
+    category_id INTEGER REFERENCES categories(id) ON DELETE SET NULL,
+    payer_id INTEGER, -- 0: Gus, 1: Joules
+    Gus_share DECIMAL(10, 2) DEFAULT 0.00,
+    Joules_share DECIMAL(10, 2) DEFAULT 0.00,
+    is_split INTEGER DEFAULT 0,
+    transaction_hash BLOB UNIQUE, -- raw SHA-256 digest
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date);
+CREATE INDEX IF NOT EXISTS idx_transactions_user_id ON transactions (user_id);
+CREATE INDEX IF NOT EXISTS idx_transactions_category_id ON transactions (category_id);
+
+-- 4. Budget Targets Table
+CREATE TABLE IF NOT EXISTS budgets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    category_name VARCHAR(255) NOT NULL COLLATE NOCASE REFERENCES categories(name) ON DELETE CASCADE ON UPDATE CASCADE,
+    target_amount DECIMAL(10, 2) DEFAULT 0.00,
+    target_percent DECIMAL(5, 2) DEFAULT 0.00,
+    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (user_id, category_name)
+);
+
+-- 5. Assets (Net Worth) Table
+CREATE TABLE IF NOT EXISTS assets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    asset_name VARCHAR(255) NOT NULL,
+    asset_type VARCHAR(100),
+    current_value DECIMAL(12, 2) DEFAULT 0.00,
+    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_assets_user_id ON assets (user_id);
+
+-- 6. Income Streams Table
+CREATE TABLE IF NOT EXISTS income_streams (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    source_name VARCHAR(255) NOT NULL COLLATE NOCASE,
+    monthly_gross DECIMAL(10, 2) DEFAULT 0.00,
+    tax_rate DECIMAL(5, 2) DEFAULT 0.00,
+    UNIQUE (user_id, source_name)
+);
+
+-- 7. Net Worth History Table
+CREATE TABLE IF NOT EXISTS net_worth_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    snapshot_date DATE NOT NULL,
+    total_value DECIMAL(15, 2) NOT NULL,
+    UNIQUE (user_id, snapshot_date)
+);
+
+-- 8. Income History Table
+CREATE TABLE IF NOT EXISTS income_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    snapshot_date DATE NOT NULL,
+    total_net_income DECIMAL(15, 2) NOT NULL,
+    UNIQUE (user_id, snapshot_date)
+);
+
+-- 9. User Settings Table
+CREATE TABLE IF NOT EXISTS user_settings (
+    user_id INTEGER PRIMARY KEY REFERENCES users(user_id) ON DELETE CASCADE,
+    savings_goal_pct DECIMAL(5, 2) DEFAULT 20.00,
+    expenses_goal_pct DECIMAL(5, 2) DEFAULT 50.00
+);
+
+-- Default Settings Initialization
+INSERT OR IGNORE INTO user_settings (user_id, savings_goal_pct, expenses_goal_pct) VALUES
+(0, 20.00, 50.00),
+(1, 20.00, 50.00),
+(2, 20.00, 50.00);
+
+-- 10. Savings/Investments Table
+CREATE TABLE IF NOT EXISTS savings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    date DATE NOT NULL,
+    category_id INTEGER REFERENCES categories(id) ON DELETE SET NULL,
+    amount DECIMAL(10, 2) NOT NULL,
+    description VARCHAR(255),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 11. Categorization Rules Table
+-- Case-insensitive "description contains" rules applied at import/sync time
+CREATE TABLE IF NOT EXISTS category_rules (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pattern VARCHAR(255) NOT NULL UNIQUE COLLATE NOCASE,
+    priority INTEGER DEFAULT 0,
+    category_id INTEGER NOT NULL REFERENCES categories(id) ON DELETE CASCADE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 12. Transaction Shares Table
+CREATE TABLE IF NOT EXISTS transaction_shares (
+    transaction_id INTEGER NOT NULL REFERENCES transactions(id) ON DELETE CASCADE,
+    user_id INTEGER NOT NULL,
+    date DATE NOT NULL,
+    share DECIMAL(10, 2) NOT NULL,
+    PRIMARY KEY (transaction_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_shares_user_date ON transaction_shares (user_id, date);
+CREATE INDEX IF NOT EXISTS idx_shares_date ON transaction_shares (date);
+
+-- 13. Archive Tier (see partition_transactions.py)
+CREATE TABLE IF NOT EXISTS transactions_archive (
+    id INTEGER PRIMARY KEY,
+    date DATE NOT NULL,
+    description VARCHAR(255) NOT NULL,
+    total_amount DECIMAL(10, 2) NOT NULL,
+    user_id INTEGER NOT NULL,
+    category_id INTEGER,
+    payer_id INTEGER,
+    Gus_share DECIMAL(10, 2) DEFAULT 0.00,
+    Joules_share DECIMAL(10, 2) DEFAULT 0.00,
+    is_split INTEGER DEFAULT 0,
+    transaction_hash BLOB,
+    created_at TIMESTAMP DEFAULT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_archive_date ON transactions_archive (date);
+CREATE INDEX IF NOT EXISTS idx_transactions_archive_hash ON transactions_archive (transaction_hash);
+
+CREATE TABLE IF NOT EXISTS transaction_shares_archive (
+    transaction_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    date DATE NOT NULL,
+    share DECIMAL(10, 2) NOT NULL,
+    PRIMARY KEY (transaction_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_shares_archive_date ON transaction_shares_archive (date);
+
+CREATE TABLE IF NOT EXISTS transaction_rollups (
+    transaction_id INTEGER PRIMARY KEY,
+    archive_year INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rollups_year ON transaction_rollups (archive_year);
@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import threading
+import metrics
+from collections import deque
+from datetime import datetime
+
+EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT', 'REPLACE')
+REDACT_MARKERS = ('password',)
+
+class SlowQueryLog:
+    """
+    Bounded ring buffer of slow statements. Statements are only *collected* while a
+    request runs; EXPLAIN is run afterwards in flush(), once the request's own
+    cursors are done with the connection.
+    With `shared_dir` (gunicorn workers), each process also mirrors its buffer to
+    slow-<pid>.jsonl there and entries() reads every worker's file, so the admin view
+    shows the whole server whichever worker answers.
+    """
+
+    def __init__(self, threshold_ms=200, capacity=200, shared_dir=None):
+        self.threshold_ms = threshold_ms
+        self.capacity = capacity
+        self.shared_dir = shared_dir
+        self._entries = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._written = 0
+
+    def should_capture(self, duration_s, profiling=False):
+        return profiling or duration_s * 1000 >= self.threshold_ms
+
+    def flush(self, conn, pending, route=None):
+        """Runs EXPLAIN for each pending (sql, params, duration_s) and stores the results."""
+        for sql, params, duration_s in pending:
+            text = sql.decode() if isinstance(sql, bytes) else str(sql)
+            redact = any(m in text.lower() for m in REDACT_MARKERS)
+            entry = {
+                "timestamp": datetime.now().isoformat(timespec='seconds'),
+                "route": route,
+                "duration_ms": round(duration_s * 1000, 3),
+                "sql": " ".join(text.split()),
+                "params": "<redacted>" if redact else _format_params(params),
+                "plan": None,
+            }
+            if text.lstrip().upper().startswith(EXPLAINABLE) and not redact:
+                entry["plan"] = _explain(conn, text, params)
+            entry["_t"] = time.time()
+            with self._lock:
+                self._entries.append(entry)
+                if self.shared_dir:
+                    self._publish(entry)
+
+    # --- shared directory (one file per worker) ---
+    def _own_path(self):
+        return os.path.join(self.shared_dir, f"slow-{os.getpid()}.jsonl")
+
+    def _publish(self, entry):
+        """Appends to this worker's file, rewriting it from the buffer once it holds 2x capacity."""
+        try:
+            if self._written >= 2 * self.capacity:
+                _write_lines(self._own_path(), self._entries)
+                self._written = len(self._entries)
+            else:
+                with open(self._own_path(), 'a') as f:
+                    f.write(json.dumps(entry, default=str) + "\n")
+                self._written += 1
+        except OSError:
+            pass
+
+    def _shared_entries(self):
+        cleared = _read_cleared(self.shared_dir)
+        rows = []
+        for name in os.listdir(self.shared_dir):
+            if name.startswith('slow-') and name.endswith('.jsonl'):
+                rows.extend(r for r in _read_lines(os.path.join(self.shared_dir, name)) if r.get('_t', 0) > cleared)
+        rows.sort(key=lambda r: r['_t'])
+        return rows[-self.capacity:]
+
+    def retire(self):
+        """Moves this worker's entries into slow-retired.jsonl (gunicorn worker_exit)."""
+        if not self.shared_dir:
+            return
+        with metrics.shared_lock(self.shared_dir, 'slow.lock'):
+            retired_path = os.path.join(self.shared_dir, 'slow-retired.jsonl')
+            with self._lock:
+                rows = _read_lines(retired_path) + list(self._entries)
+            rows.sort(key=lambda r: r.get('_t', 0))
+            _write_lines(retired_path, rows[-self.capacity:])
+            try:
+                os.remove(self._own_path())
+            except OSError:
+                pass
+
+    def entries(self, limit=None, min_ms=None):
+        if self.shared_dir:
+            rows = self._shared_entries()
+        else:
+            with self._lock:
+                rows = list(self._entries)
+        rows = [{k: v for k, v in r.items() if k != '_t'} for r in rows]
+        rows.reverse() # newest first
+        if min_ms is not None:
+            rows = [r for r in rows if r['duration_ms'] >= min_ms]
+        return rows[:limit] if limit else rows
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self.shared_dir:
+                # Other workers still hold older entries in memory; readers skip anything before this
+                with open(os.path.join(self.shared_dir, 'slow-cleared'), 'w') as f:
+                    f.write(repr(time.time()))
+
+def _read_cleared(shared_dir):
+    try:
+        with open(os.path.join(shared_dir, 'slow-cleared')) as f:
+            return float(f.read())
+    except (OSError, ValueError):
+        return 0.0
+
+def _read_lines(path):
+    rows = []
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    pass # Partially written last line
+    except OSError:
+        pass
+    return rows
+
+def _write_lines(path, rows):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        for r in rows:
+            f.write(json.dumps(r, default=str) + "\n")
+    os.replace(tmp, path)
+
+def _format_params(params):
+    if params is None:
+        return None
+    values = list(params.values()) if isinstance(params, dict) else list(params)
+    # Bulk statements can carry thousands of params; keep the buffer small
+    shown = [v if isinstance(v, (int, float, str, type(None))) else str(v) for v in values[:20]]
+    if len(values) > 20:
+        shown.append(f"... (+{len(values) - 20} more)")
+    return shown
+
+def _explain(conn, sql, params):
+    cursor = None
+    try:
+        cursor = conn.cursor(dictionary=True, buffered=True)
+        started = time.perf_counter()
+        cursor.execute(f"EXPLAIN {sql}", params)
+        plan = cursor.fetchall()
+        for row in plan:
+            for k, v in row.items():
+                if isinstance(v, (bytes, bytearray)):
+                    row[k] = v.decode(errors='replace')
+        return {"rows": plan, "explain_ms": round((time.perf_counter() - started) * 1000, 3)}
+    except Exception as e:
+        return {"error": str(e)}
+    finally:
+        if cursor is not None:
+            try:
+                cursor.close()
+            except Exception:
+                pass
@@ -0,0 +1,136 @@
+import os
+import sys
+import time
+import fcntl
+import logging
+import argparse
+import threading
+from datetime import datetime
+from db import get_connection
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_LOCK = 'snapshot.lock'
+LEADER_RETRY_SECONDS = 60
+
+def snapshot_all_users(cursor, snapshot_date):
+    """
+    Records net worth and net income for every user on snapshot_date with set-based
+    INSERT ... SELECT statements. Each user gets their live totals from assets /
+    income_streams, which are 0 once they have none left: an empty portfolio is a
+    real value, not a gap to carry forward. Safe to re-run for the same date.
+    """
+    # 1. Live totals straight from assets / income_streams, for every user
+    cursor.execute("""
+        INSERT INTO net_worth_history (user_id, snapshot_date, total_value)
+        SELECT u.user_id, %s, COALESCE(SUM(a.current_value), 0)
+        FROM users u LEFT JOIN assets a ON a.user_id = u.user_id
+        GROUP BY u.user_id
+        ON DUPLICATE KEY UPDATE total_value = VALUES(total_value)
+    """, (snapshot_date,))
+    cursor.execute("""
+        INSERT INTO income_history (user_id, snapshot_date, total_net_income)
+        SELECT u.user_id, %s, COALESCE(SUM(s.monthly_gross * (1 - s.tax_rate/100)), 0)
+        FROM users u LEFT JOIN income_streams s ON s.user_id = u.user_id
+        GROUP BY u.user_id
+        ON DUPLICATE KEY UPDATE total_net_income = VALUES(total_net_income)
+    """, (snapshot_date,))
+
+    # 2. Read back what was recorded for the date
+    cursor.execute("""
+        SELECT u.user_id, n.total_value as nw, i.total_net_income as inc
+        FROM users u
+        LEFT JOIN net_worth_history n ON n.user_id = u.user_id AND n.snapshot_date = %s
+        LEFT JOIN income_history i ON i.user_id = u.user_id AND i.snapshot_date = %s
+        WHERE n.id IS NOT NULL OR i.id IS NOT NULL
+    """, (snapshot_date, snapshot_date))
+    rows = cursor.fetchall()
+    if rows and not isinstance(rows[0], dict):
+        rows = [dict(zip(('user_id', 'nw', 'inc'), r)) for r in rows]
+    return {r['user_id']: {"nw": float(r['nw'] or 0), "inc": float(r['inc'] or 0)} for r in rows}
+
+def run_snapshot(snapshot_date=None):
+    """CLI / timer entry point: snapshots every user in one transaction."""
+    snapshot_date = snapshot_date or datetime.now().strftime('%Y-%m-%d')
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+        totals = snapshot_all_users(cursor, snapshot_date)
+        conn.commit()
+        cursor.close()
+        logger.info(f"Snapshot for {snapshot_date} recorded for {len(totals)} users.")
+        return totals
+    except Exception as e:
+        logger.error(f"Snapshot Error: {e}")
+        if conn:
+            conn.rollback()
+        return None
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
+
+def start_snapshot_timer(interval_hours, lock_dir=None):
+    """
+    Runs run_snapshot() every interval_hours on a daemon thread.
+    With lock_dir (shared by the gunicorn workers) only the worker holding the leader
+    lock runs snapshots, and the last run time kept in the lock file stops recycled
+    workers from snapshotting again on start-up. Followers retry for the lock, so
+    another worker takes over when the leader exits.
+    """
+    interval = interval_hours * 3600
+
+    def _schedule(delay):
+        timer = threading.Timer(delay, _tick)
+        timer.daemon = True
+        timer.start()
+
+    if not lock_dir:
+        def _tick():
+            run_snapshot()
+            _schedule(interval)
+
+        logger.info(f"Automatic snapshots enabled every {interval_hours}h.")
+        _schedule(0)
+        return
+
+    # Kept open for the life of the worker; the flock is released when it exits
+    lock_file = open(os.path.join(lock_dir, SNAPSHOT_LOCK), 'a+')
+    leader = False
+
+    def _tick():
+        nonlocal leader
+        if not leader:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                _schedule(LEADER_RETRY_SECONDS)
+                return
+            leader = True
+            logger.info(f"Worker {os.getpid()} runs the automatic snapshots.")
+        lock_file.seek(0)
+        try:
+            last_run = float(lock_file.read() or 0)
+        except ValueError:
+            last_run = 0.0
+        due_in = last_run + interval - time.time()
+        if due_in > 0:
+            _schedule(due_in)
+            return
+        run_snapshot()
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(repr(time.time()))
+        lock_file.flush()
+        _schedule(interval)
+
+    logger.info(f"Automatic snapshots enabled every {interval_hours}h.")
+    _schedule(0)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Record net worth / income snapshots for all users.")
+    parser.add_argument('--date', help="Snapshot date (YYYY-MM-DD, default: today)")
+    args = parser.parse_args()
+    if run_snapshot(args.date) is None:
+        sys.exit(1)
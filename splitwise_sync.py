@@ -8,6 +8,9 @@ from splitwise.expense import Expense
 from splitwise.user import ExpenseUser
 import mysql.connector
 from config import Config
+from db import get_connection
+from categorizer import Categorizer
+import repository
 
 # SETUP LOGGING
 logger = logging.getLogger(__name__)
@@ -24,12 +27,7 @@ HOUSEHOLD_GROUP_ID = 71205816 # Kebab Gs group
 
 def get_db_connection():
     try:
-        return mysql.connector.connect(
-            host=Config.DB_HOST,
-            user=Config.DB_USER,
-            password=Config.DB_PASS,
-            database=Config.DB_NAME
-        )
+        return get_connection()
     except mysql.connector.Error as err:
         logger.error(f"MySQL Connection Error: {err}")
         raise
@@ -37,7 +35,7 @@ def get_db_connection():
 def generate_transaction_hash(row):
     """Mirror hashing from importer.py for deduplication consistency."""
     combined = f"{row['Date']}|{row['Description']}|{row['Cost']}|{row['Category']}"
-    return hashlib.sha256(combined.encode()).hexdigest()
+    return hashlib.sha256(combined.encode()).digest()
 
 def get_metadata(cursor):
     cursor.execute("SELECT user_id, name FROM users")
@@ -84,10 +82,15 @@ def push_expense_to_splitwise(description, cost, date_str=None):
         logger.error(f"Failed to push to Splitwise: {e}")
         return False, str(e)
 
-def process_expenses(expenses, cursor, cat_map):
+def process_expenses(expenses, cursor, cat_map, categorizer=None):
     """Helper to process a list of Splitwise expenses and insert into DB."""
     gus_id = 0
     joules_id = 1
+    general_id = cat_map.get('General', 39)
+
+    # Classify the whole page in one pass before the insert loop
+    expenses = [exp for exp in expenses if not exp.getDeletedAt()]
+    rule_cats = categorizer.match_many([exp.getDescription() or "" for exp in expenses]) if categorizer else [None] * len(expenses)
     
     insert_sql = """
         INSERT IGNORE INTO transactions 
@@ -96,17 +99,20 @@ def process_expenses(expenses, cursor, cat_map):
     """
 
     import_count = 0
-    for exp in expenses:
-        if exp.getDeletedAt(): continue
-        
+    closed_years = repository.archived_years(cursor)
+    for exp, rule_cat in zip(expenses, rule_cats):
         # Extract basic info
         description = exp.getDescription()
         cost = float(exp.getCost())
         # Date format: 2026-02-22T14:30:00Z -> 2026-02-22
         raw_date = exp.getDate()
         clean_date = raw_date.split('T')[0]
+        if int(clean_date[:4]) in closed_years:
+            continue
         category_name = exp.getCategory().getName()
-        cat_id = cat_map.get(category_name, cat_map.get('General', 39))
+        cat_id = cat_map.get(category_name, general_id)
+        if cat_id == general_id and rule_cat is not None:
+            cat_id = rule_cat
         
         # Handle shares
         gus_share = 0
@@ -149,6 +155,7 @@ def process_expenses(expenses, cursor, cat_map):
                 payer_id, gus_share, joules_share, is_split, t_hash
             ))
             if cursor.rowcount > 0:
+                repository.save_shares(cursor, cursor.lastrowid, clean_date, {gus_id: gus_share, joules_id: joules_share})
                 import_count += 1
         except Exception as e:
             logger.warning(f"Failed to insert expense {description}: {e}")
@@ -176,8 +183,9 @@ def run_splitwise_sync(limit=50):
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
         _, cat_map = get_metadata(cursor)
+        categorizer = Categorizer.from_db(cursor)
         
-        count = process_expenses(expenses, cursor, cat_map)
+        count = process_expenses(expenses, cursor, cat_map, categorizer)
         conn.commit()
         logger.info(f"Sync Complete: {count} new items imported.")
         return True
@@ -203,6 +211,7 @@ def run_full_history_sync():
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
         _, cat_map = get_metadata(cursor)
+        categorizer = Categorizer.from_db(cursor)
         
         offset = 0
         limit = 100
@@ -214,7 +223,7 @@ def run_full_history_sync():
             if not expenses:
                 break
             
-            new_count = process_expenses(expenses, cursor, cat_map)
+            new_count = process_expenses(expenses, cursor, cat_map, categorizer)
             total_new += new_count
             
             logger.info(f"  Processed batch of {len(expenses)}: {new_count} new items.")
@@ -0,0 +1,269 @@
+import os
+import re
+import sqlite3
+import calendar
+import threading
+from decimal import Decimal
+from datetime import date, datetime, timedelta
+from mysql.connector import errors
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema_sqlite.sql')
+
+# --- TYPES ---
+# Bind Python values the way MySQL stores them and read DATE / DECIMAL / TIMESTAMP columns
+# back as date / Decimal / datetime, so callers see the same types as with mysql.connector.
+sqlite3.register_adapter(date, lambda d: d.isoformat())
+sqlite3.register_adapter(datetime, lambda d: d.isoformat(' '))
+sqlite3.register_adapter(Decimal, float)
+sqlite3.register_converter('DATE', lambda b: date.fromisoformat(b.decode()[:10]))
+sqlite3.register_converter('DECIMAL', lambda b: Decimal(b.decode()))
+sqlite3.register_converter('TIMESTAMP', lambda b: datetime.fromisoformat(b.decode()))
+
+# Columns that lose their declared type through UNION / GROUP BY but are always dates
+DATE_COLUMNS = {'snapshot_date'}
+
+# --- MYSQL DIALECT -> SQLITE ---
+_TOKENS = re.compile(r"'(?:[^'\\]|\\.|'')*'|%s")
+_INTERVAL = re.compile(r"INTERVAL\s+(\d+)\s+(DAY|MONTH|YEAR)\b", re.IGNORECASE)
+_TIMESTAMPDIFF = re.compile(r"TIMESTAMPDIFF\(\s*(DAY|MONTH|YEAR)\s*,", re.IGNORECASE)
+_ON_DUPLICATE = re.compile(r"ON\s+DUPLICATE\s+KEY\s+UPDATE", re.IGNORECASE)
+_VALUES_REF = re.compile(r"VALUES\((\w+)\)", re.IGNORECASE)
+_REPLACEMENTS = [
+    (re.compile(r"\bINSERT\s+IGNORE\b", re.IGNORECASE), "INSERT OR IGNORE"),
+    (re.compile(r"\bCURRENT_DATE\(\)", re.IGNORECASE), "CURDATE()"),
+    (re.compile(r"^\s*EXPLAIN\s+(?!QUERY PLAN)", re.IGNORECASE), "EXPLAIN QUERY PLAN "),
+    (re.compile(r"\bINT\s+AUTO_INCREMENT\s+PRIMARY\s+KEY", re.IGNORECASE), "INTEGER PRIMARY KEY AUTOINCREMENT"),
+    (re.compile(r"\)\s*ENGINE\s*=\s*\w+", re.IGNORECASE), ")"),
+]
+_SESSION_SET = re.compile(r"^\s*SET\s+SESSION\b", re.IGNORECASE)
+
+_translated = {}
+
+def translate(sql):
+    """Rewrites the MySQL dialect used across the app into SQLite (cached per statement)."""
+    cached = _translated.get(sql)
+    if cached is not None:
+        return cached
+    # %s placeholders -> ?, leaving string literals such as '%Y-%m' untouched
+    text = _TOKENS.sub(lambda m: '?' if m.group(0) == '%s' else m.group(0), sql)
+    text = _INTERVAL.sub(lambda m: f"{m.group(1)}, '{m.group(2).upper()}'", text)
+    text = _TIMESTAMPDIFF.sub(lambda m: f"TIMESTAMPDIFF('{m.group(1).upper()}',", text)
+    for pattern, repl in _REPLACEMENTS:
+        text = pattern.sub(repl, text)
+    parts = _ON_DUPLICATE.split(text, maxsplit=1)
+    if len(parts) == 2:
+        text = parts[0] + "ON CONFLICT DO UPDATE SET" + _VALUES_REF.sub(r"excluded.\1", parts[1])
+    _translated[sql] = text
+    return text
+
+# --- MYSQL FUNCTIONS ---
+_FORMAT_CODES = {'%Y': '%Y', '%y': '%y', '%m': '%m', '%d': '%d', '%b': '%b', '%M': '%B',
+                 '%H': '%H', '%i': '%M', '%s': '%S', '%%': '%%'}
+
+def _to_datetime(value):
+    if value is None:
+        return None
+    text = value.decode() if isinstance(value, bytes) else str(value)
+    return datetime.fromisoformat(text) if len(text) > 10 else datetime.fromisoformat(text[:10])
+
+def _render(value, had_time):
+    return value.isoformat(' ') if had_time else value.date().isoformat()
+
+def _add_months(value, months):
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    return value.replace(year=year, month=month, day=min(value.day, calendar.monthrange(year, month)[1]))
+
+def _date_add(value, amount, unit, sign=1):
+    d = _to_datetime(value)
+    if d is None:
+        return None
+    had_time = len(str(value)) > 10
+    amount = int(amount) * sign
+    unit = unit.upper()
+    if unit == 'DAY':
+        d += timedelta(days=amount)
+    elif unit == 'MONTH':
+        d = _add_months(d, amount)
+    elif unit == 'YEAR':
+        d = _add_months(d, 12 * amount)
+    return _render(d, had_time)
+
+def _date_format(value, fmt):
+    d = _to_datetime(value)
+    if d is None:
+        return None
+    return d.strftime(re.sub(r"%.", lambda m: _FORMAT_CODES.get(m.group(0), m.group(0)), fmt))
+
+def _last_day(value):
+    d = _to_datetime(value)
+    if d is None:
+        return None
+    return d.date().replace(day=calendar.monthrange(d.year, d.month)[1]).isoformat()
+
+def _timestampdiff(unit, start, end):
+    a, b = _to_datetime(start), _to_datetime(end)
+    if a is None or b is None:
+        return None
+    unit = unit.upper()
+    if unit == 'DAY':
+        return (b - a).days
+    months = (b.year - a.year) * 12 + (b.month - a.month)
+    # Only complete months count, as in MySQL
+    if months > 0 and (b.day, b.time()) < (a.day, a.time()):
+        months -= 1
+    elif months < 0 and (b.day, b.time()) > (a.day, a.time()):
+        months += 1
+    return months // 12 if unit == 'YEAR' else months
+
+def _unhex(value):
+    if value is None:
+        return None
+    try:
+        return bytes.fromhex(value)
+    except (TypeError, ValueError):
+        return None
+
+def _concat(*args):
+    return None if any(a is None for a in args) else ''.join(str(a) for a in args)
+
+def _register_functions(conn):
+    conn.create_function('NOW', 0, lambda: datetime.now().replace(microsecond=0).isoformat(' '))
+    conn.create_function('CURDATE', 0, lambda: date.today().isoformat())
+    conn.create_function('DATE_ADD', 3, lambda v, n, u: _date_add(v, n, u))
+    conn.create_function('DATE_SUB', 3, lambda v, n, u: _date_add(v, n, u, -1))
+    conn.create_function('DATE_FORMAT', 2, _date_format, deterministic=True)
+    conn.create_function('LAST_DAY', 1, _last_day, deterministic=True)
+    conn.create_function('TIMESTAMPDIFF', 3, _timestampdiff)
+    conn.create_function('CONCAT', -1, _concat, deterministic=True)
+    conn.create_function('UNHEX', 1, _unhex, deterministic=True)
+
+# --- CONNECTION / CURSOR ---
+def _translate_error(e):
+    message = str(e)
+    if isinstance(e, sqlite3.IntegrityError):
+        return errors.IntegrityError(msg=message, errno=1062)
+    if 'no such table' in message:
+        return errors.ProgrammingError(msg=message, errno=1146) # ER_NO_SUCH_TABLE
+    if isinstance(e, sqlite3.OperationalError):
+        return errors.OperationalError(msg=message)
+    return errors.DatabaseError(msg=message)
+
+class SQLiteCursor:
+    """mysql.connector-style cursor (%s params, dictionary=True rows, MySQL error classes)."""
+
+    def __init__(self, conn, dictionary=False):
+        self._cursor = conn.cursor()
+        self._dictionary = dictionary
+        self._columns = None
+        self._date_idx = ()
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        sql = operation.decode() if isinstance(operation, bytes) else operation
+        if _SESSION_SET.match(sql):
+            # MySQL session tuning (unique_checks etc.) has no SQLite equivalent
+            self._columns = None
+            return None
+        try:
+            self._cursor.execute(translate(sql), tuple(params) if params else ())
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+        self._set_columns()
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        try:
+            self._cursor.executemany(translate(operation), [tuple(p) for p in seq_params])
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+        self._set_columns()
+
+    def _set_columns(self):
+        desc = self._cursor.description
+        self._columns = [d[0] for d in desc] if desc else None
+        self._date_idx = [i for i, c in enumerate(self._columns or []) if c in DATE_COLUMNS]
+
+    def _shape(self, row):
+        if row is None:
+            return None
+        if self._date_idx:
+            row = list(row)
+            for i in self._date_idx:
+                if isinstance(row[i], str):
+                    row[i] = date.fromisoformat(row[i][:10])
+        return dict(zip(self._columns, row)) if self._dictionary else tuple(row)
+
+    def fetchone(self):
+        return self._shape(self._cursor.fetchone())
+
+    def fetchall(self):
+        return [self._shape(r) for r in self._cursor.fetchall()]
+
+    def fetchmany(self, size=1):
+        return [self._shape(r) for r in self._cursor.fetchmany(size)]
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def close(self):
+        self._cursor.close()
+
+class SQLiteConnection:
+    """Wraps sqlite3.Connection with the subset of the mysql.connector API the app uses."""
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES,
+                                     check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL") # Durable across app crashes; fsync on checkpoint
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA cache_size = -8000") # ~8 MB page cache per connection
+        _register_functions(self._conn)
+        self._open = True
+
+    def cursor(self, dictionary=False, **kwargs):
+        # buffered= / prepared= are accepted for call-site compatibility; sqlite3 needs neither
+        return SQLiteCursor(self._conn, dictionary=dictionary)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def is_connected(self):
+        return self._open
+
+    def ping(self, reconnect=False, **kwargs):
+        if not self._open:
+            raise errors.InterfaceError(msg="SQLite connection is closed")
+
+    def close(self):
+        self._open = False
+        self._conn.close()
+
+_initialized = set()
+_init_lock = threading.Lock()
+
+def connect(path):
+    """Opens a connection, creating the schema the first time a process sees `path`."""
+    with _init_lock:
+        if path not in _initialized:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            conn = sqlite3.connect(path)
+            with open(SCHEMA_PATH) as f:
+                conn.executescript(f.read())
+            conn.close()
+            _initialized.add(path)
+    return SQLiteConnection(path)
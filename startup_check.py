@@ -0,0 +1,79 @@
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+# Modules that must stay off the import path of a serving worker
+HEAVY_MODULES = ['pandas', 'numpy', 'pyarrow', 'splitwise']
+
+# Runs in a fresh interpreter so every measurement is a cold import
+PROBE = """
+import sys, json, time, resource
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "import_seconds": elapsed,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "loaded": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+def measure(module):
+    probe = PROBE.format(module=module, heavy=HEAVY_MODULES)
+    started = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if out.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{out.stderr}")
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["process_seconds"] = wall
+    return result
+
+def slowest_imports(module, limit):
+    """Top cumulative entries from `python -X importtime`."""
+    out = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"], capture_output=True, text=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold-start import time and memory budget for a serving worker.")
+    parser.add_argument('--module', default='app', help="Module a worker imports (app or asgi)")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-import-seconds', type=float, default=1.5)
+    parser.add_argument('--max-rss-mb', type=float, default=80)
+    parser.add_argument('--top', type=int, default=10, help="Show the N slowest imports")
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    import_s = statistics.median(r['import_seconds'] for r in runs)
+    process_s = statistics.median(r['process_seconds'] for r in runs)
+    rss = max(r['max_rss_mb'] for r in runs)
+    loaded = sorted({m for r in runs for m in r['loaded']})
+
+    print(f"import {args.module}: {import_s:.3f}s (median of {args.runs}), process {process_s:.3f}s, peak RSS {rss:.1f} MB")
+    for cumulative, name in slowest_imports(args.module, args.top):
+        print(f"  {cumulative / 1000:>9.1f} ms  {name}")
+
+    failures = []
+    if import_s > args.max_import_seconds:
+        failures.append(f"import time {import_s:.3f}s exceeds {args.max_import_seconds}s")
+    if rss > args.max_rss_mb:
+        failures.append(f"peak RSS {rss:.1f} MB exceeds {args.max_rss_mb} MB")
+    if loaded:
+        failures.append(f"heavy modules loaded at startup: {', '.join(loaded)}")
+
+    if failures:
+        print("\nStartup budget exceeded:")
+        for f in failures:
+            print(f"  - {f}")
+        sys.exit(1)
+    print("\nStartup budget OK.")
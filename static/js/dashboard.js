@@ -0,0 +1,317 @@
+let nwChart, spendingChart;
+
+// Every endpoint is asked for all profiles at once (user_id=all) and cached per URL,
+// so switching the profile re-renders from memory. Changing the period clears the cache.
+const viewCache = new Map();
+
+async function fetchView(path, params = '') {
+    const url = `${path}?user_id=all${params}`;
+    if (!viewCache.has(url)) {
+        viewCache.set(url, fetch(url, { cache: 'no-store' }).then(res => {
+            if (!res.ok) throw new Error(`${url}: HTTP ${res.status}`);
+            return res.json();
+        }));
+    }
+    try {
+        const views = await viewCache.get(url);
+        return views[document.getElementById('userSelect').value];
+    } catch (err) {
+        viewCache.delete(url); // Let the next attempt retry
+        throw err;
+    }
+}
+
+function reloadDashboard() {
+    viewCache.clear();
+    updateDashboard();
+}
+
+async function populateAvailableMonths() {
+    try {
+        const res = await fetch('/api/finance/available-months');
+        const months = await res.json();
+        const group = document.getElementById('availableMonthsGroup');
+        const currentMonthStr = new Date().toISOString().slice(0, 7);
+        
+        months.forEach(m => {
+            if (m === currentMonthStr) return; // Skip current month as it is already an option
+            const opt = document.createElement('option');
+            opt.value = m;
+            opt.innerText = m;
+            group.appendChild(opt);
+        });
+    } catch (err) {
+        console.error("Failed to populate months:", err);
+    }
+}
+
+
+async function updateBudgetProgress(parentName = null) {
+    const period = document.getElementById('periodSelect').value;
+    const container = document.getElementById('budget-progress-container');
+    const header = document.querySelector('#budget-card-header'); 
+    
+    try {
+        const data = await fetchView('/api/budget/progress', `&period=${period}${parentName ? `&parent_name=${encodeURIComponent(parentName)}` : ''}`);
+        
+        container.innerHTML = '';
+        if (parentName) {
+            header.innerHTML = `<span class="text-info" style="cursor:pointer" onclick="updateBudgetProgress()">←</span> ${parentName} Breakdown`;
+        } else {
+            header.innerHTML = `<i class="bi bi-bar-chart-steps text-success me-2"></i>Budget vs Actual`;
+        }
+
+        data.forEach(item => {
+            const actual = Number(item.actual || 0);
+            const budget = Number(item.budget || 0);
+            const percent = budget > 0 ? (actual / budget) * 100 : 0;
+            const barColor = percent > 100 ? 'bg-danger' : 'bg-success';
+            
+            const html = `
+                <div class="mb-3" style="cursor: ${parentName ? 'default' : 'pointer'}" 
+                     onclick="${parentName ? '' : `updateBudgetProgress('${item.label}')`}">
+                    <div class="d-flex justify-content-between mb-1">
+                        <span class="text-white small fw-bold">${item.label}</span>
+                        <span class="text-light-gray small">
+                            €${actual.toFixed(0)} / €${budget.toFixed(0)} (${percent.toFixed(0)}%)
+                        </span>
+                    </div>
+                    <div class="progress" style="height: 10px; background-color: #000;">
+                        <div class="progress-bar ${barColor}" style="width: ${Math.min(percent, 100)}%"></div>
+                    </div>
+                </div>
+            `;
+            container.innerHTML += html;
+        });
+    } catch (err) {
+        console.error("Budget Refresh Failed:", err);
+    }
+}
+
+async function updateBurnRate() {
+    const container = document.getElementById('burn-rate-body');
+    
+    try {
+        const data = await fetchView('/api/finance/burn-rate');
+        
+        const order = ["3m", "1y", "lifetime"];
+        const labels = { 
+            "3m": "Last 3 Months", 
+            "1y": "Last Year", 
+            "lifetime": "Lifetime" 
+        };
+
+        container.innerHTML = '';
+
+        order.forEach(key => {
+            if (data[key]) {
+                const row = `
+                    <tr class="border-bottom border-secondary">
+                        <td class="text-white py-3">${labels[key]}</td>
+                        <td class="text-light-gray">€${data[key].actual.toLocaleString('en-IE', {maximumFractionDigits: 0})}</td>
+                        <td class="text-info fw-bold">€${data[key].cushioned.toLocaleString('en-IE', {maximumFractionDigits: 0})}</td>
+                    </tr>
+                `;
+                container.innerHTML += row;
+            }
+        });
+    } catch (err) {
+        console.error("Burn Rate Sync Failed:", err);
+    }
+}
+
+
+async function updateDashboard() {
+    const period = document.getElementById('periodSelect').value;
+    
+    updateBudgetProgress();
+    
+    setTimeout(updateBurnRate, 100);
+    setTimeout(updateSpendingWheel, 200);
+
+    try {
+        const [data, hRatioData, hData] = await Promise.all([
+            fetchView('/api/dashboard/summary', `&period=${period}`),
+            fetchView('/api/finance/housing-ratio', `&period=${period}`),
+            fetchView('/api/finance/history', `&max_points=${Math.max(60, Math.floor(window.innerWidth / 4))}`)
+        ]);
+
+        document.getElementById('dash-net-worth').innerText = `€${data.net_worth.toLocaleString('en-IE', {minimumFractionDigits: 2})}`;
+        document.getElementById('dash-income').innerText = `€${data.income.toLocaleString('en-IE', {minimumFractionDigits: 2})}`;
+        document.getElementById('dash-spending').innerText = `€${data.spent.toLocaleString('en-IE', {minimumFractionDigits: 2})}`;
+        
+        const savings = data.savings;
+        const savingsEl = document.getElementById('dash-savings');
+        const savingsPct = data.income > 0 ? (savings / data.income) * 100 : 0;
+        savingsEl.innerText = `${savingsPct.toFixed(1)}%`;
+        savingsEl.className = savings >= 0 ? 'fw-bold mb-0 text-success' : 'fw-bold mb-0 text-danger';
+        document.getElementById('savings-bar').style.width = `${Math.min(Math.max(savingsPct, 0), 100)}%`;
+
+        document.getElementById('dash-housing-ratio').innerText = `${hRatioData.ratio}%`;
+        document.getElementById('housing-bar').style.width = `${Math.min(hRatioData.ratio, 100)}%`;
+
+        renderNetWorthChart(hData);
+
+    } catch (err) {
+        console.error("Dashboard Parallel Sync Failed:", err);
+    }
+}
+
+async function updateSpendingWheel() {
+    const period = document.getElementById('periodSelect').value;
+
+    try {
+        const sData = await fetchView('/api/spending/parent-categories', `&period=${period}`);
+        renderSpendingChart(sData, false); 
+    } catch (err) {
+        console.error("Wheel Refresh Failed:", err);
+    }
+}
+
+function renderNetWorthChart(data) {
+    const canvas = document.getElementById('dashNetWorthChart');
+    if (!canvas) return;
+    const ctx = canvas.getContext('2d');
+    if (nwChart) nwChart.destroy();
+
+    if (!data.dates || data.dates.length === 0) {
+        nwChart = new Chart(ctx, {
+            type: 'line',
+            data: { labels: [], datasets: [] },
+            options: {
+                responsive: true, maintainAspectRatio: false,
+                plugins: { 
+                    title: { display: true, text: 'No historical data found', color: '#666' },
+                    legend: { display: false }
+                },
+                scales: { x: { display: false }, y: { display: false } }
+            }
+        });
+        return;
+    }
+
+    nwChart = new Chart(ctx, {
+        type: 'line',
+        data: {
+            labels: data.dates,
+            datasets: [
+                { label: 'Net Worth', data: data.nw_values, borderColor: '#0dcaf0', yAxisID: 'y', tension: 0.3, fill: true, backgroundColor: 'rgba(13, 202, 240, 0.1)' },
+                { label: 'Net Income', data: data.inc_values, borderColor: '#2ecc71', yAxisID: 'y1', borderDash: [5,5], tension: 0.3 }
+            ]
+        },
+        options: {
+            responsive: true, maintainAspectRatio: false,
+            scales: {
+                y: { position: 'left', grid: { color: '#333' }, ticks: { color: '#0dcaf0' } },
+                y1: { position: 'right', grid: { display: false }, ticks: { color: '#2ecc71' } },
+                x: { ticks: { color: '#cccccc' } }
+            },
+            plugins: { 
+                legend: { labels: { color: '#ffffff', font: { weight: 'bold' } } } 
+            }
+        }
+    });
+}
+
+function renderSpendingChart(data, isSubCategory = false, parentName = '') {
+    const canvas = document.getElementById('dashSpendingChart');
+    if (!canvas) return;
+    
+    const ctx = canvas.getContext('2d');
+    if (spendingChart) spendingChart.destroy();
+
+    const totalSum = data.values.reduce((a, b) => a + b, 0);
+    const labelText = isSubCategory ? parentName : 'Total Spend';
+    
+    const labelEl = document.getElementById('chart-center-label');
+    labelEl.style.opacity = '0'; 
+    labelEl.innerHTML = `
+        <span class="text-light-gray small text-uppercase d-block" style="font-size: 0.85rem; letter-spacing: 1px;">${labelText}</span>
+        <span class="text-white fw-bold h1">€${totalSum.toLocaleString('en-IE', {maximumFractionDigits: 0})}</span>
+    `;
+
+    const centerPlugin = {
+        id: 'centerLabelPositioner',
+        afterLayout: (chart) => {
+            const centerX = (chart.chartArea.left + chart.chartArea.right) / 2;
+            const centerY = (chart.chartArea.top + chart.chartArea.bottom) / 2;
+            labelEl.style.left = centerX + 'px';
+            labelEl.style.top = centerY + 'px';
+            labelEl.style.transform = 'translate(-50%, -50%)';
+            labelEl.style.opacity = '1'; 
+        }
+    };
+
+    spendingChart = new Chart(ctx, {
+        type: 'doughnut',
+        plugins: [centerPlugin],
+        data: {
+            labels: data.labels,
+            datasets: [{
+                data: data.values,
+                backgroundColor: [
+                    '#0dcaf0', '#2ecc71', '#ffc107', '#fd7e14', 
+                    '#6610f2', '#e83e8c', '#20c997', '#f8f9fa'
+                ],
+                hoverOffset: 25,
+                borderWidth: 2,
+                borderColor: '#1a1a1a'
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            layout: {
+                padding: {
+                    left: 0,
+                    right: 20,
+                    top: 10,
+                    bottom: 10
+                }
+            },
+            onClick: (evt, item) => {
+                if (item.length > 0 && !isSubCategory) {
+                    const index = item[0].index;
+                    const selectedParent = spendingChart.data.labels[index];
+                    loadSubCategoryBreakdown(selectedParent);
+                } else if (isSubCategory) {
+                    updateDashboard(); 
+                }
+            },
+            plugins: {
+                legend: {
+                    position: 'right',
+                    align: 'center',
+                    labels: { 
+                        color: '#ffffff', 
+                        font: { size: 14, weight: 'bold' },
+                        padding: 20,
+                        boxWidth: 15
+                    }
+                },
+                tooltip: {
+                    bodyFont: { size: 16 },
+                    callbacks: {
+                        label: (item) => ` ${item.label}: €${item.raw.toFixed(2)}`
+                    }
+                }
+            },
+            cutout: '70%'
+        }
+    });
+}
+
+async function loadSubCategoryBreakdown(parentName) {
+    const period = document.getElementById('periodSelect').value;
+    try {
+        const data = await fetchView('/api/spending/sub-categories', `&parent_name=${encodeURIComponent(parentName)}&period=${period}`);
+        renderSpendingChart(data, true, parentName);
+    } catch (err) {
+        console.error("Sub-category fetch failed:", err);
+    }
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    populateAvailableMonths();
+    updateDashboard();
+});
@@ -0,0 +1,238 @@
+let budgetTargets = {};
+
+async function syncSplitwise() {
+    const btn = document.getElementById('apiSyncBtn');
+    const status = document.getElementById('apiSyncStatus');
+    btn.disabled = true;
+    btn.innerHTML = '<span class="spinner-border spinner-border-sm me-2"></span>SYNCING...';
+    try {
+        const res = await fetch('/api/sync_splitwise', { method: 'POST' });
+        const data = await res.json();
+        if (res.ok) {
+            status.innerHTML = `<span class="text-success fw-bold"><i class="bi bi-check-circle"></i> ${data.status}</span>`;
+        } else {
+            status.innerHTML = `<span class="text-danger">Error: ${data.error}</span>`;
+        }
+    } catch (err) {
+        status.innerHTML = `<span class="text-danger">Sync failed.</span>`;
+    } finally {
+        btn.disabled = false;
+        btn.innerHTML = '<i class="bi bi-arrow-repeat me-2"></i>QUICK SYNC';
+    }
+}
+
+async function syncFullSplitwise() {
+    if (!confirm("This will fetch your entire Splitwise history. It may take a minute and will ignore existing entries. Proceed?")) return;
+    
+    const btn = document.getElementById('fullSyncBtn');
+    const status = document.getElementById('apiSyncStatus');
+    btn.disabled = true;
+    btn.innerHTML = '<span class="spinner-border spinner-border-sm me-2"></span>SYNCING ALL...';
+    try {
+        const res = await fetch('/api/sync_splitwise_full', { method: 'POST' });
+        const data = await res.json();
+        if (res.ok) {
+            status.innerHTML = `<span class="text-warning fw-bold"><i class="bi bi-check-all"></i> ${data.status}</span>`;
+        } else {
+            status.innerHTML = `<span class="text-danger">Error: ${data.error}</span>`;
+        }
+    } catch (err) {
+        status.innerHTML = `<span class="text-danger">Full Sync failed.</span>`;
+    } finally {
+        btn.disabled = false;
+        btn.innerHTML = '<i class="bi bi-database-fill-down me-2"></i>FULL SYNC';
+    }
+}
+
+document.addEventListener('DOMContentLoaded', async () => {
+    document.getElementById('expDate').valueAsDate = new Date();
+    document.getElementById('savDate').valueAsDate = new Date();
+    document.getElementById('incDate').valueAsDate = new Date();
+    
+    // Fetch budget targets for Gus (user_id 0) to show impact
+    const res = await fetch(`/api/budget/list?user_id=0`);
+    const data = await res.json();
+    data.forEach(item => { budgetTargets[item.id] = item.amount; });
+});
+
+function setSplit(gus, joules) {
+    document.getElementById('splitGus').value = gus;
+    document.getElementById('splitJoules').value = joules;
+    updateSplitLabel();
+    calculateImpact();
+}
+
+function syncSplit(origin) {
+    let gusInput = document.getElementById('splitGus');
+    let joulesInput = document.getElementById('splitJoules');
+    if (origin === 'gus') {
+        let val = Math.min(Math.max(parseFloat(gusInput.value) || 0, 0), 100);
+        gusInput.value = val;
+        joulesInput.value = (100 - val);
+    } else {
+        let val = Math.min(Math.max(parseFloat(joulesInput.value) || 0, 0), 100);
+        joulesInput.value = val;
+        gusInput.value = (100 - val);
+    }
+    updateSplitLabel();
+    calculateImpact();
+}
+
+function updateSplitLabel() {
+    const gus = document.getElementById('splitGus').value;
+    const joules = document.getElementById('splitJoules').value;
+    document.getElementById('split-label').innerText = `${gus}/${joules} Split`;
+}
+
+function calculateImpact() {
+    const totalAmount = parseFloat(document.getElementById('expAmt').value) || 0;
+    const gusShare = parseFloat(document.getElementById('splitGus').value) / 100;
+    const myAmount = totalAmount * gusShare;
+    const catId = document.getElementById('expCat').value;
+    const target = budgetTargets[catId] || 0;
+    const bar = document.getElementById('impact-bar');
+    const label = document.getElementById('impact-percent');
+
+    if (target > 0) {
+        const pct = (myAmount / target) * 100;
+        bar.style.width = Math.min(pct, 100) + '%';
+        label.innerText = pct.toFixed(1) + '%';
+        if (pct > 80) bar.className = "progress-bar bg-danger";
+        else if (pct > 40) bar.className = "progress-bar bg-warning";
+        else bar.className = "progress-bar bg-info";
+    } else {
+        bar.style.width = '0%';
+        label.innerText = 'No Target Set';
+    }
+}
+
+async function saveExpense() {
+    const catSelect = document.getElementById('expCat');
+    const pushSwitch = document.getElementById('pushToSplitwise');
+    const saveBtn = document.getElementById('saveBtn');
+    
+    const payload = {
+        date: document.getElementById('expDate').value,
+        description: document.getElementById('expDesc').value,
+        amount: parseFloat(document.getElementById('expAmt').value),
+        category_id: catSelect.value,
+        category_name: catSelect.options[catSelect.selectedIndex].text,
+        split_gus: parseFloat(document.getElementById('splitGus').value),
+        split_joules: parseFloat(document.getElementById('splitJoules').value)
+    };
+
+    if (isNaN(payload.amount)) { alert("Please enter a valid amount."); return; }
+
+    try {
+        saveBtn.disabled = true;
+        if (pushSwitch.checked) {
+            const swRes = await fetch('/api/expense/splitwise', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(payload)
+            });
+            if (!swRes.ok) {
+                const swData = await swRes.json();
+                if (!confirm(`Splitwise Push Failed: ${swData.error}. Save locally anyway?`)) {
+                    saveBtn.disabled = false;
+                    return;
+                }
+            }
+        }
+
+        const res = await fetch('/api/expense/manual', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(payload)
+        });
+
+        if (res.ok) {
+            alert("Transaction Recorded Successfully!");
+            document.getElementById('manualForm').reset();
+            document.getElementById('expDate').valueAsDate = new Date();
+            setSplit(50, 50);
+        } else {
+            alert("Error saving transaction locally.");
+        }
+    } catch (err) {
+        alert("A critical error occurred while saving.");
+    } finally {
+        saveBtn.disabled = false;
+    }
+}
+
+async function saveSaving() {
+    const saveBtn = document.getElementById('saveSavBtn');
+    const payload = {
+        user_id: document.getElementById('savUser').value,
+        date: document.getElementById('savDate').value,
+        description: document.getElementById('savDesc').value,
+        amount: parseFloat(document.getElementById('savAmt').value),
+        category_id: document.getElementById('savCat').value
+    };
+
+    if (isNaN(payload.amount) || payload.amount <= 0) {
+        alert("Please enter a valid amount.");
+        return;
+    }
+
+    try {
+        saveBtn.disabled = true;
+        const res = await fetch('/api/savings/manual', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(payload)
+        });
+
+        if (res.ok) {
+            alert("Saving/Investment Recorded!");
+            document.getElementById('savingsForm').reset();
+            document.getElementById('savDate').valueAsDate = new Date();
+        } else {
+            const err = await res.json();
+            alert("Error: " + err.error);
+        }
+    } catch (err) {
+        alert("A critical error occurred while saving.");
+    } finally {
+        saveBtn.disabled = false;
+    }
+}
+
+async function saveIncomeEntry() {
+    const saveBtn = document.getElementById('saveIncBtn');
+    const payload = {
+        user_id: document.getElementById('incUser').value,
+        date: document.getElementById('incDate').value,
+        description: document.getElementById('incDesc').value,
+        amount: parseFloat(document.getElementById('incAmt').value),
+        category_id: document.getElementById('incCat').value
+    };
+
+    if (isNaN(payload.amount) || payload.amount <= 0) {
+        alert("Please enter a valid amount.");
+        return;
+    }
+
+    try {
+        saveBtn.disabled = true;
+        const res = await fetch('/api/income/manual', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify(payload)
+        });
+
+        if (res.ok) {
+            alert("One-off Income Recorded!");
+            document.getElementById('incomeForm').reset();
+            document.getElementById('incDate').valueAsDate = new Date();
+        } else {
+            const err = await res.json();
+            alert("Error: " + err.error);
+        }
+    } catch (err) {
+        alert("A critical error occurred while saving.");
+    } finally {
+        saveBtn.disabled = false;
+    }
+}
@@ -0,0 +1,293 @@
+let nwChart;
+
+async function loadNetWorth() {
+    const userId = document.getElementById('userSelect').value;
+    
+    // 1. Fetch Summary & Strategy
+    const sumRes = await fetch(`/api/dashboard/summary?user_id=${userId}`);
+    const summary = await sumRes.json();
+    
+    const income = summary.income || 0;
+    const sPct = summary.savings_goal_pct || 0;
+    const ePct = summary.expenses_goal_pct || 0;
+    
+    document.getElementById('strategy-income').innerText = `€${income.toLocaleString('en-IE', {maximumFractionDigits: 0})}`;
+    
+    const sEur = (income * sPct) / 100;
+    const eEur = (income * ePct) / 100;
+    
+    document.getElementById('strategy-savings-val').innerText = `€${sEur.toLocaleString('en-IE', {maximumFractionDigits: 0})} (${sPct}%)`;
+    document.getElementById('strategy-expenses-val').innerText = `€${eEur.toLocaleString('en-IE', {maximumFractionDigits: 0})} (${ePct}%)`;
+    
+    document.getElementById('strategy-savings-bar').style.width = `${sPct}%`;
+    document.getElementById('strategy-expenses-bar').style.width = `${ePct}%`;
+
+    // 2. Fetch Assets
+    const res = await fetch(`/api/networth?user_id=${userId}`);
+    const assets = await res.json();
+    
+    let total = 0, liq = 0, fix = 0;
+    const liqTypes = ['Bank', 'Brokerage', 'Stock', 'Liquid', 'Crypto'];
+
+    document.getElementById('asset-rows').innerHTML = assets.map(a => {
+        const val = parseFloat(a.current_value);
+        total += val;
+        if(liqTypes.includes(a.asset_type)) liq += val; else fix += val;
+        
+        return `
+            <div class="row g-2 align-items-center mb-3 pb-3 border-bottom-custom asset-row" data-id="${a.id}">
+                <div class="col-7">
+                    <div class="d-flex align-items-center gap-2">
+                        <input type="text" class="form-control form-control-sm bg-transparent text-white border-0 fw-bold p-0 mb-0 asset-name-input" 
+                               style="font-size: 1.1rem; width: auto; min-width: 120px;"
+                               value="${a.asset_name}">
+                        <span class="badge bg-dark border border-secondary text-light-gray text-uppercase" style="font-size: 0.65rem; letter-spacing: 1px;">${a.asset_type}</span>
+                    </div>
+                </div>
+                <div class="col-4">
+                    <div class="input-group input-group-sm">
+                        <span class="input-group-text bg-black border-secondary text-success">€</span>
+                        <input type="number" class="form-control bg-black text-info border-secondary fw-bold text-end asset-value-input" 
+                               style="font-family: 'Courier New', monospace; font-size: 1rem;"
+                               value="${val}">
+                    </div>
+                </div>
+                <div class="col-1 text-end">
+                    <button class="btn btn-sm btn-outline-danger border-0 p-0" onclick="deleteAsset(${a.id})">
+                        <i class="bi bi-trash3" style="font-size: 0.9rem;"></i>
+                    </button>
+                </div>
+            </div>
+        `;
+    }).join('');
+
+    document.getElementById('total-net-worth').innerText = `€${total.toLocaleString()}`;
+
+    // 3. Fetch Income
+    loadIncome();
+
+    // 4. Fetch History for Chart
+    const hRes = await fetch(`/api/finance/history?user_id=${userId}&max_points=${Math.max(60, Math.floor(window.innerWidth / 4))}`);
+    const hData = await hRes.json();
+    renderChart(hData);
+}
+
+async function loadIncome() {
+    const userId = document.getElementById('userSelect').value;
+    const res = await fetch(`/api/income?user_id=${userId}`);
+    const streams = await res.json();
+    
+    document.getElementById('income-rows').innerHTML = streams.map(s => {
+        return `
+            <tr class="border-bottom border-secondary income-row" data-id="${s.id}">
+                <td class="ps-4">
+                    <input type="text" class="form-control form-control-sm bg-transparent text-white border-0 fw-bold p-0 income-source-input" 
+                           value="${s.source_name}">
+                </td>
+                <td>
+                    <div class="input-group input-group-sm" style="width: 150px;">
+                        <span class="input-group-text bg-black border-secondary text-success">€</span>
+                        <input type="number" class="form-control bg-black text-info border-secondary income-gross-input" 
+                               value="${s.monthly_gross}">
+                    </div>
+                </td>
+                <td>
+                    <div class="input-group input-group-sm" style="width: 100px;">
+                        <input type="number" class="form-control bg-black text-info border-secondary text-center income-tax-input" 
+                               value="${s.tax_rate}">
+                        <span class="input-group-text bg-black border-secondary text-muted">%</span>
+                    </div>
+                </td>
+                <td class="text-end pe-4">
+                    <button class="btn btn-sm btn-outline-danger border-0" onclick="deleteIncome(${s.id})">
+                        <i class="bi bi-trash3"></i>
+                    </button>
+                </td>
+            </tr>
+        `;
+    }).join('');
+}
+
+async function saveAllAssets() {
+    const rows = document.querySelectorAll('.asset-row');
+    const promises = [];
+    
+    rows.forEach(row => {
+        const id = row.dataset.id;
+        const name = row.querySelector('.asset-name-input').value;
+        const value = row.querySelector('.asset-value-input').value;
+        
+        promises.push(fetch('/api/networth/edit-name', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({id: id, name: name})
+        }));
+        
+        promises.push(fetch('/api/networth/update', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({id: id, value: value})
+        }));
+    });
+    
+    await Promise.all(promises);
+    alert("All assets saved successfully!");
+    loadNetWorth();
+}
+
+async function saveAllIncome() {
+    const rows = document.querySelectorAll('.income-row');
+    const promises = [];
+    
+    rows.forEach(row => {
+        const id = row.dataset.id;
+        const source = row.querySelector('.income-source-input').value;
+        const gross = row.querySelector('.income-gross-input').value;
+        const tax = row.querySelector('.income-tax-input').value;
+        
+        promises.push(fetch('/api/income/update', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({id: id, source: source, gross: gross, tax: tax})
+        }));
+    });
+    
+    await Promise.all(promises);
+    alert("All income streams saved successfully!");
+    loadNetWorth();
+}
+
+async function deleteIncome(id) {
+    if (!confirm("Remove this income stream?")) return;
+    await fetch('/api/income/delete', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({id: id})
+    });
+    loadIncome();
+}
+
+function showAddIncomeModal() {
+    new bootstrap.Modal(document.getElementById('incomeModal')).show();
+}
+
+async function saveNewIncome() {
+    const payload = {
+        user_id: document.getElementById('userSelect').value,
+        source: document.getElementById('incomeSource').value,
+        gross: document.getElementById('incomeGross').value,
+        tax: document.getElementById('incomeTax').value
+    };
+    
+    const res = await fetch('/api/income', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify(payload)
+    });
+    
+    if (res.ok) {
+        bootstrap.Modal.getInstance(document.getElementById('incomeModal')).hide();
+        loadIncome();
+    }
+}
+
+function renderChart(data) {
+    const ctx = document.getElementById('netWorthChart').getContext('2d');
+    if (nwChart) nwChart.destroy();
+
+    if (!data.dates || data.dates.length === 0) {
+        nwChart = new Chart(ctx, {
+            type: 'line',
+            data: { labels: [], datasets: [] },
+            options: {
+                responsive: true, maintainAspectRatio: false,
+                plugins: { 
+                    title: { display: true, text: 'No historical data found for this profile', color: '#666' },
+                    legend: { display: false }
+                },
+                scales: { x: { display: false }, y: { display: false } }
+            }
+        });
+        return;
+    }
+
+    nwChart = new Chart(ctx, {
+        type: 'line',
+        data: {
+            labels: data.dates,
+            datasets: [
+                { label: 'Net Worth', data: data.nw_values, borderColor: '#0dcaf0', yAxisID: 'y', tension: 0.3, fill: true, backgroundColor: 'rgba(13, 202, 240, 0.1)' },
+                { label: 'Net Income', data: data.inc_values, borderColor: '#2ecc71', yAxisID: 'y1', borderDash: [5,5], tension: 0.3 }
+            ]
+        },
+        options: {
+            responsive: true, maintainAspectRatio: false,
+            scales: {
+                y: { position: 'left', ticks: { color: '#0dcaf0' }, grid: { color: '#222' } },
+                y1: { position: 'right', ticks: { color: '#2ecc71' }, grid: { display: false } }
+            },
+            plugins: { legend: { labels: { color: '#fff' } } }
+        }
+    });
+}
+
+function showAddAssetModal() { new bootstrap.Modal(document.getElementById('assetModal')).show(); }
+
+async function saveNewAsset() {
+    const payload = {
+        user_id: document.getElementById('userSelect').value,
+        name: document.getElementById('assetName').value,
+        type: document.getElementById('assetType').value,
+        value: document.getElementById('assetValue').value
+    };
+    await fetch('/api/networth/update', { method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify(payload) });
+    bootstrap.Modal.getInstance(document.getElementById('assetModal')).hide();
+    loadNetWorth();
+}
+
+async function takeSnapshot() {
+    const btn = event.target.closest('button');
+    const originalText = btn.innerHTML;
+    const userId = document.getElementById('userSelect').value;
+
+    console.log("Triggering Snapshot for User:", userId);
+
+    try {
+        btn.disabled = true;
+        btn.innerHTML = '<span class="spinner-border spinner-border-sm me-1"></span> Saving...';
+
+        const res = await fetch('/api/finance/snapshot', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({ user_id: userId })
+        });
+
+        if (!res.ok) throw new Error(`Server responded with ${res.status}`);
+
+        const result = await res.json();
+        console.log("Snapshot result:", result);
+
+        alert("Success! Financial snapshot recorded for today.");
+        loadNetWorth(); 
+
+    } catch (err) {
+        console.error("Snapshot Failed:", err);
+        alert("Failed to save snapshot. Check the terminal console.");
+    } finally {
+        btn.disabled = false;
+        btn.innerHTML = originalText;
+    }
+}
+
+async function deleteAsset(id) {
+    if (!confirm("Are you sure you want to remove this asset? It will be removed from your current total.")) return;
+
+    await fetch('/api/networth/delete', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({id: id})
+    });
+    loadNetWorth(); 
+}
+
+document.addEventListener('DOMContentLoaded', loadNetWorth);
@@ -0,0 +1,139 @@
+import os
+import sys
+import gzip
+import json
+import shutil
+import hashlib
+import logging
+import argparse
+import mimetypes
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+DIST = 'dist' # Build output, inside STATIC_DIR so the static route can serve it
+MANIFEST = 'manifest.json'
+HASH_LENGTH = 12
+# Text formats worth precompressing; images are already compressed
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.txt', '.map')
+# Fingerprinted names change whenever the content does, so browsers may keep them forever
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+def fingerprint(path, digest):
+    root, ext = os.path.splitext(path)
+    return f"{root}.{digest[:HASH_LENGTH]}{ext}"
+
+def source_files(static_dir):
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = sorted(d for d in dirs if not (root == static_dir and d == DIST))
+        for name in sorted(files):
+            if name.startswith('.'):
+                continue
+            full = os.path.join(root, name)
+            yield os.path.relpath(full, static_dir).replace(os.sep, '/'), full
+
+def write_variants(target, data):
+    """Writes .br / .gz next to `target` when they are smaller. Returns the encodings written."""
+    encodings = []
+    # Built once per deploy, so the slowest (smallest) settings are affordable
+    variants = [('gzip', '.gz', lambda b: gzip.compress(b, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.insert(0, ('br', '.br', lambda b: brotli.compress(b, quality=11)))
+    for encoding, suffix, compress in variants:
+        packed = compress(data)
+        if len(packed) < len(data):
+            with open(target + suffix, 'wb') as f:
+                f.write(packed)
+            encodings.append(encoding)
+    return encodings
+
+def build(static_dir=STATIC_DIR):
+    """
+    Copies every static file to static/dist/ under a content-hashed name, next to brotli and
+    gzip variants of text assets, and writes the source -> fingerprinted name manifest.
+    """
+    if brotli is None:
+        logger.warning("brotli is not installed; only gzip variants are built.")
+    dist_dir = os.path.join(static_dir, DIST)
+    shutil.rmtree(dist_dir, ignore_errors=True)
+    files = {}
+    for name, full in source_files(static_dir):
+        with open(full, 'rb') as f:
+            data = f.read()
+        hashed = fingerprint(name, hashlib.sha256(data).hexdigest())
+        target = os.path.join(dist_dir, hashed)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(data)
+        encodings = write_variants(target, data) if name.endswith(COMPRESSIBLE) else []
+        files[name] = {"path": hashed, "encodings": encodings}
+        logger.info(f"{name} -> {DIST}/{hashed} {' '.join(encodings)}")
+
+    with open(os.path.join(dist_dir, MANIFEST), 'w') as f:
+        json.dump({"files": files}, f, indent=2, sort_keys=True)
+    logger.info(f"Built {len(files)} static assets into {dist_dir}")
+    return files
+
+def load_manifest(static_dir=STATIC_DIR):
+    path = os.path.join(static_dir, DIST, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)['files']
+
+def init_app(app):
+    """
+    Makes url_for('static', filename=...) point at the fingerprinted build and serves those
+    files precompressed with immutable caching. Without a build (or with DEBUG on, so edits
+    show up immediately) static files are served as-is.
+    """
+    from flask import send_from_directory
+    import responses
+
+    manifest = {} if app.debug else load_manifest(app.static_folder)
+    if not manifest:
+        return
+    # Served URL path -> (source name, precompressed encodings)
+    built = {f"{DIST}/{entry['path']}": (name, entry['encodings']) for name, entry in manifest.items()}
+
+    @app.url_defaults
+    def _fingerprinted_url(endpoint, values):
+        if endpoint == 'static':
+            entry = manifest.get(values.get('filename'))
+            if entry:
+                values['filename'] = f"{DIST}/{entry['path']}"
+
+    def serve_static(filename):
+        if filename not in built:
+            return app.send_static_file(filename)
+        name, encodings = built[filename]
+        accepted = responses.accepted_encodings()
+        mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        for encoding, suffix in PRECOMPRESSED:
+            if encoding in encodings and encoding in accepted:
+                response = send_from_directory(app.static_folder, filename + suffix, mimetype=mimetype)
+                response.headers['Content-Encoding'] = encoding
+                break
+        else:
+            response = send_from_directory(app.static_folder, filename, mimetype=mimetype)
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
+
+    app.view_functions['static'] = serve_static
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Fingerprint and precompress static assets into static/dist/.")
+    parser.add_argument('--static-dir', default=STATIC_DIR, help="Static folder to build (default: ./static)")
+    args = parser.parse_args()
+    if not os.path.isdir(args.static_dir):
+        logger.error(f"{args.static_dir} is not a directory")
+        sys.exit(1)
+    build(args.static_dir)